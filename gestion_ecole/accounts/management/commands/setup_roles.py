@@ -5,10 +5,14 @@ from django.contrib.contenttypes.models import ContentType
 # Modèles dont on configure les droits maintenant
 from catalog.models import SchoolYear, Grade, Classroom, Subject
 from students.models import Student, Enrollment
+from grading.models import Mark
+from attendance.models import AttendanceSheet
+from finance.models import DailyCash, FeeSchedule, LedgerEntry, StudentBalance
 
 ROLE_DIRECTION   = "DIRECTION"
 ROLE_ENSEIGNANT  = "ENSEIGNANT"
 ROLE_COMPTABLE   = "COMPTABLE"
+ROLE_SURVEILLANT = "SURVEILLANT"
 
 class Command(BaseCommand):
     help = "Crée les groupes de rôles et assigne les permissions de base"
@@ -18,6 +22,7 @@ class Command(BaseCommand):
         g_dir, _ = Group.objects.get_or_create(name=ROLE_DIRECTION)
         g_prof, _ = Group.objects.get_or_create(name=ROLE_ENSEIGNANT)
         g_comp, _ = Group.objects.get_or_create(name=ROLE_COMPTABLE)
+        g_surv, _ = Group.objects.get_or_create(name=ROLE_SURVEILLANT)
 
         def perms_for(model, actions=("add","change","delete","view")):
             ct = ContentType.objects.get_for_model(model)
@@ -32,8 +37,24 @@ class Command(BaseCommand):
         for model in (SchoolYear, Grade, Classroom, Subject, Student, Enrollment):
             g_prof.permissions.add(*perms_for(model, ("view",)))
 
-        # Comptable : pour l’instant lecture des élèves (fees arriveront Sprint 6)
-        for model in (Student, Enrollment):
+        # Notes et appel : la direction gère tout, l'enseignant saisit
+        g_dir.permissions.add(*perms_for(Mark), *perms_for(AttendanceSheet))
+        g_prof.permissions.add(*perms_for(Mark, ("add", "change", "view")))
+        g_prof.permissions.add(*perms_for(AttendanceSheet, ("add", "change", "view")))
+
+        # Surveillant : appel et bilans d'absences, lecture des élèves
+        g_surv.permissions.add(*perms_for(AttendanceSheet, ("add", "change", "view")))
+        for model in (Classroom, Student, Enrollment):
+            g_surv.permissions.add(*perms_for(model, ("view",)))
+
+        # Comptable : barème des frais, encaissements, lecture des élèves et des classes.
+        # Le grand livre est en ajout seul : « delete » = passer une annulation,
+        # réservé à la direction.
+        for model in (Classroom, Student, Enrollment):
             g_comp.permissions.add(*perms_for(model, ("view",)))
+        g_comp.permissions.add(*perms_for(FeeSchedule), *perms_for(LedgerEntry, ("add", "view")))
+        g_comp.permissions.add(*perms_for(StudentBalance, ("view",)), *perms_for(DailyCash, ("view",)))
+        g_dir.permissions.add(*perms_for(FeeSchedule), *perms_for(LedgerEntry, ("add", "delete", "view")))
+        g_dir.permissions.add(*perms_for(StudentBalance, ("view",)), *perms_for(DailyCash, ("view",)))
 
         self.stdout.write(self.style.SUCCESS("Groupes/permissions OK"))
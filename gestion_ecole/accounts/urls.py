@@ -1,9 +1,8 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from .views import dashboard
 
 urlpatterns = [
     path("login/", auth_views.LoginView.as_view(template_name="accounts/login.html"), name="login"),
     path("logout/", auth_views.LogoutView.as_view(), name="logout"),
-    path("dashboard/", dashboard, name="dashboard"),
+    # "dashboard/" : servi par core.views.dashboard (core/urls.py)
 ]
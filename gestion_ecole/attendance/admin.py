@@ -0,0 +1,18 @@
+# attendance/admin.py
+from django.contrib import admin
+
+from .models import AttendanceSheet
+
+
+@admin.register(AttendanceSheet)
+class AttendanceSheetAdmin(admin.ModelAdmin):
+    # bitmaps illisibles ici : la saisie passe par /presences/
+    list_display = ("classroom", "date", "session", "taken_by", "updated_at")
+    list_filter = ("school_year", "session", "classroom")
+    list_select_related = ("classroom", "taken_by")
+    date_hierarchy = "date"
+    exclude = ("absent", "late")
+    readonly_fields = ("classroom", "school_year", "date", "session", "taken_by")
+
+    def has_add_permission(self, request):
+        return False
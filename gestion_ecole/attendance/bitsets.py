@@ -0,0 +1,49 @@
+# attendance/bitsets.py
+"""
+Bitmaps des feuilles d'appel (NumPy) : bit i = élève d'indice i de la liste
+d'appel, octets « petit-boutistes » (bit 0 = octet 0, bit de poids faible).
+Les listes d'élèves sont des int64 petit-boutistes concaténés.
+"""
+import numpy as np
+
+
+def pack(flags) -> bytes:
+    """Tableau / liste de booléens -> bitmap (octets de fin à zéro retirés)."""
+    return np.packbits(np.asarray(flags, dtype=bool), bitorder="little").tobytes().rstrip(b"\0")
+
+
+def unpack(data, size) -> np.ndarray:
+    """Bitmap -> `size` booléens (un bitmap court est complété par des 0)."""
+    bits = np.unpackbits(np.frombuffer(bytes(data), dtype=np.uint8), bitorder="little").astype(bool)
+    out = np.zeros(size, dtype=bool)
+    out[:min(size, len(bits))] = bits[:size]
+    return out
+
+
+def stack(bitmaps, width) -> np.ndarray:
+    """Bitmaps -> matrice uint8 (feuilles × `width` octets), complétée par des 0."""
+    matrix = np.zeros((len(bitmaps), width), dtype=np.uint8)
+    for i, data in enumerate(bitmaps):
+        row = np.frombuffer(bytes(data), dtype=np.uint8)[:width]
+        matrix[i, :len(row)] = row
+    return matrix
+
+
+def column_counts(matrix, groups_start, size) -> np.ndarray:
+    """
+    Nombre de bits à 1 par position, pour chaque groupe de lignes consécutives
+    (groups_start : indice de la 1re ligne de chaque groupe) : (groupes × size).
+    Un unpackbits et un add.reduceat pour toutes les feuilles.
+    """
+    if not len(matrix):
+        return np.zeros((0, size), dtype=np.int64)
+    bits = np.unpackbits(matrix, axis=1, bitorder="little")[:, :size]
+    return np.add.reduceat(bits.astype(np.int32), groups_start, axis=0)
+
+
+def encode_ids(ids) -> bytes:
+    return np.asarray(ids, dtype="<i8").tobytes()
+
+
+def decode_ids(data) -> np.ndarray:
+    return np.frombuffer(bytes(data), dtype="<i8")
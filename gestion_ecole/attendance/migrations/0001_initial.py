@@ -0,0 +1,52 @@
+# Generated by Django 5.1.1 on 2026-10-17 15:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('catalog', '0007_change_stamp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceRoster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_ids', models.BinaryField(default=b'', verbose_name='Élèves (int64 LE)')),
+                ('classroom', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.classroom', verbose_name='Classe')),
+                ('school_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.schoolyear', verbose_name='Année scolaire')),
+            ],
+            options={
+                'verbose_name': "Liste d'appel",
+                'verbose_name_plural': "Listes d'appel",
+                'constraints': [models.UniqueConstraint(fields=('classroom', 'school_year'), name='uniq_roster_class_year')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AttendanceSheet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('session', models.PositiveSmallIntegerField(choices=[(1, 'Matin'), (2, 'Après-midi')], default=1, verbose_name='Séance')),
+                ('absent', models.BinaryField(default=b'', verbose_name='Absents')),
+                ('late', models.BinaryField(default=b'', verbose_name='Retards')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('classroom', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_sheets', to='catalog.classroom', verbose_name='Classe')),
+                ('school_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.schoolyear', verbose_name='Année scolaire')),
+                ('taken_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Saisi par')),
+            ],
+            options={
+                'verbose_name': "Feuille d'appel",
+                'verbose_name_plural': "Feuilles d'appel",
+                'indexes': [models.Index(fields=['school_year', 'date', 'classroom'], name='idx_sheet_year_date')],
+                'constraints': [models.UniqueConstraint(fields=('classroom', 'date', 'session'), name='uniq_sheet_class_session')],
+            },
+        ),
+    ]
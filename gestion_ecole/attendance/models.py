@@ -0,0 +1,66 @@
+# attendance/models.py
+from django.conf import settings
+from django.db import models
+
+from catalog.models import Classroom, SchoolYear
+
+
+class AttendanceRoster(models.Model):
+    """
+    Correspondance bit -> élève pour une classe et une année : le bit i des
+    feuilles d'appel de la classe désigne student_ids[i]. Liste en ajout seul
+    (un élève arrivé en cours d'année prend la position suivante, un élève
+    parti garde la sienne) : toutes les feuilles de l'année partagent les
+    mêmes positions et s'additionnent colonne par colonne.
+    """
+    classroom = models.ForeignKey(Classroom, verbose_name="Classe", on_delete=models.CASCADE, related_name="+")
+    school_year = models.ForeignKey(SchoolYear, verbose_name="Année scolaire", on_delete=models.CASCADE, related_name="+")
+    student_ids = models.BinaryField("Élèves (int64 LE)", default=b"")  # cf. attendance/bitsets.py
+
+    class Meta:
+        verbose_name = "Liste d'appel"
+        verbose_name_plural = "Listes d'appel"
+        constraints = [
+            models.UniqueConstraint(fields=["classroom", "school_year"], name="uniq_roster_class_year"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.classroom_id} / {self.school_year_id} ({len(self.student_ids) // 8} élève(s))"
+
+
+class AttendanceSheet(models.Model):
+    """
+    Feuille d'appel d'une classe pour une demi-journée : une ligne par classe
+    et par séance, absences et retards en bitmaps (bit i = élève i de
+    AttendanceRoster). Un bit à 0 vaut « présent » : une feuille plus courte
+    que la liste (élève arrivé depuis) reste juste.
+    """
+    class Session(models.IntegerChoices):
+        MORNING = 1, "Matin"
+        AFTERNOON = 2, "Après-midi"
+
+    classroom = models.ForeignKey(Classroom, verbose_name="Classe", on_delete=models.CASCADE, related_name="attendance_sheets")
+    school_year = models.ForeignKey(SchoolYear, verbose_name="Année scolaire", on_delete=models.CASCADE, related_name="+")
+    date = models.DateField("Date")
+    session = models.PositiveSmallIntegerField("Séance", choices=Session.choices, default=Session.MORNING)
+    absent = models.BinaryField("Absents", default=b"")
+    late = models.BinaryField("Retards", default=b"")
+    taken_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, verbose_name="Saisi par",
+        on_delete=models.SET_NULL, null=True, blank=True, related_name="+",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Feuille d'appel"
+        verbose_name_plural = "Feuilles d'appel"
+        constraints = [
+            models.UniqueConstraint(fields=["classroom", "date", "session"], name="uniq_sheet_class_session"),
+        ]
+        indexes = [
+            # Bilan mensuel d'une école : un balayage d'index par année et période
+            models.Index(fields=["school_year", "date", "classroom"], name="idx_sheet_year_date"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.classroom_id} — {self.date:%d/%m/%Y} {self.get_session_display()}"
@@ -0,0 +1,119 @@
+# attendance/register.py
+"""
+Registre d'appel : une ligne par classe et par demi-journée (AttendanceSheet),
+absences et retards en bitmaps indexés par la liste d'appel de l'année
+(AttendanceRoster).
+
+- save_sheet() : appel d'une séance (liste complétée au besoin, un upsert) ;
+- load_sheet() : élèves absents / en retard d'une séance ;
+- monthly_totals() : absences et retards par élève et par classe sur une
+  période, toutes classes confondues, en une requête par table puis UN
+  unpackbits + add.reduceat sur la matrice des feuilles (bitsets.py).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+from django.db import transaction
+
+from .bitsets import column_counts, decode_ids, encode_ids, pack, stack, unpack
+from .models import AttendanceRoster, AttendanceSheet
+
+
+def ensure_roster(classroom, school_year, student_ids):
+    """Liste d'appel (ids int64, ordre des bits), complétée des élèves qui n'y sont pas encore."""
+    with transaction.atomic():
+        roster, _ = AttendanceRoster.objects.select_for_update().get_or_create(
+            classroom=classroom, school_year=school_year,
+        )
+        ids = decode_ids(roster.student_ids)
+        known = set(ids.tolist())
+        missing = sorted(sid for sid in set(student_ids) if sid not in known)
+        if missing:
+            ids = np.concatenate([ids, np.asarray(missing, dtype=np.int64)])
+            roster.student_ids = encode_ids(ids)
+            roster.save(update_fields=["student_ids"])
+    return ids
+
+
+def save_sheet(classroom, school_year, day, session, student_ids, absent_ids=(), late_ids=(), user=None):
+    """Enregistre l'appel d'une séance ; absent_ids / late_ids ⊂ student_ids."""
+    ids = ensure_roster(classroom, school_year, student_ids)
+    absent = np.isin(ids, np.asarray(list(absent_ids), dtype=np.int64))
+    late = np.isin(ids, np.asarray(list(late_ids), dtype=np.int64))
+    sheet, _ = AttendanceSheet.objects.update_or_create(
+        classroom=classroom, date=day, session=session,
+        defaults={"school_year": school_year, "absent": pack(absent), "late": pack(late), "taken_by": user},
+    )
+    return sheet
+
+
+def load_sheet(classroom, school_year, day, session):
+    """(feuille ou None, ids absents, ids en retard)."""
+    sheet = AttendanceSheet.objects.filter(classroom=classroom, date=day, session=session).first()
+    if sheet is None:
+        return None, set(), set()
+    roster = AttendanceRoster.objects.filter(classroom=classroom, school_year=school_year).first()
+    ids = decode_ids(roster.student_ids) if roster else np.zeros(0, dtype=np.int64)
+    absent = ids[unpack(sheet.absent, len(ids))]
+    late = ids[unpack(sheet.late, len(ids))]
+    return sheet, set(absent.tolist()), set(late.tolist())
+
+
+@dataclass
+class ClassAttendance:
+    classroom_id: int
+    sessions: int             # feuilles d'appel de la période
+    student_ids: np.ndarray   # liste d'appel (ordre des bits)
+    absences: np.ndarray      # demi-journées d'absence par élève
+    lates: np.ndarray         # retards par élève
+
+    @property
+    def total_absences(self) -> int:
+        return int(self.absences.sum())
+
+    @property
+    def total_lates(self) -> int:
+        return int(self.lates.sum())
+
+    @property
+    def absence_rate(self) -> float:
+        """Part des demi-journées élève manquées (%)."""
+        slots = self.sessions * len(self.student_ids)
+        return round(100 * self.total_absences / slots, 1) if slots else 0.0
+
+    def per_student(self) -> dict:
+        """{student_id: (absences, retards)}."""
+        return dict(zip(self.student_ids.tolist(), zip(self.absences.tolist(), self.lates.tolist())))
+
+
+def monthly_totals(school_year, start, end, classroom=None) -> dict:
+    """{classroom_id: ClassAttendance} pour les feuilles du `start` au `end` inclus."""
+    sheets = AttendanceSheet.objects.filter(school_year=school_year, date__range=(start, end))
+    if classroom is not None:
+        sheets = sheets.filter(classroom=classroom)
+    rows = list(sheets.order_by("classroom_id").values_list("classroom_id", "absent", "late"))
+    if not rows:
+        return {}
+    class_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    starts = np.flatnonzero(np.r_[True, class_ids[1:] != class_ids[:-1]])
+    groups = class_ids[starts].tolist()
+    rosters = {
+        cid: decode_ids(data)
+        for cid, data in AttendanceRoster.objects.filter(
+            school_year=school_year, classroom_id__in=groups,
+        ).values_list("classroom_id", "student_ids")
+    }
+    size = max((len(ids) for ids in rosters.values()), default=0)
+    width = (size + 7) // 8
+    absences = column_counts(stack([r[1] for r in rows], width), starts, size)
+    lates = column_counts(stack([r[2] for r in rows], width), starts, size)
+    sessions = np.diff(np.r_[starts, len(rows)])
+
+    out = {}
+    for g, cid in enumerate(groups):
+        ids = rosters.get(cid, np.zeros(0, dtype=np.int64))
+        out[cid] = ClassAttendance(
+            classroom_id=cid, sessions=int(sessions[g]), student_ids=ids,
+            absences=absences[g, :len(ids)], lates=lates[g, :len(ids)],
+        )
+    return out
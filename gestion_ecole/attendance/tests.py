@@ -0,0 +1,91 @@
+from datetime import date
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.models import Classroom, School, SchoolYear
+from core import active_context
+from students.models import Enrollment, Student
+from .bitsets import column_counts, pack, stack, unpack
+from .models import AttendanceSheet
+from .register import load_sheet, monthly_totals, save_sheet
+
+
+class BitsetTests(SimpleTestCase):
+    def test_pack_roundtrip_and_short_bitmap(self):
+        flags = [False, True, False, False, False, False, False, False, False, True]
+        data = pack(flags)
+        self.assertEqual(len(data), 2)
+        self.assertEqual(unpack(data, 12).tolist(), flags + [False, False])
+        self.assertEqual(pack([False] * 20), b"")  # personne : bitmap vide
+
+    def test_column_counts_per_group(self):
+        matrix = stack([pack([1, 0, 1]), pack([1, 1]), pack([0, 0, 1])], 1)
+        counts = column_counts(matrix, np.array([0, 2]), 3)
+        self.assertEqual(counts.tolist(), [[2, 1, 1], [0, 0, 1]])
+
+
+class AttendanceRegisterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        school = School.objects.create(name="École A")
+        cls.year = SchoolYear.objects.create(
+            school=school, label="2025-2026", start_date=date(2025, 10, 1), end_date=date(2026, 6, 30)
+        )
+        cls.classroom = Classroom.objects.create(school=school, label="CM1")
+        cls.students = []
+        for i in range(10):
+            student = Student.objects.create(last_name=f"Nom{i}", first_name="X", classroom=cls.classroom)
+            Enrollment.objects.create(student=student, classroom=cls.classroom, school_year=cls.year)
+            cls.students.append(student)
+        cls.user = get_user_model().objects.create_superuser("surveillant", "s@ecole.test", "x")
+
+    def test_monthly_totals(self):
+        ids = [s.pk for s in self.students]
+        a, b = ids[0], ids[9]
+        for day in (3, 4, 5):
+            save_sheet(self.classroom, self.year, date(2025, 11, day), 1, ids, absent_ids=[a], late_ids=[b])
+        save_sheet(self.classroom, self.year, date(2025, 11, 3), 2, ids, absent_ids=[a, b])
+        save_sheet(self.classroom, self.year, date(2025, 12, 1), 1, ids, absent_ids=ids)  # hors période
+        # élève arrivé en cours de mois : position ajoutée en fin de liste
+        newcomer = Student.objects.create(last_name="Nouveau", first_name="Y", classroom=self.classroom)
+        save_sheet(self.classroom, self.year, date(2025, 11, 6), 1, ids + [newcomer.pk], absent_ids=[newcomer.pk])
+
+        with self.assertNumQueries(2):  # feuilles + listes d'appel
+            totals = monthly_totals(self.year, date(2025, 11, 1), date(2025, 11, 30))
+        t = totals[self.classroom.pk]
+        self.assertEqual(t.sessions, 5)
+        per_student = t.per_student()
+        self.assertEqual(per_student[a], (4, 0))
+        self.assertEqual(per_student[b], (1, 3))
+        self.assertEqual(per_student[newcomer.pk], (1, 0))
+        self.assertEqual((t.total_absences, t.total_lates), (6, 3))
+
+        sheet, absent, late = load_sheet(self.classroom, self.year, date(2025, 11, 3), 1)
+        self.assertEqual((absent, late), ({a}, {b}))
+
+    def test_sheet_view_one_write(self):
+        active_context.clear_cache()
+        self.client.force_login(self.user)
+        self.client.get(reverse("switch_schoolyear", args=[self.year.pk]))
+        a, b = self.students[2].pk, self.students[5].pk
+        data = {"classroom": self.classroom.pk, "date": "2025-11-10", "session": 1, "absent": [a], "late": [b, a]}
+        response = self.client.post(reverse("attendance_sheet"), data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(AttendanceSheet.objects.count(), 1)
+        _, absent, late = load_sheet(self.classroom, self.year, date(2025, 11, 10), 1)
+        self.assertEqual((absent, late), ({a}, {b}))  # absent l'emporte sur retard
+
+        response = self.client.get(reverse("attendance_report"), {"month": "2025-11", "classroom": self.classroom.pk})
+        self.assertContains(response, "CM1")
+
+    def test_impossible_date_falls_back_to_today(self):
+        active_context.clear_cache()
+        self.client.force_login(self.user)
+        self.client.get(reverse("switch_schoolyear", args=[self.year.pk]))
+        response = self.client.get(reverse("attendance_sheet"), {"classroom": self.classroom.pk, "date": "2026-02-30"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["view"].day, timezone.localdate())
@@ -0,0 +1,11 @@
+# attendance/urls.py
+from django.urls import path
+
+from .views import AttendanceReportView, AttendanceSheetView
+
+urlpatterns = [
+    # Appel d'une séance : ?classroom=<id>&date=AAAA-MM-JJ&session=1|2
+    path("presences/", AttendanceSheetView.as_view(), name="attendance_sheet"),
+    # Bilan mensuel : ?month=AAAA-MM&classroom=<id>
+    path("presences/bilan/", AttendanceReportView.as_view(), name="attendance_report"),
+]
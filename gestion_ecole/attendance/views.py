@@ -0,0 +1,136 @@
+# attendance/views.py
+import calendar
+from datetime import date
+from urllib.parse import urlencode
+
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.shortcuts import redirect
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views.generic import TemplateView
+
+from catalog.models import Classroom
+from students.bulletins import class_students
+from .models import AttendanceSheet
+from .register import load_sheet, monthly_totals, save_sheet
+
+
+def _classrooms(request):
+    school = getattr(request, "active_school", None)
+    return list(Classroom.objects.filter(school=school).order_by("label")) if school else []
+
+
+def _day(raw):
+    """?date=AAAA-MM-JJ ; absente, mal formée ou impossible (2026-02-30) : aujourd'hui."""
+    try:
+        return parse_date(raw or "") or timezone.localdate()
+    except ValueError:
+        return timezone.localdate()
+
+
+def _pick(items, raw):
+    for item in items:
+        if str(item.pk) == str(raw):
+            return item
+    return items[0] if items else None
+
+
+# ——————————————————————————————————————
+#  Appel d'une séance (saisie en un geste par élève)
+# ——————————————————————————————————————
+class AttendanceSheetView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
+    """
+    GET /presences/?classroom=<id>&date=AAAA-MM-JJ&session=1|2 : tous présents
+    par défaut, on coche les absents (et retards) ; POST : une seule écriture
+    pour toute la classe (cf. attendance/register.py).
+    """
+    permission_required = "attendance.add_attendancesheet"
+    template_name = "attendance/sheet.html"
+
+    def setup_sheet(self, params):
+        self.school_year = getattr(self.request, "active_school_year", None)
+        self.classrooms = _classrooms(self.request)
+        self.classroom = _pick(self.classrooms, params.get("classroom"))
+        self.day = _day(params.get("date"))
+        session = params.get("session") or ""
+        self.session = int(session) if session in {str(s) for s in AttendanceSheet.Session.values} else (
+            AttendanceSheet.Session.MORNING if timezone.localtime().hour < 12 else AttendanceSheet.Session.AFTERNOON
+        )
+
+    def sheet_url(self):
+        params = {"classroom": self.classroom.pk, "date": self.day.isoformat(), "session": self.session}
+        return f"{reverse('attendance_sheet')}?{urlencode(params)}"
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx.update(
+            school_year=self.school_year, classrooms=self.classrooms, classroom=self.classroom,
+            day=self.day, session=self.session, sessions=AttendanceSheet.Session.choices,
+        )
+        if self.school_year and self.classroom:
+            sheet, absent, late = load_sheet(self.classroom, self.school_year, self.day, self.session)
+            ctx["sheet"] = sheet
+            ctx["rows"] = [
+                {"student": s, "absent": s.pk in absent, "late": s.pk in late}
+                for s in class_students(self.classroom, self.school_year)
+            ]
+        return ctx
+
+    def get(self, request, *args, **kwargs):
+        self.setup_sheet(request.GET)
+        return super().get(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        self.setup_sheet(request.POST)
+        if not (self.school_year and self.classroom):
+            messages.error(request, "Choisissez une année scolaire active et une classe.")
+            return redirect("attendance_sheet")
+        student_ids = list(class_students(self.classroom, self.school_year).values_list("pk", flat=True))
+        allowed = {str(pk): pk for pk in student_ids}
+        absent = {allowed[v] for v in request.POST.getlist("absent") if v in allowed}
+        late = {allowed[v] for v in request.POST.getlist("late") if v in allowed} - absent
+        save_sheet(self.classroom, self.school_year, self.day, self.session, student_ids, absent, late, request.user)
+        messages.success(
+            request, f"Appel du {self.day:%d/%m/%Y} enregistré : {len(absent)} absent(s), {len(late)} retard(s)."
+        )
+        return redirect(self.sheet_url())
+
+
+# ——————————————————————————————————————
+#  Bilan mensuel des absences
+# ——————————————————————————————————————
+class AttendanceReportView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
+    """GET /presences/bilan/?month=AAAA-MM&classroom=<id> : totaux par classe, détail par élève."""
+    permission_required = "attendance.view_attendancesheet"
+    template_name = "attendance/report.html"
+
+    def get_month(self):
+        today = timezone.localdate()
+        try:
+            year, month = map(int, (self.request.GET.get("month") or "").split("-"))
+            return date(year, month, 1)
+        except ValueError:
+            return today.replace(day=1)
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        school_year = getattr(self.request, "active_school_year", None)
+        classrooms = _classrooms(self.request)
+        selected = next((c for c in classrooms if str(c.pk) == self.request.GET.get("classroom")), None)
+        start = self.get_month()
+        end = start.replace(day=calendar.monthrange(start.year, start.month)[1])
+        ctx.update(school_year=school_year, classrooms=classrooms, selected=selected, month=start)
+        if school_year is None:
+            return ctx
+
+        totals = monthly_totals(school_year, start, end)
+        ctx["per_class"] = [(c, totals[c.pk]) for c in classrooms if c.pk in totals]
+        if selected is not None and selected.pk in totals:
+            counts = totals[selected.pk].per_student()
+            students = class_students(selected, school_year)
+            ctx["per_student"] = sorted(
+                ((s, *counts.get(s.pk, (0, 0))) for s in students), key=lambda row: (-row[1], -row[2]),
+            )
+        return ctx
@@ -0,0 +1,73 @@
+# catalog/cycle_cache.py
+"""
+Cycles et propositions de libellés du formulaire de classe, sérialisés une fois.
+
+Le JSON (cycles triés par nom, famille de presets de chacun, listes de
+presets) est construit à la première demande puis gardé en mémoire du
+processus. Sa version est l'empreinte du contenu : elle sert d'ETag à
+l'endpoint `classroom_presets` et de paramètre `?v=` dans le formulaire,
+ce qui permet au navigateur de garder le fichier en cache.
+
+Invalidé par les signaux de Cycle (catalog/signals.py) ; les autres
+workers se resynchronisent au plus tard après CATALOG_CACHE_TTL secondes.
+"""
+import hashlib
+import json
+import threading
+import time
+from typing import NamedTuple
+
+from django.conf import settings
+
+from .models import Cycle
+from .presets import CYCLE_FAMILIES, cycle_family
+
+
+class CyclePresets(NamedTuple):
+    version: str
+    body: bytes          # JSON prêt à servir
+    names: dict          # {id cycle: nom}
+
+
+_state = None  # (expiration, CyclePresets)
+_lock = threading.Lock()
+
+
+def _ttl() -> float:
+    return getattr(settings, "CATALOG_CACHE_TTL", 300)
+
+
+def _build():
+    cycles = list(Cycle.objects.order_by("name").values_list("id", "name"))
+    payload = {
+        "cycles": [{"id": pk, "name": name, "family": cycle_family(name)} for pk, name in cycles],
+        "families": {str(i): presets for i, (_, presets) in enumerate(CYCLE_FAMILIES, start=1)},
+    }
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+    return CyclePresets(hashlib.sha1(body).hexdigest()[:16], body, dict(cycles))
+
+
+def cycle_presets() -> CyclePresets:
+    global _state
+    now = time.monotonic()
+    state = _state
+    if state is not None and state[0] > now:
+        return state[1]
+    data = _build()
+    with _lock:
+        _state = (now + _ttl(), data)
+    return data
+
+
+def cycle_name(pk) -> str:
+    """Nom du cycle d'id `pk` (chaîne vide si inconnu), sans requête si le cache est chaud."""
+    try:
+        return cycle_presets().names.get(int(pk), "")
+    except (TypeError, ValueError):
+        return ""
+
+
+def clear_cache():
+    global _state
+    with _lock:
+        _state = None
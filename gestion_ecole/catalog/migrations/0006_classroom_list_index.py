@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-17 15:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_alter_classroom_options_alter_cycle_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='classroom',
+            index=models.Index(fields=['school', 'cycle', 'label'], name='idx_classroom_school_cycle'),
+        ),
+    ]
@@ -86,6 +86,10 @@ class Classroom(models.Model):
         ordering = ["label"]
         verbose_name = "Classe"
         verbose_name_plural = "Classes"
+        indexes = [
+            # Liste des classes filtrée par école / cycle, triée par nom
+            models.Index(fields=["school", "cycle", "label"], name="idx_classroom_school_cycle"),
+        ]
 
     def __str__(self) -> str:
         return self.label
@@ -104,3 +108,21 @@ class Subject(models.Model):
 
     def __str__(self) -> str:
         return self.name
+
+
+class ChangeStamp(models.Model):
+    """
+    Version « dernière modification » d'un modèle (clé : app_label.model),
+    incrémentée par les signaux (catalog/signals.py) ; sert d'ETag /
+    Last-Modified aux listes du paramétrage (cf. catalog/versions.py).
+    """
+    key = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Version de données"
+        verbose_name_plural = "Versions de données"
+
+    def __str__(self) -> str:
+        return f"{self.key} v{self.version}"
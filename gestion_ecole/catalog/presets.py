@@ -0,0 +1,75 @@
+# catalog/presets.py
+"""
+Propositions de libellés (classes, cycles, notation).
+
+presets_for_cycle_name() reconnaît la famille d'un cycle d'après son nom avec
+UNE expression régulière compilée au chargement du module (résultat mémorisé
+par nom). Les familles sont prioritaires dans l'ordre de CYCLE_FAMILIES
+(« Préscolaire » l'emporte même si le nom contient aussi « secondaire »),
+comme l'ancienne cascade de `if`.
+"""
+import re
+from functools import lru_cache
+
+# ——— Libellés de classes par cycle
+PRESETS_PRESCO = ["1ère Année", "2ème Année", "3ème Année"]  # limité à 3ème
+PRESETS_FOND1 = [
+    "1ère Année", "2ème Année", "3ème Année", "4ème Année", "5ème Année",
+    "6ème Année", "7ème Année", "8ème Année", "9ème Année",
+]
+PRESETS_FOND2 = ["7ème Année", "8ème Année", "9ème Année (DEF)"]
+PRESETS_SECONDAIRE = [
+    "10ème Année", "11ème Année", "12ème Année (Terminale)",
+    "1ère Année", "2ème Année", "2ème Année (CAP)",
+    "3ème Année (BT1)", "4ème Année (BT2)",
+]
+PRESETS_SUPERIEUR = [
+    "Licence 1", "Licence 2", "Licence 3",
+    "Master 1", "Master 2",
+    "Doctorat 1", "Doctorat 2",
+]
+
+# Suggestions pour le champ "Nom du cycle"
+CYCLE_PRESETS = [
+    "Préscolaire (Jardin d'enfant, Crèche)",
+    "Fondamental (1er Cycle)",
+    "Fondamental (2ème Cycle)",
+    "Secondaire (Lycée, Technique, Professionnel)",
+    "Supérieure (Universitaire)",
+]
+# Suggestions pour la notation
+NOTATION_PRESETS = [10, 20, 100]
+
+# (mots-clés du nom de cycle, libellés proposés) — par ordre de priorité
+CYCLE_FAMILIES = [
+    (("présco", "presco", "jardin", "crèche", "creche"), PRESETS_PRESCO),
+    (("1er cycle", "premier cycle"), PRESETS_FOND1),
+    (("2ème cycle", "2eme cycle", "deuxième cycle", "deuxieme cycle"), PRESETS_FOND2),
+    (("secondaire", "lycée", "lycee", "technique", "professionnel"), PRESETS_SECONDAIRE),
+    (("supérieure", "superieure", "universit"), PRESETS_SUPERIEUR),
+]
+
+# (mots-clés famille 1)|(mots-clés famille 2)|… : un seul parcours du nom ;
+# le plus petit numéro de groupe rencontré désigne la famille prioritaire.
+_FAMILY_RE = re.compile(
+    "|".join("(" + "|".join(re.escape(k) for k in keywords) + ")" for keywords, _ in CYCLE_FAMILIES),
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=256)  # quelques noms de cycles distincts seulement
+def cycle_family(cycle_name):
+    """Numéro (1…) de la famille du cycle dans CYCLE_FAMILIES, ou None."""
+    best = None
+    for m in _FAMILY_RE.finditer(cycle_name):
+        if best is None or m.lastindex < best:
+            best = m.lastindex
+            if best == 1:
+                break
+    return best
+
+
+def presets_for_cycle_name(cycle_name: str) -> list[str]:
+    """Retourne la liste de propositions de 'label' selon le nom du cycle."""
+    index = cycle_family(cycle_name or "")
+    return CYCLE_FAMILIES[index - 1][1] if index else []
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cycle_cache import clear_cache
+from .models import Classroom, Cycle, Grade, School, SchoolYear, Subject
+from .versions import bump, key_for
+
+User = get_user_model()
+
+# Tampon commun aux comptes : nom du professeur principal, droits affichés
+AUTH_KEY = "auth"
+
+
+# ——— Cycles + presets du formulaire de classe : reconstruits à la prochaine demande
+@receiver(post_save, sender=Cycle)
+@receiver(post_delete, sender=Cycle)
+def invalidate_cycle_presets(sender, **kwargs):
+    clear_cache()
+
+
+# ——— Tampons de version (GET conditionnels des listes du paramétrage)
+def bump_model_stamp(sender, **kwargs):
+    bump(key_for(sender))
+
+
+for model in (School, SchoolYear, Grade, Subject, Cycle, Classroom):
+    post_save.connect(bump_model_stamp, sender=model, dispatch_uid=f"stamp-{key_for(model)}")
+    post_delete.connect(bump_model_stamp, sender=model, dispatch_uid=f"stamp-{key_for(model)}-delete")
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Group)
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def bump_auth_stamp(sender, **kwargs):
+    if kwargs.get("update_fields") == frozenset({"last_login"}):
+        return  # connexion : rien d'affiché ne change, l'ETag reste valide
+    if kwargs.get("action", "post_").startswith("post_"):
+        bump(AUTH_KEY)
@@ -1,3 +1,137 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from core.testing import QueryBudgetMixin
+from .cycle_cache import clear_cache, cycle_presets
+from .models import ChangeStamp, Classroom, Cycle, Grade, School, SchoolYear, Subject
+
+
+class CatalogListsQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        teacher = get_user_model().objects.create_user("prof", first_name="Awa", last_name="Traoré")
+        for s in range(2):
+            school = School.objects.create(name=f"École {s}")
+            SchoolYear.objects.create(
+                school=school, label="2025-2026",
+                start_date=datetime.date(2025, 10, 1), end_date=datetime.date(2026, 7, 31),
+            )
+            for i in range(5):
+                cycle = Cycle.objects.create(name=f"Cycle {s}-{i}")
+                Grade.objects.create(school=school, name=f"Niveau {i}", level=i)
+                Subject.objects.create(school=school, name=f"Matière {i}")
+                Classroom.objects.create(school=school, cycle=cycle, label=f"Classe {i}", main_teacher=teacher)
+        cls.user = get_user_model().objects.create_superuser("direction", "d@ecole.test", "x")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_classroom_list(self):
+        self.assertQueryBudget("classroom_list")
+
+    def test_cycle_list(self):
+        self.assertQueryBudget("cycle_list")
+
+    def test_school_year_list(self):
+        self.assertQueryBudget("school_year_list")
+
+    def test_grade_list(self):
+        self.assertQueryBudget("grade_list")
+
+    def test_subject_list(self):
+        self.assertQueryBudget("subject_list")
+
+    def test_not_modified(self):
+        self.client.get("/settings/grades/")  # pose le cookie CSRF (il entre dans l'ETag)
+        etag = self.client.get("/settings/grades/")["ETag"]
+        with self.assertNumQueries(3):  # session, utilisateur, tampons de version
+            response = self.client.get("/settings/grades/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Grade.objects.create(school=School.objects.first(), name="Niveau 9", level=9)
+        self.assertEqual(self.client.get("/settings/grades/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_pending_messages_skip_not_modified(self):
+        self.client.get("/settings/cycles/")
+        etag = self.client.get("/settings/cycles/")["ETag"]
+        self.client.get(reverse("cycle_delete", args=[Cycle.objects.first().pk]))  # GET : message d'erreur
+        response = self.client.get("/settings/cycles/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Suppression invalide.")
+        self.assertFalse(response.has_header("ETag"))
+        # message affiché : la requête suivante peut de nouveau répondre 304
+        self.assertEqual(self.client.get("/settings/cycles/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_login_keeps_auth_stamp(self):
+        version = lambda: ChangeStamp.objects.filter(key="auth").values_list("version", flat=True).first()
+        before = version()
+        user_logged_in.send(sender=self.user.__class__, request=RequestFactory().get("/"), user=self.user)
+        self.assertEqual(version(), before)  # seul last_login a changé
+        self.user.first_name = "Awa"
+        self.user.save()
+        self.assertEqual(version(), (before or 0) + 1)
+
+
+class ClassroomListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from students.models import Student
+
+        school = School.objects.create(name="École A")
+        for label, capacity, pupils in (("CP", 2, 2), ("CE1", 10, 3), ("CE2", 0, 1)):
+            classroom = Classroom.objects.create(school=school, label=label, capacity=capacity)
+            for i in range(pupils):
+                Student.objects.create(last_name=f"{label}-{i}", first_name="X", classroom=classroom)
+        cls.user = get_user_model().objects.create_superuser("direction", "d@ecole.test", "x")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def rows(self, **params):
+        items = self.client.get("/settings/classes/", params).context["items"]
+        return [(c.label, c.student_count, c.utilisation) for c in items]
+
+    def test_counts_sort_and_filters(self):
+        self.assertEqual(self.rows(sort="-students"), [("CE1", 3, 30.0), ("CP", 2, 100.0), ("CE2", 1, None)])
+        self.assertEqual([r[0] for r in self.rows(sort="-utilisation")], ["CP", "CE1", "CE2"])
+        self.assertEqual(self.rows(full="1"), [("CP", 2, 100.0)])  # capacité 0 : jamais « pleine »
+        self.assertEqual([r[0] for r in self.rows(q="ce", sort="bogus")], ["CE1", "CE2"])  # tri inconnu : libellé
+
+    def test_etag_follows_headcounts(self):
+        from students.models import Student
+
+        self.client.get("/settings/classes/")  # cookie CSRF
+        etag = self.client.get("/settings/classes/")["ETag"]
+        self.assertEqual(self.client.get("/settings/classes/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Student.objects.create(last_name="Nouveau", first_name="X", classroom=Classroom.objects.get(label="CE2"))
+        self.assertEqual(self.client.get("/settings/classes/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ClassroomPresetsTests(TestCase):
+    def setUp(self):
+        clear_cache()
+        self.client.force_login(get_user_model().objects.create_superuser("direction", "d@ecole.test", "x"))
+
+    def test_versioned_json_and_invalidation(self):
+        Cycle.objects.create(name="Fondamental (2ème Cycle)")
+        url = reverse("classroom_presets")
+        response = self.client.get(url)
+        data = response.json()
+        self.assertEqual(data["cycles"][0]["name"], "Fondamental (2ème Cycle)")
+        self.assertIn("7ème Année", data["families"][str(data["cycles"][0]["family"])])
+        self.assertIn("max-age=0", response["Cache-Control"])
+        etag = response["ETag"]
+
+        version = cycle_presets().version
+        with self.assertNumQueries(2):  # session, utilisateur : JSON servi depuis le cache
+            response = self.client.get(url, {"v": version}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn(f"max-age={365 * 24 * 3600}", self.client.get(url, {"v": version})["Cache-Control"])
+
+        Cycle.objects.create(name="Secondaire")  # signal : cache vidé, nouvelle version
+        self.assertNotEqual(cycle_presets().version, version)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertContains(self.client.get(reverse("classroom_new")), cycle_presets().version)  # presets.json?v=<version>
@@ -32,6 +32,7 @@ urlpatterns = [
     # Classes
     path("settings/classes/", views.ClassroomListView.as_view(), name="classroom_list"),
     path("settings/classes/new", views.ClassroomCreateView.as_view(), name="classroom_new"),
+    path("settings/classes/presets.json", views.classroom_presets, name="classroom_presets"),
     path("settings/classes/<int:pk>/edit", views.ClassroomUpdateView.as_view(), name="classroom_edit"),
     path("settings/classes/<int:pk>/delete", views.ClassroomDeleteView.as_view(), name="classroom_delete"),
 
@@ -0,0 +1,42 @@
+# catalog/versions.py
+"""
+Tampons de version par modèle (table ChangeStamp) pour les GET conditionnels.
+
+- bump() : version + 1 et date de modification, appelé par les signaux
+  post_save / post_delete des modèles du paramétrage (catalog/signals.py) ;
+- stamps() : versions et dernière date de plusieurs clés, en UNE requête.
+
+Les tampons sont en base (et non en mémoire du processus) : tous les
+workers voient le même ETag. Le paramétrage ne change que quelques fois
+par an, la ligne d'un modèle n'est donc pas un point chaud.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ChangeStamp
+
+
+def key_for(model) -> str:
+    return model._meta.label_lower
+
+
+def bump(key: str) -> None:
+    now = timezone.now()
+    if ChangeStamp.objects.filter(key=key).update(version=F("version") + 1, changed_at=now):
+        return
+    try:
+        with transaction.atomic():
+            ChangeStamp.objects.create(key=key, version=1)
+    except IntegrityError:  # créée entre-temps par une autre requête
+        ChangeStamp.objects.filter(key=key).update(version=F("version") + 1, changed_at=now)
+
+
+def stamps(keys):
+    """({clé: version}, dernière date de modification | None) — clés jamais modifiées : version 0."""
+    rows = ChangeStamp.objects.filter(key__in=list(keys)).values_list("key", "version", "changed_at")
+    versions, last = dict.fromkeys(keys, 0), None
+    for key, version, changed_at in rows:
+        versions[key] = version
+        last = changed_at if last is None else max(last, changed_at)
+    return versions, last
@@ -3,6 +3,9 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Sous ASGI, les connexions MySQL passent par un pool par processus au lieu de
+connexions persistantes par thread (DJANGO_ASGI, DB_POOL_SIZE : cf. settings).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -12,5 +15,14 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DJANGO_ASGI', '1')  # lu par config/settings.py
 
 application = get_asgi_application()
+
+# Reçus PDF : premier rendu WeasyPrint fait au démarrage du worker (PDF_WARM_UP)
+from django.conf import settings  # noqa: E402
+
+if settings.PDF_WARM_UP:
+    from finance.receipts import warm_up  # noqa: E402
+
+    warm_up()
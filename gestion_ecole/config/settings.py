@@ -20,27 +20,6 @@ ALLOWED_HOSTS = [
     if h.strip()
 ]
 
-# Base de données MySQL
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.mysql",
-        "NAME": env("DB_NAME", default="gestion_ecole"),
-        "USER": env("DB_USER", default="ecole_user"),
-        "PASSWORD": env("DB_PASSWORD", default="motdepassefort"),
-        "HOST": env("DB_HOST", default="127.0.0.1"),
-        "PORT": env("DB_PORT", default="3306"),
-        "OPTIONS": {
-            "charset": "utf8mb4",
-            "init_command": "SET sql_mode='STRICT_ALL_TABLES'",
-        },
-    }
-}
-
-LANGUAGE_CODE = env("LANGUAGE_CODE", default="fr")
-TIME_ZONE = env("TIME_ZONE", default="Africa/Bamako")
-USE_I18N = True
-USE_TZ = True
-
 # Apps
 INSTALLED_APPS = [
     "django.contrib.admin",
@@ -53,27 +32,40 @@ INSTALLED_APPS = [
     "accounts",
     "catalog",
     "students",
+    "grading",
+    "attendance",
+    "finance",
     "core",
     
 ]
 
 MIDDLEWARE = [
+    "core.metrics.MetricsMiddleware",  # requêtes SQL / temps par vue, Server-Timing, /metrics
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.active_context.ActiveContextMiddleware",  # request.active_school / active_school_year
+    "core.db_routing.ReplicaPinMiddleware",  # lectures sur le primaire juste après une écriture
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
 
+# Gabarits : chargeur en cache (profil production, gabarits lus et compilés une
+# fois par processus) ; TEMPLATE_CACHE=False relit les fichiers à chaque rendu.
+TEMPLATE_CACHE = env.bool("TEMPLATE_CACHE", default=True)
+_template_loaders = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.debug",
@@ -81,32 +73,60 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "core.context_processors.active_context",
-                
+                "core.context_processors.layout",
             ],
-              # Optionnel : si tu veux éviter {% load core_extras %} dans chaque template
-              "builtins": ["core.templatetags.core_extras"],   # ✅ chemin complet
-              
+            "loaders": (
+                [("django.template.loaders.cached.Loader", _template_loaders)]
+                if TEMPLATE_CACHE else _template_loaders
+            ),
+            # Évite {% load core_extras %} dans chaque gabarit (bibliothèque chargée une fois par moteur)
+            "builtins": ["core.templatetags.core_extras"],
         },
     },
 ]
+# Menu latéral de base.html en cache par utilisateur / école (s) ; 0 = désactivé
+NAV_CACHE_TIMEOUT = env.int("NAV_CACHE_TIMEOUT", default=600)
 
 WSGI_APPLICATION = "config.wsgi.application"
 
 # Base de données MySQL
+# Connexions persistantes (WSGI) : DB_CONN_MAX_AGE secondes, vérifiées avant
+# réutilisation (CONN_HEALTH_CHECKS) ; 0 = une connexion par requête.
+# ASGI (config/asgi.py) : pas de connexion persistante par thread, mais un pool
+# par processus (DB_POOL_SIZE, 0 = sans pool ; cf. core/mysql_pool).
+ASGI = env.bool("DJANGO_ASGI", default=False)
+DB_POOL_SIZE = env.int("DB_POOL_SIZE", default=10)
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.mysql",
+        "ENGINE": "core.mysql_pool" if ASGI and DB_POOL_SIZE else "django.db.backends.mysql",
+        # Connexion : obligatoire dans l'environnement / .env (pas de valeur par défaut)
         "NAME": env("DB_NAME"),
         "USER": env("DB_USER"),
         "PASSWORD": env("DB_PASSWORD"),
         "HOST": env("DB_HOST"),
         "PORT": env("DB_PORT"),
+        "CONN_MAX_AGE": 0 if ASGI else env.int("DB_CONN_MAX_AGE", default=60),
+        "CONN_HEALTH_CHECKS": env.bool("DB_CONN_HEALTH_CHECKS", default=True),
+        "POOL_SIZE": DB_POOL_SIZE,
         "OPTIONS": {
             "charset": "utf8mb4",
             "init_command": "SET sql_mode='STRICT_ALL_TABLES'",
         },
     }
 }
+# Réplica en lecture (statistiques, listes, exports ; cf. core/db_routing.py)
+if env("DB_REPLICA_HOST", default=""):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": env("DB_REPLICA_HOST"),
+        "PORT": env("DB_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
+        "USER": env("DB_REPLICA_USER", default=DATABASES["default"]["USER"]),
+        "PASSWORD": env("DB_REPLICA_PASSWORD", default=DATABASES["default"]["PASSWORD"]),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["core.db_routing.ReplicaRouter"]
+# Après une écriture, l'utilisateur lit sur le primaire pendant ce délai (retard du réplica)
+DB_REPLICA_PIN_SECONDS = env.int("DB_REPLICA_PIN_SECONDS", default=10)
 
 # i18n
 LANGUAGE_CODE = env("LANGUAGE_CODE", default="fr")
@@ -124,11 +144,72 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Cache : CACHE_URL (django-environ), ex. "redis://127.0.0.1:6379/1" (paquet redis requis)
+# ou "pymemcache://127.0.0.1:11211" ; sans valeur : cache mémoire local au processus.
+CACHES = {"default": env.cache_url("CACHE_URL", default="locmemcache://")}
+
+# Sessions : la session ne contient que l'utilisateur et le contexte actif
+# (ids, cf. core/active_context.py).
+#   db             : table django_session, un SELECT par requête ;
+#   cached_db      : lue dans le cache, écrite aussi en base (défaut si CACHE_URL) ;
+#   signed_cookies : aucune lecture serveur, mais pas de révocation côté serveur ;
+#   autre valeur   : chemin complet d'un moteur de session.
+# cached_db suppose un cache PARTAGÉ entre workers (pas locmem) : sans CACHE_URL, db.
+SESSION_BACKENDS = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_BACKEND = env("SESSION_BACKEND", default="cached_db" if env("CACHE_URL", default="") else "db")
+SESSION_ENGINE = SESSION_BACKENDS.get(SESSION_BACKEND, SESSION_BACKEND)
+SESSION_COOKIE_AGE = env.int("SESSION_COOKIE_AGE", default=14 * 24 * 3600)
+SESSION_COOKIE_HTTPONLY = True
+# Nettoyage des sessions expirées (manage.py schedule_clearsessions), en secondes
+CLEARSESSIONS_INTERVAL = env.int("CLEARSESSIONS_INTERVAL", default=24 * 3600)
+
 LOGIN_URL = "/login/"
 LOGIN_REDIRECT_URL = "/dashboard/"
 LOGOUT_REDIRECT_URL = "/login/"
 
+# Recherche élèves : vide = choix selon le moteur (FULLTEXT MySQL / FTS5 SQLite),
+# sinon chemin d'une classe de students.search (ex. "students.search.BaseSearchBackend")
+STUDENT_SEARCH_BACKEND = env("STUDENT_SEARCH_BACKEND", default="")
+
+# Durée (s) du cache local école / année active (cf. core/active_context.py)
+ACTIVE_CONTEXT_TTL = env.int("ACTIVE_CONTEXT_TTL", default=300)
+# Idem pour les cycles / presets du formulaire de classe (cf. catalog/cycle_cache.py)
+CATALOG_CACHE_TTL = env.int("CATALOG_CACHE_TTL", default=300)
+# Anti-rebond du recalcul des résultats trimestriels (s) ; 0 = synchrone (cf. grading/results.py)
+RESULTS_DEBOUNCE = env.int("RESULTS_DEBOUNCE", default=5)
+# Identifiant de version déployée : entre dans les ETag des pages (nouveaux gabarits)
+RELEASE_ID = env("RELEASE_ID", default="")
+
+# Instrumentation (cf. core/metrics.py) ; /metrics : jeton Bearer METRICS_TOKEN,
+# ou sans jeton depuis METRICS_ALLOWED_IPS uniquement. Hors DEBUG, aucune IP par
+# défaut : derrière un proxy sur la même machine, REMOTE_ADDR vaut 127.0.0.1 pour
+# tout le monde. En production, définir METRICS_TOKEN (ou lister les IP du collecteur).
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=True)
+METRICS_SERVER_TIMING = env.bool("METRICS_SERVER_TIMING", default=True)
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+METRICS_ALLOWED_IPS = env.list("METRICS_ALLOWED_IPS", default=["127.0.0.1", "::1"] if DEBUG else [])
+# Requêtes SQL max par requête HTTP (session et utilisateur compris), par nom d'URL :
+# dépassement journalisé en production, échec des tests (core/testing.py)
+QUERY_BUDGETS = {
+    "dashboard": 4,
+    "student_list": 4,  # recherche ?q= (COUNT de la pagination numérotée) ; 3 sans recherche
+    "student_stats": 3,
+    "classroom_list": 8,
+    "cycle_list": 5,
+    "school_year_list": 5,
+    "grade_list": 4,
+    "subject_list": 4,
+    "honour_roll": 3,
+    "finance_home": 8,  # recherche ?q= (élèves trouvés) ; 7 sans recherche
+    "daily_cash": 4,
+}
 
-TEMPLATES[0]["OPTIONS"].setdefault("builtins", [])
-if "core.templatetags.core_extras" not in TEMPLATES[0]["OPTIONS"]["builtins"]:
-    TEMPLATES[0]["OPTIONS"]["builtins"].append("core.templatetags.core_extras")
+# Rendu PDF (bulletins, reçus) : nombre de processus WeasyPrint (0 = nb de CPU)
+PDF_WORKERS = env.int("PDF_WORKERS", default=0)
+# Reçus : WeasyPrint, feuille de style et polices chargés au démarrage de chaque
+# worker web (config/wsgi.py, config/asgi.py) plutôt qu'au premier reçu imprimé
+PDF_WARM_UP = env.bool("PDF_WARM_UP", default=False)
@@ -14,6 +14,9 @@ urlpatterns = [
     path("", include("accounts.urls")),
     path("", include("catalog.urls")),
     path("", include("students.urls")),
+    path("", include("grading.urls")),
+    path("", include("attendance.urls")),
+    path("", include("finance.urls")),
     path("", include("core.urls")),
 
 ]
@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Reçus PDF : premier rendu WeasyPrint fait au démarrage du worker (PDF_WARM_UP)
+from django.conf import settings  # noqa: E402
+
+if settings.PDF_WARM_UP:
+    from finance.receipts import warm_up  # noqa: E402
+
+    warm_up()
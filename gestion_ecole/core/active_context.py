@@ -0,0 +1,125 @@
+# core/active_context.py
+"""
+École / année scolaire actives, résolues une seule fois par requête.
+
+- Clés de session uniques : `active_school_id`, `active_schoolyear_id`,
+  `active_classroom_id` (l'ancienne clé `school_id` de catalog.switch_school
+  est reprise puis supprimée). Seuls des id sont stockés : la session tient
+  dans un cookie signé ou une entrée de cache (cf. SESSION_BACKEND) ;
+- activate() est le seul point d'écriture : il garde le contexte cohérent et
+  ne modifie la session (donc ne la réécrit) que si une valeur change ;
+- Cache local au processus avec TTL : une page ne coûte plus aucune requête
+  SQL pour ces deux objets. Invalidé par les signaux post_save/post_delete
+  de School et SchoolYear (core/signals.py) ; les autres workers se
+  resynchronisent au plus tard après ACTIVE_CONTEXT_TTL secondes.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from catalog.models import School, SchoolYear
+
+SESSION_SCHOOL_KEY = "active_school_id"
+SESSION_SCHOOLYEAR_KEY = "active_schoolyear_id"
+SESSION_CLASSROOM_KEY = "active_classroom_id"
+LEGACY_SCHOOL_KEY = "school_id"
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def _ttl() -> float:
+    return getattr(settings, "ACTIVE_CONTEXT_TTL", 300)
+
+
+def _querysets():
+    return {
+        School: School.objects.all(),
+        # __str__ de SchoolYear affiche l'école : on l'embarque
+        SchoolYear: SchoolYear.objects.select_related("school"),
+    }
+
+
+def get_cached(model, pk):
+    """Objet `model` d'id `pk` (ou None), servi depuis le cache tant qu'il est frais."""
+    key = (model, pk)
+    now = time.monotonic()
+    hit = _cache.get(key)
+    if hit is not None and hit[0] > now:
+        return hit[1]
+    obj = _querysets()[model].filter(pk=pk).first()
+    with _lock:
+        _cache[key] = (now + _ttl(), obj)
+    return obj
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+
+
+def resolve(request):
+    """Pose request.active_school / request.active_school_year (idempotent)."""
+    if hasattr(request, "active_school"):
+        return request.active_school, request.active_school_year
+
+    session = getattr(request, "session", None)
+    sid = syid = None
+    if session is not None:
+        sid = session.get(SESSION_SCHOOL_KEY)
+        if sid is None and LEGACY_SCHOOL_KEY in session:
+            sid = session[SESSION_SCHOOL_KEY] = session.pop(LEGACY_SCHOOL_KEY)
+        syid = session.get(SESSION_SCHOOLYEAR_KEY)
+
+    request.active_school = get_cached(School, sid) if sid else None
+    request.active_school_year = get_cached(SchoolYear, syid) if syid else None
+    return request.active_school, request.active_school_year
+
+
+def _set(session, key, value):
+    if value is None:
+        session.pop(key, None)  # ne marque la session modifiée que si la clé existait
+    elif session.get(key) != value:
+        session[key] = value
+
+
+def activate(request, school=None, school_year=None, classroom=None):
+    """
+    Change l'école / l'année / la classe actives (objets, ou None pour ne pas y toucher).
+    L'année cale l'école ; un changement d'école retire l'année d'une autre
+    école et la classe mémorisée.
+    """
+    session = request.session
+    previous = session.get(SESSION_SCHOOL_KEY)
+    if school_year is not None:
+        school_id = school_year.school_id
+        _set(session, SESSION_SCHOOLYEAR_KEY, school_year.pk)
+    else:
+        school_id = school.pk if school is not None else previous
+    _set(session, SESSION_SCHOOL_KEY, school_id)
+
+    if school_id != previous:
+        syid = session.get(SESSION_SCHOOLYEAR_KEY)
+        sy = get_cached(SchoolYear, syid) if syid else None
+        if sy is None or sy.school_id != school_id:
+            _set(session, SESSION_SCHOOLYEAR_KEY, None)
+        _set(session, SESSION_CLASSROOM_KEY, None)
+    if classroom is not None:
+        _set(session, SESSION_CLASSROOM_KEY, classroom.pk)
+
+    # request.active_* : résolus à nouveau au prochain resolve()
+    for attr in ("active_school", "active_school_year"):
+        request.__dict__.pop(attr, None)
+    return resolve(request)
+
+
+class ActiveContextMiddleware:
+    """À placer après SessionMiddleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        resolve(request)
+        return self.get_response(request)
@@ -1,8 +1,13 @@
-from catalog.models import School, SchoolYear
+from django.conf import settings
+
+from .active_context import resolve
 
 def active_context(request):
-    sid = request.session.get("active_school_id")
-    syid = request.session.get("active_schoolyear_id")
-    school = School.objects.filter(id=sid).first() if sid else None
-    sy = SchoolYear.objects.filter(id=syid).first() if syid else None
+    # Déjà résolu par ActiveContextMiddleware (cache local) : aucune requête SQL ici
+    school, sy = resolve(request)
     return {"active_school": school, "active_school_year": sy}
+
+
+def layout(request):
+    # Cache du menu latéral de base.html ({% cache NAV_CACHE_TIMEOUT nav … %})
+    return {"NAV_CACHE_TIMEOUT": settings.NAV_CACHE_TIMEOUT, "RELEASE_ID": settings.RELEASE_ID}
@@ -0,0 +1,84 @@
+# core/db_routing.py
+"""
+Lectures sur le réplica MySQL pour les vues lourdes en lecture seule.
+
+- ReplicaRouter : les lectures vont sur "replica" uniquement à l'intérieur
+  d'un bloc `replica_reads()` (ou d'une vue ReplicaReadMixin) ; tout le reste,
+  écritures comprises, reste sur "default" ;
+- ReplicaReadMixin : GET / HEAD d'une vue (rendu du gabarit compris, les
+  querysets étant évalués au rendu) sur le réplica ; bind_reads() pour un
+  queryset lu plus tard (StreamingHttpResponse) ;
+- ReplicaPinMiddleware : après une écriture (POST…), l'utilisateur lit sur le
+  primaire pendant DB_REPLICA_PIN_SECONDS (cookie) et voit donc ses propres
+  modifications malgré le retard de réplication.
+
+Sans DATABASES["replica"] (DB_REPLICA_HOST vide), tout reste sur "default".
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+REPLICA = "replica"
+PIN_COOKIE = "db_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_use_replica = ContextVar("use_replica", default=False)
+
+
+def replica_available() -> bool:
+    return REPLICA in settings.DATABASES
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    token = _use_replica.set(enabled and replica_available())
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def bind_reads(queryset):
+    """Fixe la base d'un queryset évalué APRÈS la vue (réponse en flux, exports)."""
+    return queryset.using(REPLICA) if _use_replica.get() else queryset
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return REPLICA if _use_replica.get() else None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # mêmes données des deux côtés
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
+
+
+class ReplicaReadMixin:
+    """À placer après LoginRequiredMixin / PermissionRequiredMixin."""
+
+    def dispatch(self, request, *args, **kwargs):
+        enabled = request.method in SAFE_METHODS and PIN_COOKIE not in request.COOKIES
+        with replica_reads(enabled):
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, "render") and not response.is_rendered:
+                response.render()
+        return response
+
+
+class ReplicaPinMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and replica_available():
+            response.set_cookie(
+                PIN_COOKIE, "1", max_age=settings.DB_REPLICA_PIN_SECONDS,
+                httponly=True, samesite="Lax", secure=request.is_secure(),
+            )
+        return response
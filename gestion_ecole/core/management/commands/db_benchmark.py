@@ -0,0 +1,70 @@
+"""
+Requêtes/s d'une page selon la gestion des connexions à la base.
+
+- nouvelle : CONN_MAX_AGE = 0, une connexion ouverte puis fermée par requête ;
+- persistante : CONN_MAX_AGE > 0 (WSGI), connexion réutilisée d'une requête à l'autre ;
+- pool : CONN_MAX_AGE = 0 mais connexion rendue au pool (ENGINE core.mysql_pool).
+
+Les requêtes passent par le client de test : request_started / request_finished
+ferment ou gardent la connexion exactement comme en production.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    help = "Compare les requêtes/s d'une page : connexion par requête, persistante, pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page", default="dashboard", help="Nom d'URL ou chemin (défaut : dashboard)")
+        parser.add_argument("--requests", type=int, default=200, help="Requêtes par mode")
+        parser.add_argument("--user", help="Identifiant de connexion (défaut : premier superutilisateur)")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **opts):
+        User = get_user_model()
+        users = User.objects.filter(username=opts["user"]) if opts["user"] else User.objects.filter(is_superuser=True)
+        user = users.order_by("pk").first()
+        if user is None:
+            raise CommandError("Aucun utilisateur pour se connecter (--user).")
+        path = opts["page"] if opts["page"].startswith("/") else reverse(opts["page"])
+
+        conn = connections[opts["database"]]
+        saved = {k: conn.settings_dict.get(k) for k in ("CONN_MAX_AGE", "POOL_SIZE")}
+        pooled_engine = conn.settings_dict["ENGINE"] == "core.mysql_pool"
+        modes = {
+            "nouvelle": {"CONN_MAX_AGE": 0, "POOL_SIZE": 0},
+            "persistante": {"CONN_MAX_AGE": 600, "POOL_SIZE": 0},
+            "pool": {"CONN_MAX_AGE": 0, "POOL_SIZE": saved["POOL_SIZE"] or 10},
+        }
+
+        self.stdout.write(f"{path} — {opts['requests']} requêtes par mode ({conn.vendor})")
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                client = Client()
+                client.force_login(user)
+                for name, params in modes.items():
+                    if name == "pool" and not pooled_engine:
+                        self.stdout.write(f"{name:<12} — (ENGINE core.mysql_pool requis : DJANGO_ASGI=1)")
+                        continue
+                    conn.close()
+                    conn.settings_dict.update(params)
+                    client.get(path)  # échauffement
+                    start = time.perf_counter()
+                    for _ in range(opts["requests"]):
+                        if client.get(path).status_code != 200:
+                            raise CommandError(f"{path} : réponse inattendue")
+                    elapsed = time.perf_counter() - start
+                    self.stdout.write(
+                        f"{name:<12}{opts['requests'] / elapsed:>10.0f} req/s"
+                        f"{elapsed / opts['requests'] * 1000:>10.2f} ms/req"
+                    )
+        finally:
+            conn.close()
+            conn.settings_dict.update(saved)
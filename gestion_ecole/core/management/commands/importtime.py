@@ -0,0 +1,113 @@
+"""
+Temps de démarrage d'un worker : `python -X importtime` dans un processus neuf.
+
+Phases mesurées (processus enfant, interpréteur froid) :
+- setup    : django.setup() (settings, applications, modèles, admin) ;
+- urlconf  : chargement de ROOT_URLCONF, donc de toutes les vues ;
+- total    : de l'import de django à la dernière vue résolue.
+Les lignes `import time:` (stderr) donnent les modules les plus coûteux.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Exécuté par l'enfant : aucune sortie sur stdout sauf le JSON final
+CHILD = """
+import json, time
+t0 = time.perf_counter()
+import django
+django.setup()
+t1 = time.perf_counter()
+from django.urls import URLPattern, get_resolver
+
+def walk(patterns):
+    n = 0
+    for p in patterns:
+        if isinstance(p, URLPattern):
+            p.callback  # vue importée
+            n += 1
+        else:
+            n += walk(p.url_patterns)
+    return n
+
+views = walk(get_resolver().url_patterns)
+t2 = time.perf_counter()
+print(json.dumps({"setup": t1 - t0, "urlconf": t2 - t1, "total": t2 - t0, "views": views}))
+"""
+
+
+def parse_importtime(stderr):
+    """{module: (self µs, cumulé µs)} d'après les lignes `import time:`."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # en-tête « self [us] | cumulative | imported package »
+        modules[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+    return modules
+
+
+class Command(BaseCommand):
+    help = "Mesure le temps de démarrage (django.setup + URLconf + vues) avec python -X importtime"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=3, help="Nombre de processus lancés (médiane)")
+        parser.add_argument("--top", type=int, default=15, help="Modules les plus lents à afficher")
+        parser.add_argument("--project", action="store_true", help="Seulement les modules du projet")
+        parser.add_argument("--budget-ms", type=float, help="Échec si le total médian dépasse ce budget")
+        parser.add_argument("--json", action="store_true", help="Sortie JSON (suivi en CI)")
+
+    def run_child(self):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get(
+            "DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE)}
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode:
+            raise CommandError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "échec")
+        return json.loads(proc.stdout.strip().splitlines()[-1]), parse_importtime(proc.stderr)
+
+    def handle(self, *args, **opts):
+        runs = [self.run_child() for _ in range(max(1, opts["repeat"]))]
+        phases = {
+            key: statistics.median(r[0][key] for r in runs) * 1000
+            for key in ("setup", "urlconf", "total")
+        }
+        # Modules : médiane du cumulé sur les exécutions où ils apparaissent
+        cumulative = {}
+        for _, modules in runs:
+            for name, (_, cum) in modules.items():
+                cumulative.setdefault(name, []).append(cum)
+        if opts["project"]:
+            local = {p.name for p in Path(settings.BASE_DIR).iterdir() if (p / "__init__.py").exists()}
+            cumulative = {m: v for m, v in cumulative.items() if m.split(".")[0] in local}
+        top = sorted(
+            ((m, statistics.median(v) / 1000) for m, v in cumulative.items()),
+            key=lambda item: -item[1],
+        )[:opts["top"]]
+
+        if opts["json"]:
+            self.stdout.write(json.dumps({
+                "phases_ms": phases, "views": runs[0][0]["views"],
+                "modules_ms": dict(top), "repeat": len(runs),
+            }, indent=2))
+        else:
+            self.stdout.write(
+                f"django.setup() : {phases['setup']:.1f} ms   URLconf + vues : {phases['urlconf']:.1f} ms   "
+                f"total : {phases['total']:.1f} ms   ({runs[0][0]['views']} vues, médiane sur {len(runs)})"
+            )
+            for name, ms in top:
+                self.stdout.write(f"{ms:9.1f} ms  {name}")
+
+        budget = opts["budget_ms"]
+        if budget is not None and phases["total"] > budget:
+            raise CommandError(f"Démarrage trop lent : {phases['total']:.1f} ms > {budget:.0f} ms")
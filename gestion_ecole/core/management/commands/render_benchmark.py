@@ -0,0 +1,89 @@
+"""
+Temps de réponse des pages principales selon le profil de gabarits.
+
+- avant : gabarits relus et compilés à chaque rendu, menu latéral non mis en cache ;
+- après : chargeur en cache + fragment {% cache %} du menu (profil production).
+
+Les pages sont demandées avec le client de test (middlewares, requêtes SQL et
+rendu compris) en tant qu'utilisateur connecté ; une session est créée en base.
+"""
+import json
+import statistics
+import time
+from copy import deepcopy
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import NoReverseMatch, reverse
+
+DEFAULT_PAGES = ["dashboard", "student_list", "student_stats", "classroom_list", "school_year_list", "cycle_list"]
+
+LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
+
+def templates_profile(cached):
+    templates = deepcopy(settings.TEMPLATES)
+    templates[0].pop("APP_DIRS", None)
+    templates[0]["OPTIONS"]["loaders"] = [("django.template.loaders.cached.Loader", LOADERS)] if cached else LOADERS
+    return templates
+
+
+class Command(BaseCommand):
+    help = "Compare le temps de rendu des pages sans / avec chargeur de gabarits et menu en cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Identifiant de connexion (défaut : premier superutilisateur)")
+        parser.add_argument("--page", action="append", help="Nom d'URL ou chemin (répétable)")
+        parser.add_argument("--repeat", type=int, default=20, help="Requêtes mesurées par page")
+        parser.add_argument("--json", action="store_true", help="Sortie JSON")
+
+    def handle(self, *args, **opts):
+        User = get_user_model()
+        users = User.objects.filter(username=opts["user"]) if opts["user"] else User.objects.filter(is_superuser=True)
+        user = users.order_by("pk").first()
+        if user is None:
+            raise CommandError("Aucun utilisateur pour se connecter (--user).")
+
+        pages = []
+        for page in opts["page"] or DEFAULT_PAGES:
+            try:
+                pages.append(page if page.startswith("/") else reverse(page))
+            except NoReverseMatch:
+                raise CommandError(f"URL inconnue : {page}")
+
+        profiles = {
+            "avant": (templates_profile(cached=False), 0),
+            "après": (templates_profile(cached=True), settings.NAV_CACHE_TIMEOUT or 600),
+        }
+        results = {path: {} for path in pages}
+        for name, (templates, nav_timeout) in profiles.items():
+            with override_settings(
+                TEMPLATES=templates, NAV_CACHE_TIMEOUT=nav_timeout,
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            ):
+                client = Client()
+                client.force_login(user)
+                for path in pages:
+                    status = client.get(path).status_code  # échauffement (gabarits, caches)
+                    if status != 200:
+                        raise CommandError(f"{path} : HTTP {status}")
+                    timings = []
+                    for _ in range(max(1, opts["repeat"])):
+                        start = time.perf_counter()
+                        client.get(path)
+                        timings.append((time.perf_counter() - start) * 1000)
+                    results[path][name] = statistics.median(timings)
+
+        if opts["json"]:
+            self.stdout.write(json.dumps(results, indent=2, ensure_ascii=False))
+            return
+        self.stdout.write(f"{'page':<28}{'avant (ms)':>12}{'après (ms)':>12}{'gain':>8}")
+        for path, row in results.items():
+            before, after = row["avant"], row["après"]
+            gain = (1 - after / before) * 100 if before else 0
+            self.stdout.write(f"{path:<28}{before:>12.1f}{after:>12.1f}{gain:>7.0f}%")
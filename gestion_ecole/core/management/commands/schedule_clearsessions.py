@@ -0,0 +1,52 @@
+"""
+Purge périodique des sessions expirées (`clearsessions`), hors du chemin des requêtes.
+
+À lancer comme processus de fond (systemd, supervisor…) :
+    python manage.py schedule_clearsessions
+ou depuis cron avec --once. Sans effet avec les sessions en cookie signé
+(rien n'est stocké côté serveur).
+"""
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = "Exécute clearsessions toutes les CLEARSESSIONS_INTERVAL secondes (ou une fois avec --once)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Une seule purge puis sortie (cron)")
+        parser.add_argument("--every", type=int, help="Intervalle en secondes (défaut : CLEARSESSIONS_INTERVAL)")
+
+    def purge(self):
+        start = time.monotonic()
+        try:
+            call_command("clearsessions")
+        finally:
+            connections.close_all()  # pas de connexion gardée ouverte entre deux purges, ni après un échec
+        self.stdout.write(f"Sessions expirées purgées ({time.monotonic() - start:.1f} s)")
+
+    def handle(self, *args, **opts):
+        if settings.SESSION_ENGINE.endswith("signed_cookies"):
+            self.stdout.write("Sessions en cookie signé : rien à purger.")
+            return
+        if opts["once"]:
+            self.purge()
+            return
+
+        every = opts["every"] or settings.CLEARSESSIONS_INTERVAL
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+        self.stdout.write(f"Purge des sessions toutes les {every} s (Ctrl+C pour arrêter)")
+        while not stop.is_set():
+            try:
+                self.purge()
+            except Exception as exc:  # base momentanément indisponible : on réessaie au prochain tour
+                self.stderr.write(f"Échec de la purge : {exc}")
+            stop.wait(every)
@@ -0,0 +1,212 @@
+# core/metrics.py
+"""
+Instrumentation des requêtes : nombre de requêtes SQL, temps base de données,
+temps de rendu des gabarits, taille de la réponse.
+
+- MetricsMiddleware : mesure chaque requête (execute_wrapper sur toutes les
+  connexions), ajoute l'en-tête `Server-Timing` (visible dans l'onglet
+  Réseau du navigateur) et alimente le registre ;
+- QUERY_BUDGETS (settings) : {nom d'URL: requêtes SQL max} ; un dépassement
+  est journalisé et compté (les tests le vérifient, cf. core/testing.py) ;
+- registry.render() : format texte Prometheus, servi par /metrics.
+
+Le registre est propre à chaque processus : chaque série porte le label
+`worker` (pid) et Prometheus additionne les workers à la requête.
+Les réponses en flux (exports) ne comptent que ce qui précède le flux.
+"""
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (1, 3, 5, 10, 25, 50, 100)
+
+_current = ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "template_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper : une requête SQL (executemany compte pour une)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+def install_template_timer():
+    """Chronomètre Template.render du moteur Django (render(), TemplateResponse)."""
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, "timed", False):
+        return
+    original = Template.render
+
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return original(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            stats.template_time += time.perf_counter() - start
+
+    render.timed = True
+    Template.render = render
+
+
+# ——— Registre (format Prometheus)
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # dernier : +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class _ViewStats:
+    __slots__ = ("duration", "queries", "db_time", "template_time", "bytes", "over_budget")
+
+    def __init__(self):
+        self.duration = _Histogram(DURATION_BUCKETS)
+        self.queries = _Histogram(QUERY_BUCKETS)
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.bytes = 0
+        self.over_budget = 0
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, view, method, status, duration, stats, size, over_budget):
+        key = (view, method, str(status))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _ViewStats()
+            series.duration.observe(duration)
+            series.queries.observe(stats.queries)
+            series.db_time += stats.db_time
+            series.template_time += stats.template_time
+            series.bytes += size
+            series.over_budget += over_budget
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        worker = os.getpid()
+        with self._lock:
+            items = [
+                (f'view="{_label(view)}",method="{method}",status="{status}",worker="{worker}"', series)
+                for (view, method, status), series in sorted(self._series.items())
+            ]
+            out = []
+
+            def header(name, kind, help_text):
+                out.append(f"# HELP {name} {help_text}")
+                out.append(f"# TYPE {name} {kind}")
+
+            for name, attr, help_text in (
+                ("ecole_request_duration_seconds", "duration", "Durée des requêtes HTTP"),
+                ("ecole_request_queries", "queries", "Requêtes SQL par requête HTTP"),
+            ):
+                header(name, "histogram", help_text)
+                for labels, series in items:
+                    hist, cumulative = getattr(series, attr), 0
+                    for bound, count in zip((*hist.bounds, "+Inf"), hist.counts):
+                        cumulative += count
+                        out.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    out.append(f"{name}_sum{{{labels}}} {hist.sum:.6f}")
+                    out.append(f"{name}_count{{{labels}}} {cumulative}")
+
+            for name, attr, help_text in (
+                ("ecole_db_seconds_total", "db_time", "Temps passé en base de données"),
+                ("ecole_template_seconds_total", "template_time", "Temps de rendu des gabarits"),
+                ("ecole_response_bytes_total", "bytes", "Octets de réponse (hors flux)"),
+                ("ecole_query_budget_exceeded_total", "over_budget", "Requêtes HTTP au-delà de QUERY_BUDGETS"),
+            ):
+                header(name, "counter", help_text)
+                for labels, series in items:
+                    out.append(f"{name}{{{labels}}} {getattr(series, attr)}")
+        return "\n".join(out) + "\n"
+
+
+registry = Registry()
+
+
+def view_name(request):
+    match = getattr(request, "resolver_match", None)
+    # nom d'URL (cardinalité bornée) ; jamais le chemin brut
+    return match.view_name if match else "unresolved"
+
+
+class MetricsMiddleware:
+    """À placer en tête de MIDDLEWARE (les requêtes de session / auth sont comptées)."""
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install_template_timer()
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        duration = time.perf_counter() - start
+
+        view = view_name(request)
+        budget = settings.QUERY_BUDGETS.get(view)
+        over = budget is not None and stats.queries > budget
+        if over:
+            logger.warning("%s : %d requêtes SQL (budget %d) — %s", view, stats.queries, budget, request.path)
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(view, request.method, response.status_code, duration, stats, size, int(over))
+
+        if settings.METRICS_SERVER_TIMING:
+            response["Server-Timing"] = (
+                f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} req. SQL", '
+                f"tpl;dur={stats.template_time * 1000:.1f}, "
+                f"total;dur={duration * 1000:.1f}"
+            )
+        return response
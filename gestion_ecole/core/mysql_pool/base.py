@@ -0,0 +1,72 @@
+# core/mysql_pool/base.py
+"""
+Moteur MySQL avec un pool de connexions par processus (ENGINE "core.mysql_pool").
+
+Sous ASGI, les vues synchrones s'exécutent dans des threads de sync_to_async :
+des connexions persistantes par thread s'accumuleraient, d'où CONN_MAX_AGE = 0
+(cf. config/settings.py). Sans pool, chaque requête paierait alors connexion
+TCP/TLS, authentification et init_command. Ici, fermer la connexion la rend au
+pool (après rollback) ; elle est vérifiée (ping) avant d'être reprise.
+
+DATABASES[...]["POOL_SIZE"] : connexions inactives gardées au plus (0 = sans pool).
+Une connexion fermée en pleine transaction ou après une erreur n'est pas réutilisée.
+"""
+import os
+import queue
+import threading
+
+from django.db.backends.mysql import base as mysql
+
+_pools = {}
+_lock = threading.Lock()
+
+
+def _discard(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+class DatabaseWrapper(mysql.DatabaseWrapper):
+    def _pool(self):
+        size = self.settings_dict.get("POOL_SIZE") or 0
+        if size <= 0:
+            return None
+        key = (os.getpid(), self.alias)  # pas de partage de sockets après un fork
+        with _lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = queue.LifoQueue(maxsize=size)
+        return pool
+
+    def get_new_connection(self, conn_params):
+        pool = self._pool()
+        while pool is not None:
+            try:
+                connection = pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                connection.ping()
+                return connection
+            except Exception:
+                _discard(connection)  # coupée par le serveur (wait_timeout…)
+        return super().get_new_connection(conn_params)
+
+    def _close(self):
+        pool = self._pool()
+        if self.connection is None or pool is None or self.in_atomic_block or self.errors_occurred:
+            return super()._close()
+        connection = self.connection
+        try:
+            connection.rollback()
+            pool.put_nowait(connection)
+        except Exception:  # pool plein, connexion inutilisable
+            _discard(connection)
+
+
+def pool_stats():
+    """{alias: connexions inactives} pour le processus courant."""
+    pid = os.getpid()
+    return {alias: pool.qsize() for (p, alias), pool in _pools.items() if p == pid}
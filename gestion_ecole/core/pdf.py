@@ -0,0 +1,141 @@
+# core/pdf.py
+"""
+Rendu PDF (WeasyPrint) partagé : bulletins, reçus…
+
+- Feuilles de style et polices chargées UNE fois par processus (worker) :
+  c'est l'essentiel du coût d'un appel WeasyPrint. `warm_up` fait aussi un
+  premier rendu (Pango, fontconfig) avant la première vraie demande.
+- `render_many` répartit le travail sur UN pool de processus par processus
+  web, créé au premier besoin (PDF_WORKERS workers) puis gardé : ses workers
+  conservent feuilles de style et polices d'une requête à l'autre, et des
+  requêtes simultanées se partagent ces workers au lieu d'en lancer chacune.
+  Les workers ne reçoivent que du HTML déjà rendu par Django (aucun accès
+  base) ; ce module n'importe donc rien de Django au chargement ("spawn").
+"""
+import atexit
+import io
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+# Cache par processus : (chemins CSS) -> (FontConfiguration, [CSS])
+_assets = {}
+
+WARM_UP_HTML = "<!DOCTYPE html><html><body><p>—</p></body></html>"
+
+# Pool partagé du processus (cf. _shared_pool)
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _load_assets(css_paths):
+    key = tuple(css_paths)
+    if key not in _assets:
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+
+        font_config = FontConfiguration()
+        _assets[key] = (font_config, [CSS(filename=p, font_config=font_config) for p in key])
+    return _assets[key]
+
+
+def render_pdf(html, css_paths=(), base_url=None) -> bytes:
+    from weasyprint import HTML
+
+    font_config, stylesheets = _load_assets(css_paths)
+    return HTML(string=html, base_url=base_url).write_pdf(
+        stylesheets=stylesheets, font_config=font_config
+    )
+
+
+def warm_up(css_paths=(), base_url=None) -> None:
+    """Charge feuilles de style et polices et fait un premier rendu jetable."""
+    render_pdf(WARM_UP_HTML, css_paths, base_url)
+
+
+def _render_task(args):
+    key, html, css_paths, base_url = args
+    return key, render_pdf(html, css_paths, base_url)
+
+
+def default_workers() -> int:
+    try:
+        from django.conf import settings
+
+        configured = getattr(settings, "PDF_WORKERS", 0)
+    except ImportError:
+        configured = 0
+    return configured or os.cpu_count() or 1
+
+
+def _new_pool(workers):
+    return ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"), initializer=warm_up)
+
+
+def _shared_pool():
+    """Pool de default_workers() processus, créé au premier appel puis réutilisé."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _new_pool(default_workers())
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def _discard_pool(pool):
+    """Pool cassé (worker tué) : le prochain appel en recrée un."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def render_many(items, css_paths=(), base_url=None, workers=None):
+    """
+    items : [(clé, html)] -> itère [(clé, pdf_bytes)] dans le même ordre.
+    Un seul worker (ou un seul document) : rendu dans le processus courant.
+    workers=None : pool partagé du processus ; un nombre explicite (commande
+    generate_bulletins --workers) : pool dédié, fermé à la fin.
+    """
+    items = list(items)
+    size = workers or default_workers()
+    tasks = [(key, html, tuple(css_paths), base_url) for key, html in items]
+    if min(size, len(tasks)) <= 1:
+        yield from map(_render_task, tasks)
+        return
+    chunksize = max(1, len(tasks) // (size * 4))
+    if workers:
+        with _new_pool(min(size, len(tasks))) as pool:
+            yield from pool.map(_render_task, tasks, chunksize=chunksize)
+        return
+    pool = _shared_pool()
+    try:
+        yield from pool.map(_render_task, tasks, chunksize=chunksize)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+
+
+def merge_pdfs(pdfs) -> bytes:
+    """Concatène des PDF (bytes) en un seul document."""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for data in pdfs:
+        writer.append(io.BytesIO(data))
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def zip_pdfs(named_pdfs) -> bytes:
+    """[(nom_fichier, pdf_bytes)] -> archive ZIP (les PDF sont déjà compressés)."""
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name, data in named_pdfs:
+            zf.writestr(name, data)
+    return out.getvalue()
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from catalog.models import School, SchoolYear
+from .active_context import clear_cache
+
+
+# ——— École / année actives : le cache local est vidé à chaque modification
+@receiver(post_save, sender=School)
+@receiver(post_delete, sender=School)
+@receiver(post_save, sender=SchoolYear)
+@receiver(post_delete, sender=SchoolYear)
+def invalidate_active_context(sender, **kwargs):
+    clear_cache()
@@ -1,5 +1,6 @@
 # core/templatetags/core_extras.py
 from django import template
+from django.utils.html import format_html
 
 register = template.Library()
 
@@ -9,3 +10,27 @@ def get_item(d, key):
     if isinstance(d, dict):
         return d.get(key, 0)
     return 0
+
+
+@register.simple_tag
+def student_photo(student, size=64, css_class=""):
+    """
+    Vignette d'élève : <picture> WebP + JPEG avec srcset (1x/2x), chargement
+    différé. Jamais l'original. Sans photo : avatar par défaut selon le sexe.
+        {% student_photo s 64 "avatar" %}
+    """
+    from students.photos import default_photo_url, photo_sources
+
+    size = int(size)
+    sources = photo_sources(student, size)
+    if sources is None:
+        return format_html(
+            '<img src="{}" alt="" width="{}" height="{}" class="{}" loading="lazy" decoding="async">',
+            default_photo_url(student), size, size, css_class,
+        )
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}">'
+        '<img src="{}" srcset="{}" alt="{}" width="{}" height="{}" class="{}" loading="lazy" decoding="async">'
+        "</picture>",
+        sources["webp"], sources["src"], sources["jpg"], student, size, size, css_class,
+    )
@@ -0,0 +1,31 @@
+# core/testing.py
+"""
+Aides de test : budgets de requêtes SQL par vue (cf. settings.QUERY_BUDGETS).
+
+    class StudentListTests(QueryBudgetMixin, TestCase):
+        def test_budget(self):
+            self.assertQueryBudget("student_list")
+
+Le budget couvre la requête HTTP entière (session et utilisateur compris) ; les
+données de test doivent compter plusieurs lignes, sinon un N+1 passe inaperçu.
+"""
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+class QueryBudgetMixin:
+    def assertQueryBudget(self, url_name, *args, budget=None, data=None):
+        """GET de la page (après un premier GET d'échauffement) en au plus `budget` requêtes."""
+        if budget is None:
+            budget = settings.QUERY_BUDGETS[url_name]
+        url = reverse(url_name, args=args)
+        self.client.get(url, data)  # caches du processus (contexte actif, presets…)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, data)
+        self.assertEqual(response.status_code, 200)
+        if len(ctx) > budget:
+            queries = "\n".join(f"  {i}. {q['sql']}" for i, q in enumerate(ctx.captured_queries, 1))
+            self.fail(f"{url_name} : {len(ctx)} requêtes SQL, budget {budget}\n{queries}")
+        return response
@@ -1,3 +1,267 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.http import HttpResponse
+from django.urls import reverse
+from django.views.generic import TemplateView
+
+from catalog.models import Classroom, School, SchoolYear
+from students.models import Enrollment, Student
+from . import active_context, db_routing
+from .management.commands.importtime import parse_importtime
+from .metrics import registry
+from .testing import QueryBudgetMixin
+
+
+class DashboardQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        school = School.objects.create(name="École A")
+        for i in range(5):
+            classroom = Classroom.objects.create(school=school, label=f"Classe {i}", capacity=0)
+            Student.objects.create(last_name=f"Nom{i}", first_name="X", classroom=classroom)
+        cls.user = get_user_model().objects.create_superuser("direction", "d@ecole.test", "x")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_dashboard(self):
+        self.assertQueryBudget("dashboard")
+
+    def test_enrollment_count_needs_an_active_year(self):
+        response = self.client.get("/dashboard/")
+        self.assertEqual(response.context["stats"]["students"], 5)
+        self.assertIsNone(response.context["stats"]["enrollments"])  # effectif ≠ inscriptions
+        school = School.objects.get()
+        year = SchoolYear.objects.create(
+            school=school, label="2025-2026", start_date=datetime.date(2025, 10, 1), end_date=datetime.date(2026, 6, 30),
+        )
+        for student in Student.objects.all()[:2]:
+            Enrollment.objects.create(student=student, classroom=student.classroom, school_year=year)
+        active_context.clear_cache()
+        self.client.get(reverse("switch_schoolyear", args=[year.pk]))
+        self.assertEqual(self.client.get("/dashboard/").context["stats"]["enrollments"], 2)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.client.force_login(get_user_model().objects.create_superuser("direction", "d@ecole.test", "x"))
+
+    @override_settings(METRICS_ALLOWED_IPS=["127.0.0.1"])
+    def test_server_timing_and_prometheus_text(self):
+        response = self.client.get("/dashboard/")
+        self.assertIn("db;dur=", response["Server-Timing"])
+        body = self.client.get("/metrics", REMOTE_ADDR="127.0.0.1").content.decode()
+        self.assertIn('ecole_request_queries_count{view="dashboard",method="GET",status="200"', body)
+        self.assertIn("# TYPE ecole_request_duration_seconds histogram", body)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token_required(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_ALLOWED_IPS=[])
+    def test_closed_without_token_or_allowed_ip(self):
+        # défaut hors DEBUG : même 127.0.0.1 (proxy local) n'y a pas accès
+        self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="127.0.0.1").status_code, 403)
+
+
+class ActiveContextTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = School.objects.create(name="École A")
+        cls.other = School.objects.create(name="École B")
+        cls.year = SchoolYear.objects.create(
+            school=cls.school, label="2025-2026",
+            start_date=datetime.date(2025, 10, 1), end_date=datetime.date(2026, 7, 31),
+        )
+        cls.classroom = Classroom.objects.create(school=cls.school, label="CP")
+
+    def setUp(self):
+        active_context.clear_cache()
+
+    def _request(self, **session):
+        request = RequestFactory().get("/")
+        request.session = SessionStore()
+        request.session.update(session)
+        return request
+
+    def test_cache_invalidated_on_save(self):
+        self.assertEqual(active_context.get_cached(School, self.school.pk).name, "École A")
+        with self.assertNumQueries(0):
+            active_context.get_cached(School, self.school.pk)
+        School.objects.filter(pk=self.school.pk).update(name="Sans signal")
+        self.assertEqual(active_context.get_cached(School, self.school.pk).name, "École A")  # TTL
+        self.school.name = "École A'"
+        self.school.save()
+        self.assertEqual(active_context.get_cached(School, self.school.pk).name, "École A'")
+
+        active_context.get_cached(SchoolYear, self.year.pk)
+        self.year.label = "2026-2027"
+        self.year.save()
+        self.assertEqual(active_context.get_cached(SchoolYear, self.year.pk).label, "2026-2027")
+
+    def test_legacy_session_key_migrated(self):
+        request = self._request(school_id=self.school.pk)
+        school, year = active_context.resolve(request)
+        self.assertEqual(school, self.school)
+        self.assertIsNone(year)
+        self.assertNotIn(active_context.LEGACY_SCHOOL_KEY, request.session)
+        self.assertEqual(request.session[active_context.SESSION_SCHOOL_KEY], self.school.pk)
+
+    def test_activate_writes_session_keys(self):
+        request = self._request()
+        active_context.activate(request, school_year=self.year, classroom=self.classroom)
+        self.assertEqual(dict(request.session), {
+            active_context.SESSION_SCHOOL_KEY: self.school.pk,
+            active_context.SESSION_SCHOOLYEAR_KEY: self.year.pk,
+            active_context.SESSION_CLASSROOM_KEY: self.classroom.pk,
+        })
+        self.assertEqual((request.active_school, request.active_school_year), (self.school, self.year))
+
+        # autre école : l'année et la classe de la précédente sont retirées
+        active_context.activate(request, school=self.other)
+        self.assertEqual(dict(request.session), {active_context.SESSION_SCHOOL_KEY: self.other.pk})
+        self.assertIsNone(request.active_school_year)
+
+    def test_activate_leaves_unchanged_session_untouched(self):
+        request = self._request()
+        active_context.activate(request, school_year=self.year)
+        request.session.modified = False
+        active_context.activate(request, school=self.school)
+        self.assertFalse(request.session.modified)
+
+
+class ImportTimeCommandTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:      1500 |       4200 | catalog.views\n"
+            "Traceback : ligne ignorée\n"
+        )
+        self.assertEqual(parse_importtime(stderr), {"_io": (120, 120), "catalog.views": (1500, 4200)})
+
+    def test_json_report_and_budget(self):
+        out = io.StringIO()
+        call_command("importtime", repeat=1, top=3, project=True, json=True, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["repeat"], 1)
+        self.assertGreater(report["views"], 0)
+        self.assertLessEqual(report["phases_ms"]["setup"], report["phases_ms"]["total"])
+        self.assertLessEqual(len(report["modules_ms"]), 3)
+        self.assertTrue(all(m.split(".")[0] != "django" for m in report["modules_ms"]))
+        with self.assertRaisesMessage(CommandError, "Démarrage trop lent"):
+            call_command("importtime", repeat=1, budget_ms=0.001, stdout=io.StringIO())
+
+
+@override_settings(NAV_CACHE_TIMEOUT=600)
+class NavFragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = School.objects.create(name="École A")
+        cls.other = School.objects.create(name="École B")
+        User = get_user_model()
+        cls.user = User.objects.create_superuser("direction", "d@ecole.test", "x")
+        cls.second = User.objects.create_superuser("adjoint", "a@ecole.test", "x")
+
+    def setUp(self):
+        cache.clear()
+        active_context.clear_cache()
+
+    def _key(self, user, school):
+        return make_template_fragment_key("nav", [user.pk, school.pk, settings.RELEASE_ID])
+
+    def _visit(self, user, school):
+        self.client.force_login(user)
+        self.client.get(reverse("switch_school", args=[school.pk]))
+        self.assertEqual(self.client.get("/dashboard/").status_code, 200)
+
+    def test_key_per_user_and_active_school(self):
+        self._visit(self.user, self.school)
+        self.assertIsNotNone(cache.get(self._key(self.user, self.school)))
+        self.assertIsNone(cache.get(self._key(self.second, self.school)))
+        self.assertIsNone(cache.get(self._key(self.user, self.other)))
+
+        self._visit(self.user, self.other)
+        self._visit(self.second, self.school)
+        keys = {self._key(u, s) for u in (self.user, self.second) for s in (self.school, self.other)}
+        self.assertEqual(len(keys), 4)
+        self.assertIsNotNone(cache.get(self._key(self.user, self.other)))
+        self.assertIsNotNone(cache.get(self._key(self.second, self.school)))
+        self.assertIsNone(cache.get(self._key(self.second, self.other)))
+
+
+# Pas de base « replica » en test : replica_available() est forcé, aucune
+# requête n'est exécutée (on ne lit que le routage).
+@mock.patch("core.db_routing.replica_available", return_value=True)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.router = db_routing.ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def _routed_view(self):
+        seen = {}
+
+        class View(db_routing.ReplicaReadMixin, TemplateView):
+            def get(inner, request, *args, **kwargs):
+                seen["read"] = self.router.db_for_read(Student)
+                seen["write"] = self.router.db_for_write(Student)
+                seen["qs"] = db_routing.bind_reads(Student.objects.all()).db
+                return HttpResponse()
+
+            post = get
+
+        return View.as_view(), seen
+
+    def test_router_defaults_to_primary(self, _):
+        self.assertIsNone(self.router.db_for_read(Student))
+        self.assertEqual(self.router.db_for_write(Student), "default")
+        self.assertFalse(self.router.allow_migrate(db_routing.REPLICA, "students"))
+        with db_routing.replica_reads():
+            self.assertEqual(self.router.db_for_read(Student), db_routing.REPLICA)
+            self.assertEqual(self.router.db_for_write(Student), "default")
+            with db_routing.replica_reads(enabled=False):
+                self.assertIsNone(self.router.db_for_read(Student))
+        self.assertIsNone(self.router.db_for_read(Student))
+
+    def test_replica_unavailable(self, available):
+        available.return_value = False
+        with db_routing.replica_reads():
+            self.assertIsNone(self.router.db_for_read(Student))
+            self.assertEqual(db_routing.bind_reads(Student.objects.all()).db, "default")
+
+    def test_mixin_reads_on_replica_for_get_only(self, _):
+        view, seen = self._routed_view()
+        view(self.factory.get("/"))
+        self.assertEqual(seen, {"read": db_routing.REPLICA, "write": "default", "qs": db_routing.REPLICA})
+        view(self.factory.post("/"))
+        self.assertEqual(seen, {"read": None, "write": "default", "qs": "default"})
+        # hors de la vue, bind_reads() ne touche pas au queryset
+        self.assertEqual(db_routing.bind_reads(Student.objects.all()).db, "default")
+
+    def test_reads_pinned_to_primary_after_a_write(self, _):
+        middleware = db_routing.ReplicaPinMiddleware(lambda request: HttpResponse())
+        self.assertNotIn(db_routing.PIN_COOKIE, middleware(self.factory.get("/")).cookies)
+        cookie = middleware(self.factory.post("/")).cookies[db_routing.PIN_COOKIE]
+        self.assertEqual(cookie["max-age"], settings.DB_REPLICA_PIN_SECONDS)
+        self.assertTrue(cookie["httponly"])
+
+        view, seen = self._routed_view()
+        request = self.factory.get("/")
+        request.COOKIES[db_routing.PIN_COOKIE] = cookie.value
+        view(request)
+        self.assertIsNone(seen["read"])
+        self.assertEqual(seen["qs"], "default")
@@ -1,68 +1,58 @@
 # core/views.py
+import hmac
+
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 
-from catalog.models import SchoolYear, Classroom
-from students.models import Student
-
-# Essaye d'importer Enrollment si le modèle existe encore.
-try:
-    from students.models import Enrollment  # type: ignore
-except Exception:  # le modèle n'existe plus (nouvelle structure)
-    Enrollment = None
+from catalog.models import SchoolYear, Classroom, Subject
+from students.counters import headcounts, year_headcounts
+from .active_context import SESSION_SCHOOL_KEY, SESSION_SCHOOLYEAR_KEY, activate
+from .metrics import registry
 
 
 @login_required
 def dashboard(request):
     """
     Tableau de bord simple.
-    - Si le modèle Enrollment existe : stats par année scolaire active.
-    - Sinon : stats en direct sur Student (par classe).
+    - Année scolaire active : inscriptions de l'année par classe (Enrollment,
+      un agrégat sur l'index (school_year, classroom)).
+    - Sinon : effectifs courants par classe (compteurs ClassroomHeadcount).
     """
-    sid = request.session.get("active_school_id")
-    syid = request.session.get("active_schoolyear_id")
+    sid = request.session.get(SESSION_SCHOOL_KEY)
+    syid = request.session.get(SESSION_SCHOOLYEAR_KEY)
 
     context = {
         "active_school_id": sid,
         "active_schoolyear_id": syid,
-        "per_class": [],
-        "total_students": 0,
+        "current_school_year": getattr(request, "active_school_year", None),
     }
+    # L'année appartient à une école : pas de filtre école supplémentaire
+    per_class, total = year_headcounts(syid) if syid else headcounts(sid)
+    _fill_stats(context, per_class, total, sid, year=bool(syid))
+    return render(request, "accounts/dashboard.html", context)
 
-    # Stats basées sur Enrollment (si dispo)
-    if Enrollment is not None and syid:
-        base = (
-            Enrollment.objects
-            .select_related("classroom")
-            .filter(school_year_id=syid)
-        )
-        if sid:
-            base = base.filter(classroom__school_id=sid)
-
-        context["per_class"] = (
-            base.values("classroom_id", "classroom__label")
-                .annotate(total=Count("id"))
-                .order_by("classroom__label")
-        )
-        context["total_students"] = base.count()
-        return render(request, "dashboard.html", context)
-
-    # Fallback sans Enrollment : regroupe les élèves par classe
-    base_students = Student.objects.all()
-    # Si on a un id d'école actif, on filtre via la classe (si renseignée)
-    if sid:
-        base_students = base_students.filter(classroom__school_id=sid)
 
-    context["per_class"] = (
-        base_students.values("classroom__id", "classroom__label")
-        .annotate(total=Count("id"))
-        .order_by("classroom__label")
-    )
-    context["total_students"] = base_students.count()
-    return render(request, "dashboard.html", context)
+def _fill_stats(context, per_class, total, sid, year=False):
+    context["per_class"] = per_class
+    context["total_students"] = total
+    # Variables attendues par accounts/dashboard.html
+    context["stats"] = {
+        "students": total,
+        "classes": sum(1 for r in per_class if r["classroom__id"]),
+        "subjects": Subject.objects.filter(school_id=sid).count() if sid else Subject.objects.count(),
+        # Inscriptions actives de l'année (year_headcounts) ; sans année active,
+        # total n'est que l'effectif courant : pas de chiffre d'inscriptions
+        "enrollments": total if year else None,
+    }
+    context["top_classes"] = [
+        {"label": r["classroom__label"], "count": r["total"]}
+        for r in sorted(per_class, key=lambda r: -r["total"])
+        if r["classroom__id"]
+    ][:5]
 
 
 @login_required
@@ -71,8 +61,7 @@ def switch_schoolyear(request, pk: int):
     Active une année scolaire (stockée en session) et aligne l'école active dessus.
     """
     sy = get_object_or_404(SchoolYear, pk=pk)
-    request.session["active_schoolyear_id"] = sy.id
-    request.session["active_school_id"] = sy.school_id  # on cale l'école sur l'année
+    activate(request, school_year=sy)  # on cale l'école sur l'année
     messages.success(request, f"Année scolaire active : {sy.label}")
     # Retourne à la page précédente, sinon au dashboard
     return redirect(request.META.get("HTTP_REFERER") or reverse("dashboard"))
@@ -84,6 +73,19 @@ def switch_classroom(request, pk: int):
     Optionnel : mémorise une classe sélectionnée pour faciliter la navigation.
     """
     cls = get_object_or_404(Classroom, pk=pk)
-    request.session["active_classroom_id"] = cls.id
+    activate(request, classroom=cls)
     messages.info(request, f"Classe active : {cls.label}")
     return redirect(request.META.get("HTTP_REFERER") or reverse("dashboard"))
+
+
+def metrics(request):
+    """Métriques du processus au format texte Prometheus (cf. core/metrics.py)."""
+    token = settings.METRICS_TOKEN
+    if token:
+        given = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        allowed = hmac.compare_digest(given.encode(), token.encode())
+    else:
+        allowed = request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,45 @@
+# finance/admin.py
+from django.contrib import admin
+
+from .models import DailyCash, FeeSchedule, LedgerEntry, StudentBalance
+
+
+@admin.register(FeeSchedule)
+class FeeScheduleAdmin(admin.ModelAdmin):
+    list_display = ("label", "amount", "school_year", "cycle", "classroom", "due_date")
+    list_filter = ("school_year", "cycle")
+    list_select_related = ("school_year", "school_year__school", "cycle", "classroom")
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    # grand livre en ajout seul, tables dérivées (finance/ledger.py) : consultation seulement
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(LedgerEntry)
+class LedgerEntryAdmin(ReadOnlyAdmin):
+    list_display = ("created_at", "student", "kind", "amount", "method", "reference", "fee", "created_by")
+    list_filter = ("kind", "method", "school_year")
+    list_select_related = ("student", "fee", "created_by")
+    date_hierarchy = "created_at"
+
+
+@admin.register(StudentBalance)
+class StudentBalanceAdmin(ReadOnlyAdmin):
+    list_display = ("student", "school_year", "charged", "paid", "balance", "last_payment_at")
+    list_filter = ("school_year",)
+    list_select_related = ("student", "school_year", "school_year__school")
+
+
+@admin.register(DailyCash)
+class DailyCashAdmin(ReadOnlyAdmin):
+    list_display = ("date", "school", "method", "total", "count")
+    list_filter = ("school", "method")
+    date_hierarchy = "date"
@@ -0,0 +1,37 @@
+# finance/forms.py
+from decimal import Decimal
+
+from django import forms
+
+from catalog.models import Classroom
+from .models import FeeSchedule, LedgerEntry
+
+
+# ---------------------------
+# Barème des frais
+# ---------------------------
+class FeeScheduleForm(forms.ModelForm):
+    """L'année scolaire est celle active (fixée par la vue) ; classe et cycle sont facultatifs."""
+
+    class Meta:
+        model = FeeSchedule
+        fields = ["label", "amount", "cycle", "classroom", "due_date"]
+        widgets = {"due_date": forms.DateInput(attrs={"type": "date"})}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["cycle"].empty_label = "— Tous les cycles —"
+        self.fields["classroom"].empty_label = "— Toutes les classes —"
+        if self.instance.school_year_id:
+            self.fields["classroom"].queryset = Classroom.objects.filter(
+                school_id=self.instance.school_year.school_id
+            ).order_by("label")
+
+
+# ---------------------------
+# Encaissement
+# ---------------------------
+class PaymentForm(forms.Form):
+    amount = forms.DecimalField(label="Montant", max_digits=12, decimal_places=2, min_value=Decimal("0.01"))
+    method = forms.ChoiceField(label="Mode de paiement", choices=LedgerEntry.Method.choices)
+    reference = forms.CharField(label="Référence", max_length=100, required=False)
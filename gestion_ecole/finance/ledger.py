@@ -0,0 +1,232 @@
+# finance/ledger.py
+"""
+Grand livre des élèves (ajout seul) et soldes tenus à jour.
+
+- post_entries() : le SEUL point d'écriture. Une transaction : écritures,
+  soldes StudentBalance (lignes verrouillées, quelques requêtes quel que soit
+  le nombre d'élèves) et journal de caisse DailyCash pour les paiements ;
+- record_payment(), reverse_entry(), charge_fees() : cas d'usage ;
+- applicable_fees() : barème par classe (pour un libellé, classe > cycle > école) ;
+- reconcile() : soldes recalculés depuis le grand livre (dérive, import SQL).
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Max, Sum, Value, When
+from django.utils import timezone
+
+from catalog.models import Classroom
+from students.models import Enrollment
+from .models import DailyCash, FeeSchedule, LedgerEntry, StudentBalance
+
+Kind = LedgerEntry.Kind
+ZERO = Decimal("0.00")
+BATCH_SIZE = 500
+
+
+def _effect(entry):
+    """(Δ dû, Δ payé) d'une écriture ; une annulation inverse l'écriture annulée."""
+    if entry.kind == Kind.CHARGE:
+        return entry.amount, ZERO
+    if entry.kind == Kind.PAYMENT:
+        return ZERO, entry.amount
+    charged, paid = _effect(entry.reverses)
+    return -charged, -paid
+
+
+def _cash_method(entry):
+    """Mode de paiement à reporter en caisse (paiement ou annulation de paiement), sinon None."""
+    if entry.kind == Kind.PAYMENT:
+        return entry.method
+    if entry.kind == Kind.REVERSAL and entry.reverses.kind == Kind.PAYMENT:
+        return entry.reverses.method
+    return None
+
+
+@transaction.atomic
+def post_entries(school_year, entries):
+    """Enregistre des écritures (non sauvegardées) d'une même année et répercute soldes et caisse."""
+    if not entries:
+        return entries
+    now = timezone.now()
+    if len(entries) == 1:
+        entries[0].save()  # pk connu (numéro de reçu), même sous MySQL
+    else:
+        LedgerEntry.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+
+    # — Soldes : lignes créées au besoin, puis verrouillées et mises à jour —
+    deltas = defaultdict(lambda: [ZERO, ZERO, None])
+    for entry in entries:
+        charged, paid = _effect(entry)
+        delta = deltas[entry.student_id]
+        delta[0] += charged
+        delta[1] += paid
+        if entry.kind == Kind.PAYMENT:
+            delta[2] = now
+    StudentBalance.objects.bulk_create(
+        [StudentBalance(student_id=sid, school_year=school_year, school_id=school_year.school_id) for sid in deltas],
+        ignore_conflicts=True, batch_size=BATCH_SIZE,
+    )
+    balances = list(
+        StudentBalance.objects.select_for_update().filter(school_year=school_year, student_id__in=list(deltas))
+    )
+    for row in balances:
+        charged, paid, paid_at = deltas[row.student_id]
+        row.charged += charged
+        row.paid += paid
+        row.balance = row.charged - row.paid
+        row.last_payment_at = paid_at or row.last_payment_at
+        row.updated_at = now
+    StudentBalance.objects.bulk_update(
+        balances, ["charged", "paid", "balance", "last_payment_at", "updated_at"], batch_size=BATCH_SIZE,
+    )
+
+    # — Caisse du jour, par mode de paiement —
+    cash = defaultdict(lambda: [ZERO, 0])
+    for entry in entries:
+        method = _cash_method(entry)
+        if method:
+            cash[method][0] += _effect(entry)[1]
+            cash[method][1] += 1 if entry.kind == Kind.PAYMENT else -1
+    if cash:
+        today = timezone.localdate(now)
+        DailyCash.objects.bulk_create(
+            [DailyCash(school_id=school_year.school_id, date=today, method=m) for m in cash],
+            ignore_conflicts=True,
+        )
+        for method, (total, count) in cash.items():
+            DailyCash.objects.filter(school_id=school_year.school_id, date=today, method=method).update(
+                total=F("total") + total, count=F("count") + count,
+            )
+    return entries
+
+
+def record_payment(student, school_year, amount, method, reference="", user=None):
+    """Encaisse un paiement ; retourne l'écriture (son numéro de reçu : entry.receipt_number)."""
+    entry = LedgerEntry(
+        school_year=school_year, student=student, kind=Kind.PAYMENT, amount=amount,
+        method=method, reference=reference, created_by=user,
+    )
+    return post_entries(school_year, [entry])[0]
+
+
+def reverse_entry(entry, user=None, reference=""):
+    """Annule une écriture (frais ou paiement) par une écriture inverse."""
+    if entry.kind == Kind.REVERSAL:
+        raise ValueError("Une annulation ne s'annule pas : passez une nouvelle écriture.")
+    if LedgerEntry.objects.filter(reverses=entry).exists():
+        raise ValueError("Cette écriture est déjà annulée.")
+    reversal = LedgerEntry(
+        school_year=entry.school_year, student_id=entry.student_id, kind=Kind.REVERSAL,
+        amount=entry.amount, fee_id=entry.fee_id, reverses=entry, reference=reference, created_by=user,
+    )
+    return post_entries(entry.school_year, [reversal])[0]
+
+
+# ——————————————————————————————————————
+#  Frais dus
+# ——————————————————————————————————————
+def applicable_fees(school_year) -> dict:
+    """{classroom_id: [FeeSchedule]} : pour chaque libellé, les frais de la classe, sinon du cycle, sinon de l'école."""
+    fees = list(FeeSchedule.objects.filter(school_year=school_year))
+    classrooms = Classroom.objects.filter(school_id=school_year.school_id).values_list("pk", "cycle_id")
+    out = {}
+    for classroom_id, cycle_id in classrooms:
+        chosen = {}
+        for fee in fees:
+            if fee.classroom_id not in (None, classroom_id) or fee.cycle_id not in (None, cycle_id):
+                continue
+            rank = 2 if fee.classroom_id else 1 if fee.cycle_id else 0
+            key = fee.label.casefold()
+            if key not in chosen or rank > chosen[key][0]:
+                chosen[key] = (rank, fee)
+        out[classroom_id] = sorted((fee for _, fee in chosen.values()), key=lambda f: f.label)
+    return out
+
+
+def charge_fees(school_year, classroom=None, user=None) -> int:
+    """
+    Passe les frais dus de chaque élève inscrit (toute l'école ou une classe).
+    Idempotent : un libellé déjà facturé (et non annulé) à un élève ne l'est
+    pas deux fois. Retourne le nombre d'écritures créées.
+    """
+    enrollments = Enrollment.objects.filter(school_year=school_year, status=Enrollment.Status.ACTIVE)
+    if classroom is not None:
+        enrollments = enrollments.filter(classroom=classroom)
+    pairs = list(enrollments.values_list("student_id", "classroom_id"))
+    if not pairs:
+        return 0
+    charged = set(
+        LedgerEntry.objects.filter(
+            school_year=school_year, kind=Kind.CHARGE, student_id__in=[sid for sid, _ in pairs],
+            reversed_by__isnull=True,
+        ).values_list("student_id", "fee__label")
+    )
+    charged = {(sid, (label or "").casefold()) for sid, label in charged}
+    fees = applicable_fees(school_year)
+    entries = [
+        LedgerEntry(
+            school_year=school_year, student_id=sid, kind=Kind.CHARGE, amount=fee.amount,
+            fee=fee, created_by=user,
+        )
+        for sid, cid in pairs
+        for fee in fees.get(cid, ())
+        if (sid, fee.label.casefold()) not in charged
+    ]
+    post_entries(school_year, entries)
+    return len(entries)
+
+
+# ——————————————————————————————————————
+#  Réconciliation
+# ——————————————————————————————————————
+def signed_total(kind):
+    """Somme des montants d'une nature, annulations de cette nature déduites."""
+    money = DecimalField(max_digits=14, decimal_places=2)
+    return Sum(
+        Case(
+            When(kind=kind, then=F("amount")),
+            When(kind=Kind.REVERSAL, reverses__kind=kind, then=-F("amount")),
+            default=Value(ZERO),
+            output_field=money,
+        ),
+        output_field=money,
+    )
+
+
+@transaction.atomic
+def reconcile(school_year, dry_run=False):
+    """Recalcule les soldes de l'année depuis le grand livre ; retourne [(student_id, attendu, enregistré)]."""
+    expected = {
+        row["student_id"]: row
+        for row in LedgerEntry.objects.filter(school_year=school_year).values("student_id").annotate(
+            charged=signed_total(Kind.CHARGE), paid=signed_total(Kind.PAYMENT),
+            last_payment_at=Max(Case(When(kind=Kind.PAYMENT, then=F("created_at")))),
+        )
+    }
+    stored = {b.student_id: b for b in StudentBalance.objects.select_for_update().filter(school_year=school_year)}
+    drift, to_create, to_update = [], [], []
+    now = timezone.now()
+    for sid in expected.keys() | stored.keys():
+        row = expected.get(sid, {"charged": ZERO, "paid": ZERO, "last_payment_at": None})
+        balance = stored.get(sid)
+        charged, paid = row["charged"] or ZERO, row["paid"] or ZERO
+        if balance is not None and (balance.charged, balance.paid, balance.balance) == (charged, paid, charged - paid):
+            continue
+        drift.append((sid, charged - paid, balance.balance if balance else None))
+        if balance is None:
+            to_create.append(StudentBalance(
+                student_id=sid, school_year=school_year, school_id=school_year.school_id,
+                charged=charged, paid=paid, balance=charged - paid, last_payment_at=row["last_payment_at"],
+            ))
+        else:
+            balance.charged, balance.paid, balance.balance = charged, paid, charged - paid
+            balance.last_payment_at, balance.updated_at = row["last_payment_at"], now
+            to_update.append(balance)
+    if not dry_run:
+        StudentBalance.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+        StudentBalance.objects.bulk_update(
+            to_update, ["charged", "paid", "balance", "last_payment_at", "updated_at"], batch_size=BATCH_SIZE,
+        )
+    return sorted(drift)
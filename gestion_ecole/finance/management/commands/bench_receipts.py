@@ -0,0 +1,61 @@
+"""
+Débit du rendu des reçus de paiement (reçus/s).
+
+    python manage.py bench_receipts              # 200 derniers paiements
+    python manage.py bench_receipts --count 1000
+
+Trois mesures, sur les paiements existants :
+- premier reçu à froid (gabarit, WeasyPrint, feuille de style et polices à charger) ;
+- rendus à chaud, sans cache (HTML + PDF à chaque reçu) ;
+- réimpressions servies par le cache des PDF (finance/receipts.py).
+Le cache est ici un stockage en mémoire : rien n'est écrit dans MEDIA_ROOT.
+"""
+import time
+
+from django.core.files.storage import InMemoryStorage
+from django.core.management.base import BaseCommand, CommandError
+
+from core import pdf
+from finance import receipts
+from finance.models import LedgerEntry
+
+
+class Command(BaseCommand):
+    help = "Mesure le débit de rendu des reçus PDF (à froid, à chaud, réimpression en cache)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=200, help="Nombre de paiements (défaut : 200)")
+
+    def handle(self, *args, **opts):
+        entries = list(
+            LedgerEntry.objects.filter(kind=LedgerEntry.Kind.PAYMENT)
+            .select_related("student__classroom", "school_year__school", "created_by")
+            .order_by("-pk")[:opts["count"]]
+        )
+        if not entries:
+            raise CommandError("Aucun paiement à imprimer : enregistrez d'abord des paiements.")
+        n = len(entries)
+
+        pdf._assets.clear()
+        receipts._template.cache_clear()
+        start = time.perf_counter()
+        receipts.render_receipt(receipts.receipt_html(entries[0]))
+        self.stdout.write(f"Premier reçu (à froid) : {time.perf_counter() - start:.3f} s")
+
+        start = time.perf_counter()
+        for entry in entries:
+            receipts.render_receipt(receipts.receipt_html(entry))
+        self._report("Rendu à chaud (sans cache)", n, time.perf_counter() - start)
+
+        storage = InMemoryStorage()
+        for entry in entries:
+            receipts.receipt_pdf(entry, storage=storage)
+        start = time.perf_counter()
+        for entry in entries:
+            receipts.receipt_pdf(entry, storage=storage)
+        self._report("Réimpression (cache)", n, time.perf_counter() - start)
+
+    def _report(self, label, n, elapsed):
+        self.stdout.write(self.style.SUCCESS(
+            f"{label} : {n} reçu(s) en {elapsed:.2f} s — {n / elapsed:.1f} reçus/s ({1000 * elapsed / n:.1f} ms/reçu)"
+        ))
@@ -0,0 +1,33 @@
+"""
+Facturation des frais dus aux élèves inscrits (barème FeeSchedule).
+
+    python manage.py charge_fees --year 4
+    python manage.py charge_fees --year 4 --classroom 12
+
+Idempotent : un libellé déjà facturé (et non annulé) à un élève n'est pas
+refacturé ; à relancer après de nouvelles inscriptions ou de nouveaux frais.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.models import Classroom, SchoolYear
+from finance.ledger import charge_fees
+
+
+class Command(BaseCommand):
+    help = "Passe au grand livre les frais dus par les élèves inscrits"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, required=True, help="id de l'année scolaire")
+        parser.add_argument("--classroom", type=int, help="id de classe (défaut : toute l'école)")
+
+    def handle(self, *args, **opts):
+        year = SchoolYear.objects.filter(pk=opts["year"]).select_related("school").first()
+        if year is None:
+            raise CommandError("Année scolaire introuvable.")
+        classroom = None
+        if opts["classroom"]:
+            classroom = Classroom.objects.filter(pk=opts["classroom"], school_id=year.school_id).first()
+            if classroom is None:
+                raise CommandError("Classe introuvable pour cette école.")
+        created = charge_fees(year, classroom=classroom)
+        self.stdout.write(self.style.SUCCESS(f"{year} : {created} frais facturé(s)"))
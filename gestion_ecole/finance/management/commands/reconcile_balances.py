@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.models import SchoolYear
+from finance.ledger import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recalcule les soldes des élèves (StudentBalance) depuis le grand livre et corrige les écarts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, action="append", help="id d'année scolaire (répétable ; défaut : toutes)")
+        parser.add_argument("--dry-run", action="store_true", help="Affiche les écarts sans rien corriger")
+
+    def handle(self, *args, **opts):
+        years = SchoolYear.objects.select_related("school").order_by("school__name", "-start_date")
+        if opts["year"]:
+            years = years.filter(pk__in=opts["year"])
+            if not years:
+                raise CommandError("Aucune année scolaire trouvée.")
+        total = 0
+        for year in years:
+            drift = reconcile(year, dry_run=opts["dry_run"])
+            for sid, expected, stored in drift:
+                self.stdout.write(f"{year} élève #{sid} : enregistré={stored if stored is not None else '—'} réel={expected}")
+            total += len(drift)
+        if not total:
+            self.stdout.write(self.style.SUCCESS("Soldes OK (aucun écart)"))
+        elif opts["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"{total} écart(s) (non corrigés : --dry-run)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{total} écart(s) corrigé(s)"))
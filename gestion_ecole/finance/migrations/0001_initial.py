@@ -0,0 +1,93 @@
+# Generated by Django 5.1.1 on 2026-10-17 15:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('catalog', '0007_change_stamp'),
+        ('students', '0008_promotion_journal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeeSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=100, verbose_name='Libellé')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Montant')),
+                ('due_date', models.DateField(blank=True, null=True, verbose_name='Échéance')),
+                ('classroom', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='catalog.classroom', verbose_name='Classe')),
+                ('cycle', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='catalog.cycle', verbose_name='Cycle')),
+                ('school_year', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='fee_schedules', to='catalog.schoolyear', verbose_name='Année scolaire')),
+            ],
+            options={
+                'verbose_name': 'Frais',
+                'verbose_name_plural': 'Frais',
+                'ordering': ['label', 'classroom__label', 'cycle__name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyCash',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('method', models.CharField(choices=[('CASH', 'Espèces'), ('MOBILE', 'Mobile money'), ('CHEQUE', 'Chèque'), ('TRANSFER', 'Virement')], max_length=10, verbose_name='Mode de paiement')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Total')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Opérations')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.school')),
+            ],
+            options={
+                'verbose_name': 'Caisse du jour',
+                'verbose_name_plural': 'Caisse (par jour)',
+                'constraints': [models.UniqueConstraint(fields=('school', 'date', 'method'), name='uniq_daily_cash')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('CHARGE', 'Frais dû'), ('PAYMENT', 'Paiement'), ('REVERSAL', 'Annulation')], max_length=10, verbose_name='Nature')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Montant')),
+                ('method', models.CharField(blank=True, choices=[('CASH', 'Espèces'), ('MOBILE', 'Mobile money'), ('CHEQUE', 'Chèque'), ('TRANSFER', 'Virement')], max_length=10, verbose_name='Mode de paiement')),
+                ('reference', models.CharField(blank=True, max_length=100, verbose_name='Référence')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('fee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='finance.feeschedule', verbose_name='Frais')),
+                ('reverses', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='reversed_by', to='finance.ledgerentry', verbose_name='Annule')),
+                ('school_year', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='catalog.schoolyear', verbose_name='Année scolaire')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='students.student', verbose_name='Élève')),
+            ],
+            options={
+                'verbose_name': 'Écriture',
+                'verbose_name_plural': 'Grand livre',
+                'indexes': [models.Index(fields=['student', 'school_year', 'created_at'], name='idx_ledger_student'), models.Index(fields=['kind', 'created_at'], name='idx_ledger_kind_date')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('charged', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Dû')),
+                ('paid', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Payé')),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Reste à payer')),
+                ('last_payment_at', models.DateTimeField(blank=True, null=True, verbose_name='Dernier paiement')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.school')),
+                ('school_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.schoolyear', verbose_name='Année scolaire')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balances', to='students.student', verbose_name='Élève')),
+            ],
+            options={
+                'verbose_name': 'Solde',
+                'verbose_name_plural': 'Soldes',
+                'indexes': [models.Index(fields=['school_year', 'balance'], name='idx_balance_year_amount')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'school_year'), name='uniq_balance_student_year')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-17 15:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailycash',
+            name='count',
+            field=models.IntegerField(default=0, verbose_name='Opérations'),
+        ),
+    ]
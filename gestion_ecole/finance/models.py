@@ -0,0 +1,164 @@
+# finance/models.py
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models
+
+from catalog.models import Classroom, Cycle, School, SchoolYear
+from students.models import Student
+
+MONEY = {"max_digits": 12, "decimal_places": 2}
+
+
+class FeeSchedule(models.Model):
+    """
+    Frais d'une année scolaire (scolarité, inscription, cantine…), pour toute
+    l'école, un cycle ou une classe. Pour un même libellé, le plus précis
+    s'applique : classe > cycle > école (cf. finance/ledger.py).
+    """
+    school_year = models.ForeignKey(
+        SchoolYear, verbose_name="Année scolaire", on_delete=models.PROTECT, related_name="fee_schedules"
+    )
+    cycle = models.ForeignKey(
+        Cycle, verbose_name="Cycle", on_delete=models.PROTECT, null=True, blank=True, related_name="+"
+    )
+    classroom = models.ForeignKey(
+        Classroom, verbose_name="Classe", on_delete=models.PROTECT, null=True, blank=True, related_name="+"
+    )
+    label = models.CharField("Libellé", max_length=100)
+    amount = models.DecimalField("Montant", **MONEY)
+    due_date = models.DateField("Échéance", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Frais"
+        verbose_name_plural = "Frais"
+        ordering = ["label", "classroom__label", "cycle__name"]
+
+    def __str__(self) -> str:
+        scope = self.classroom or self.cycle or "Toute l'école"
+        return f"{self.label} — {scope} : {self.amount}"
+
+    def clean(self):
+        if self.classroom_id and self.school_year_id and self.classroom.school_id != self.school_year.school_id:
+            raise ValidationError({"classroom": "Cette classe n'appartient pas à l'école de l'année."})
+        if self.classroom_id and self.cycle_id:
+            raise ValidationError("Choisissez une classe OU un cycle (ou aucun des deux : toute l'école).")
+        # unicité (libellé, portée) : contrainte impossible en base avec des NULL
+        same = FeeSchedule.objects.filter(
+            school_year_id=self.school_year_id, label__iexact=self.label,
+            cycle_id=self.cycle_id, classroom_id=self.classroom_id,
+        ).exclude(pk=self.pk)
+        if self.school_year_id and same.exists():
+            raise ValidationError({"label": "Ces frais existent déjà pour cette portée."})
+
+
+class LedgerEntry(models.Model):
+    """
+    Grand livre des élèves, en ajout seul : une ligne ne se modifie ni ne se
+    supprime ; une erreur se corrige par une écriture d'annulation (REVERSAL).
+    Chaque écriture met à jour StudentBalance et DailyCash dans la même
+    transaction (cf. finance/ledger.py).
+    """
+    class Kind(models.TextChoices):
+        CHARGE = "CHARGE", "Frais dû"
+        PAYMENT = "PAYMENT", "Paiement"
+        REVERSAL = "REVERSAL", "Annulation"
+
+    class Method(models.TextChoices):
+        CASH = "CASH", "Espèces"
+        MOBILE = "MOBILE", "Mobile money"
+        CHEQUE = "CHEQUE", "Chèque"
+        TRANSFER = "TRANSFER", "Virement"
+
+    school_year = models.ForeignKey(SchoolYear, verbose_name="Année scolaire", on_delete=models.PROTECT, related_name="+")
+    student = models.ForeignKey(Student, verbose_name="Élève", on_delete=models.PROTECT, related_name="ledger_entries")
+    kind = models.CharField("Nature", max_length=10, choices=Kind.choices)
+    amount = models.DecimalField("Montant", **MONEY)  # toujours positif ; le sens dépend de `kind`
+    fee = models.ForeignKey(
+        FeeSchedule, verbose_name="Frais", on_delete=models.PROTECT, null=True, blank=True, related_name="+"
+    )
+    method = models.CharField("Mode de paiement", max_length=10, choices=Method.choices, blank=True)
+    reference = models.CharField("Référence", max_length=100, blank=True)
+    reverses = models.OneToOneField(
+        "self", verbose_name="Annule", on_delete=models.PROTECT, null=True, blank=True, related_name="reversed_by"
+    )
+    created_at = models.DateTimeField("Date", auto_now_add=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+
+    class Meta:
+        verbose_name = "Écriture"
+        verbose_name_plural = "Grand livre"
+        indexes = [
+            # Relevé d'un élève pour une année
+            models.Index(fields=["student", "school_year", "created_at"], name="idx_ledger_student"),
+            # Paiements d'une journée (journal de caisse)
+            models.Index(fields=["kind", "created_at"], name="idx_ledger_kind_date"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} {self.amount} — {self.student_id}"
+
+    @property
+    def receipt_number(self) -> str:
+        return f"R{self.created_at:%Y}-{self.pk:06d}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Le grand livre est en ajout seul : passez une écriture d'annulation.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Le grand livre est en ajout seul : passez une écriture d'annulation.")
+
+
+class StudentBalance(models.Model):
+    """
+    Solde d'un élève pour une année (somme du grand livre), tenu à jour à
+    chaque écriture : les listes d'impayés sont une lecture d'index.
+    `manage.py reconcile_balances` le recalcule depuis le grand livre.
+    """
+    student = models.ForeignKey(Student, verbose_name="Élève", on_delete=models.CASCADE, related_name="balances")
+    school_year = models.ForeignKey(SchoolYear, verbose_name="Année scolaire", on_delete=models.CASCADE, related_name="+")
+    # dénormalisé : liste des impayés d'une école / classe sans jointure
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name="+")
+    charged = models.DecimalField("Dû", default=0, **MONEY)
+    paid = models.DecimalField("Payé", default=0, **MONEY)
+    balance = models.DecimalField("Reste à payer", default=0, **MONEY)  # charged - paid
+    last_payment_at = models.DateTimeField("Dernier paiement", null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Solde"
+        verbose_name_plural = "Soldes"
+        constraints = [
+            models.UniqueConstraint(fields=["student", "school_year"], name="uniq_balance_student_year"),
+        ]
+        indexes = [
+            # Impayés d'une année, du plus gros au plus petit
+            models.Index(fields=["school_year", "balance"], name="idx_balance_year_amount"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.student_id} / {self.school_year_id} : {self.balance}"
+
+
+class DailyCash(models.Model):
+    """Encaissements par jour et par mode de paiement (journal de caisse), tenus à chaque paiement."""
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name="+")
+    date = models.DateField("Date")
+    method = models.CharField("Mode de paiement", max_length=10, choices=LedgerEntry.Method.choices)
+    total = models.DecimalField("Total", default=0, **MONEY)
+    # signés : une annulation est comptée (en négatif) le jour où elle est passée,
+    # qui peut ne compter encore aucun paiement de ce mode
+    count = models.IntegerField("Opérations", default=0)
+
+    class Meta:
+        verbose_name = "Caisse du jour"
+        verbose_name_plural = "Caisse (par jour)"
+        constraints = [
+            models.UniqueConstraint(fields=["school", "date", "method"], name="uniq_daily_cash"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.date:%d/%m/%Y} {self.get_method_display()} : {self.total}"
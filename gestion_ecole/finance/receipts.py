@@ -0,0 +1,110 @@
+# finance/receipts.py
+"""
+Reçus de paiement PDF, imprimés à la chaîne au guichet.
+
+- Gabarit Django compilé une fois par processus ; WeasyPrint, feuille de
+  style et polices chargés une fois par worker (core/pdf.py), dès le
+  démarrage avec PDF_WARM_UP (cf. config/wsgi.py, config/asgi.py) ;
+- Le contenu d'un reçu ne dépend que du paiement (le « reste à payer » est
+  celui juste après ce paiement) : le PDF rendu est conservé dans le
+  stockage, sous receipts/<id du paiement>/<empreinte du HTML>.pdf. Une
+  réimpression ne coûte qu'un rendu HTML et une lecture de fichier ; si le
+  HTML change (élève renommé, gabarit modifié), l'empreinte aussi : nouveau
+  rendu, l'ancien fichier est supprimé.
+`manage.py bench_receipts` mesure le débit (reçus/s).
+"""
+import functools
+import hashlib
+import logging
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template.loader import get_template
+
+from core.pdf import render_pdf, warm_up as pdf_warm_up
+from .ledger import ZERO, signed_total
+from .models import LedgerEntry
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_TEMPLATE = "finance/receipt.html"
+RECEIPT_CSS = "css/receipt.css"
+RECEIPT_DIR = "receipts"
+
+
+def receipt_css_paths():
+    path = finders.find(RECEIPT_CSS)
+    return [path] if path else []
+
+
+@functools.cache
+def _template():
+    return get_template(RECEIPT_TEMPLATE)
+
+
+def balance_after(entry):
+    """Reste à payer de l'élève juste après l'écriture `entry` (une lecture indexée du relevé)."""
+    totals = LedgerEntry.objects.filter(
+        student_id=entry.student_id, school_year_id=entry.school_year_id, pk__lte=entry.pk,
+    ).aggregate(charged=signed_total(LedgerEntry.Kind.CHARGE), paid=signed_total(LedgerEntry.Kind.PAYMENT))
+    return (totals["charged"] or ZERO) - (totals["paid"] or ZERO)
+
+
+def receipt_html(entry) -> str:
+    """`entry` chargé avec select_related("student__classroom", "school_year__school", "created_by")."""
+    return _template().render({
+        "entry": entry,
+        "student": entry.student,
+        "school_year": entry.school_year,
+        "school": entry.school_year.school,
+        "balance_after": balance_after(entry),
+    })
+
+
+def render_receipt(html) -> bytes:
+    return render_pdf(html, receipt_css_paths(), base_url=str(settings.BASE_DIR))
+
+
+def content_hash(html) -> str:
+    return hashlib.sha256(html.encode()).hexdigest()[:16]
+
+
+def receipt_path(entry, digest) -> str:
+    return f"{RECEIPT_DIR}/{entry.pk}/{digest}.pdf"
+
+
+def _store(storage, entry, name, pdf):
+    """Enregistre le PDF et supprime les versions précédentes du reçu ; une erreur de stockage n'empêche pas l'impression."""
+    try:
+        try:
+            _, files = storage.listdir(f"{RECEIPT_DIR}/{entry.pk}")
+        except FileNotFoundError:
+            files = []
+        for stale in files:
+            storage.delete(f"{RECEIPT_DIR}/{entry.pk}/{stale}")
+        storage.save(name, ContentFile(pdf))
+    except OSError:
+        logger.warning("Reçu %s non conservé (%s)", entry.receipt_number, name, exc_info=True)
+
+
+def receipt_pdf(entry, storage=None) -> bytes:
+    """PDF du reçu : lu dans le stockage s'il est à jour, rendu (puis conservé) sinon."""
+    if entry.kind != LedgerEntry.Kind.PAYMENT:
+        raise ValueError("Seul un paiement donne lieu à un reçu.")
+    storage = storage or default_storage
+    html = receipt_html(entry)
+    name = receipt_path(entry, content_hash(html))
+    if storage.exists(name):
+        with storage.open(name, "rb") as f:
+            return f.read()
+    pdf = render_receipt(html)
+    _store(storage, entry, name, pdf)
+    return pdf
+
+
+def warm_up():
+    """Gabarit compilé, WeasyPrint et polices chargés avant le premier reçu."""
+    _template()
+    pdf_warm_up(receipt_css_paths(), str(settings.BASE_DIR))
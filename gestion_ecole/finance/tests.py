@@ -0,0 +1,201 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import InMemoryStorage
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.models import Classroom, Cycle, School, SchoolYear
+from core import active_context
+from core.testing import QueryBudgetMixin
+from students.models import Enrollment, Student
+from .ledger import charge_fees, reconcile, record_payment, reverse_entry
+from .models import DailyCash, FeeSchedule, LedgerEntry, StudentBalance
+from .receipts import RECEIPT_DIR, receipt_html, receipt_pdf
+
+
+class FinancePagesQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        school = School.objects.create(name="École A")
+        cls.year = SchoolYear.objects.create(
+            school=school, label="2025-2026", start_date=date(2025, 10, 1), end_date=date(2026, 6, 30)
+        )
+        cls.classrooms = [Classroom.objects.create(school=school, label=f"CM{i}") for i in range(1, 4)]
+        for i in range(30):
+            classroom = cls.classrooms[i % 3]
+            student = Student.objects.create(last_name=f"Nom{i}", first_name="X", classroom=classroom)
+            Enrollment.objects.create(student=student, classroom=classroom, school_year=cls.year)
+        FeeSchedule.objects.create(school_year=cls.year, label="Scolarité", amount=Decimal("50000"))
+        charge_fees(cls.year)
+        for student in Student.objects.all()[:10]:
+            record_payment(student, cls.year, Decimal("1000"), LedgerEntry.Method.CASH)
+        cls.user = get_user_model().objects.create_superuser("comptable", "c@ecole.test", "x")
+
+    def setUp(self):
+        active_context.clear_cache()
+        self.client.force_login(self.user)
+        self.client.get(reverse("switch_schoolyear", args=[self.year.pk]))
+
+    def test_finance_home(self):
+        self.assertQueryBudget("finance_home", budget=7)  # sans recherche
+        self.assertQueryBudget("finance_home", budget=7, data={"classroom": self.classrooms[0].pk})
+
+    def test_finance_home_search(self):
+        response = self.assertQueryBudget("finance_home", data={"q": "nom1"})
+        self.assertTrue(response.context["found"])
+
+    def test_daily_cash(self):
+        self.assertQueryBudget("daily_cash")
+
+
+class LedgerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        school = School.objects.create(name="École A")
+        cls.year = SchoolYear.objects.create(
+            school=school, label="2025-2026", start_date=date(2025, 10, 1), end_date=date(2026, 6, 30)
+        )
+        cycle = Cycle.objects.create(name="Primaire")
+        cls.cm1 = Classroom.objects.create(school=school, label="CM1", cycle=cycle)
+        cls.cm2 = Classroom.objects.create(school=school, label="CM2", cycle=cycle)
+        cls.students = {}
+        for classroom in (cls.cm1, cls.cm2):
+            student = Student.objects.create(last_name=f"Élève {classroom.label}", first_name="X", classroom=classroom)
+            Enrollment.objects.create(student=student, classroom=classroom, school_year=cls.year)
+            cls.students[classroom.label] = student
+        FeeSchedule.objects.create(school_year=cls.year, label="Scolarité", amount=Decimal("50000"))
+        FeeSchedule.objects.create(school_year=cls.year, label="Scolarité", cycle=cycle, amount=Decimal("60000"))
+        FeeSchedule.objects.create(school_year=cls.year, label="Scolarité", classroom=cls.cm2, amount=Decimal("75000"))
+        FeeSchedule.objects.create(school_year=cls.year, label="Inscription", amount=Decimal("5000"))
+        cls.user = get_user_model().objects.create_superuser("comptable", "c@ecole.test", "x")
+
+    def balance(self, label):
+        return StudentBalance.objects.get(student=self.students[label], school_year=self.year)
+
+    def test_charge_fees_most_specific_and_idempotent(self):
+        self.assertEqual(charge_fees(self.year), 4)
+        self.assertEqual(charge_fees(self.year), 0)  # déjà facturé
+        self.assertEqual(self.balance("CM1").balance, Decimal("65000"))  # cycle + école
+        self.assertEqual(self.balance("CM2").balance, Decimal("80000"))  # classe + école
+
+    def test_payment_reversal_and_daily_cash(self):
+        charge_fees(self.year)
+        student = self.students["CM1"]
+        with self.assertNumQueries(8):  # écriture, soldes (3), caisse (2) + savepoint
+            payment = record_payment(student, self.year, Decimal("20000"), LedgerEntry.Method.CASH, user=self.user)
+        record_payment(student, self.year, Decimal("5000"), LedgerEntry.Method.MOBILE, reference="TX42")
+        balance = self.balance("CM1")
+        self.assertEqual((balance.paid, balance.balance), (Decimal("25000"), Decimal("40000")))
+        self.assertIsNotNone(balance.last_payment_at)
+        cash = DailyCash.objects.get(date=timezone.localdate(), method=LedgerEntry.Method.CASH)
+        self.assertEqual((cash.total, cash.count), (Decimal("20000"), 1))
+
+        reverse_entry(payment, user=self.user)
+        self.assertEqual(self.balance("CM1").balance, Decimal("60000"))
+        cash.refresh_from_db()
+        self.assertEqual((cash.total, cash.count), (Decimal("0"), 0))
+        with self.assertRaises(ValueError):
+            reverse_entry(payment)
+        with self.assertRaises(ValueError):
+            payment.delete()
+        self.assertEqual(reconcile(self.year), [])  # soldes conformes au grand livre
+        self.assertIn(payment.receipt_number, receipt_html(payment))
+
+    def test_reversal_on_a_later_day(self):
+        payment = record_payment(self.students["CM1"], self.year, Decimal("20000"), LedgerEntry.Method.CHEQUE)
+        tomorrow = timezone.now() + timedelta(days=1)
+        with mock.patch("django.utils.timezone.now", return_value=tomorrow):
+            reverse_entry(payment)
+        cash = DailyCash.objects.get(date=timezone.localdate(tomorrow), method=LedgerEntry.Method.CHEQUE)
+        self.assertEqual((cash.total, cash.count), (Decimal("-20000"), -1))  # sortie de caisse du jour
+        self.assertEqual(self.balance("CM1").paid, Decimal("0"))
+
+    def test_receipt_render_cache(self):
+        charge_fees(self.year)
+        student = self.students["CM1"]
+        payment = record_payment(student, self.year, Decimal("20000"), LedgerEntry.Method.CASH)
+        record_payment(student, self.year, Decimal("1000"), LedgerEntry.Method.CASH)
+        self.assertIn("45000", receipt_html(payment))  # reste à payer juste après CE paiement
+        storage = InMemoryStorage()
+        with mock.patch("finance.receipts.render_receipt", return_value=b"%PDF-1") as render:
+            self.assertEqual(receipt_pdf(payment, storage=storage), b"%PDF-1")
+            self.assertEqual(receipt_pdf(payment, storage=storage), b"%PDF-1")  # réimpression
+            self.assertEqual(render.call_count, 1)
+            student.first_name = "Y"
+            student.save()
+            payment.student.refresh_from_db()
+            receipt_pdf(payment, storage=storage)  # contenu modifié : nouveau rendu
+            self.assertEqual(render.call_count, 2)
+        _, files = storage.listdir(f"{RECEIPT_DIR}/{payment.pk}")
+        self.assertEqual(len(files), 1)  # ancienne version supprimée
+
+    def test_reconcile_fixes_drift(self):
+        charge_fees(self.year)
+        StudentBalance.objects.filter(student=self.students["CM2"]).update(balance=0, charged=0)
+        drift = reconcile(self.year)
+        self.assertEqual(drift, [(self.students["CM2"].pk, Decimal("80000"), Decimal("0"))])
+        self.assertEqual(self.balance("CM2").balance, Decimal("80000"))
+
+    def test_views(self):
+        active_context.clear_cache()
+        self.client.force_login(self.user)
+        self.client.get(reverse("switch_schoolyear", args=[self.year.pk]))
+        self.client.post(reverse("fee_charge"))
+        student = self.students["CM2"]
+        response = self.client.post(
+            reverse("finance_account", args=[student.pk]), {"amount": "30000", "method": "CASH", "reference": ""},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.balance("CM2").balance, Decimal("50000"))
+
+        response = self.client.get(reverse("finance_home"))
+        self.assertContains(response, "Élève CM2")
+        self.assertContains(response, "30000")  # caisse du jour
+        response = self.client.get(reverse("daily_cash"))
+        self.assertContains(response, LedgerEntry.objects.get(kind=LedgerEntry.Kind.PAYMENT).receipt_number)
+        response = self.client.get(reverse("finance_home"), {"classroom": self.cm1.pk})
+        self.assertNotContains(response, "Élève CM2")
+        for raw in ("abc", str(Classroom.objects.create(school=School.objects.create(name="B"), label="CP").pk)):
+            response = self.client.get(reverse("finance_home"), {"classroom": raw})  # ignoré : pas de filtre
+            self.assertContains(response, "Élève CM2")
+            self.assertEqual(response.context["selected"], "")
+        response = self.client.get(reverse("daily_cash"), {"date": "2026-02-30"})  # date impossible
+        self.assertEqual(response.context["day"], timezone.localdate())
+
+    def test_views_stay_within_the_active_school(self):
+        other = School.objects.create(name="École B")
+        other_year = SchoolYear.objects.create(
+            school=other, label="2025-2026", start_date=date(2025, 10, 1), end_date=date(2026, 6, 30)
+        )
+        outsider = Student.objects.create(
+            last_name="Autre", first_name="X", classroom=Classroom.objects.create(school=other, label="CP"),
+        )
+        fee = FeeSchedule.objects.create(school_year=other_year, label="Cantine", amount=Decimal("1000"))
+        payment = record_payment(outsider, other_year, Decimal("1000"), LedgerEntry.Method.CASH)
+        active_context.clear_cache()
+        self.client.force_login(self.user)
+        self.client.get(reverse("switch_schoolyear", args=[self.year.pk]))
+
+        self.assertEqual(self.client.get(reverse("finance_account", args=[outsider.pk])).status_code, 404)
+        response = self.client.post(
+            reverse("finance_account", args=[outsider.pk]), {"amount": "500", "method": "CASH", "reference": ""},
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(StudentBalance.objects.filter(student=outsider, school_year=self.year).exists())
+        self.assertEqual(self.client.post(reverse("ledger_reverse", args=[payment.pk])).status_code, 404)
+        self.assertFalse(LedgerEntry.objects.filter(reverses=payment).exists())
+        self.assertEqual(self.client.get(reverse("finance_receipt", args=[payment.pk])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("fee_edit", args=[fee.pk])).status_code, 404)
+        self.assertEqual(self.client.post(reverse("fee_delete", args=[fee.pk])).status_code, 404)
+        self.assertTrue(FeeSchedule.objects.filter(pk=fee.pk).exists())
+
+        # élève sorti (plus de classe) mais inscrit cette année : son compte reste accessible
+        leaver = self.students["CM1"]
+        leaver.classroom = None
+        leaver.save()
+        self.assertEqual(self.client.get(reverse("finance_account", args=[leaver.pk])).status_code, 200)
+
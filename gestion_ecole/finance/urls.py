@@ -0,0 +1,23 @@
+# finance/urls.py
+from django.urls import path
+
+from .views import (
+    ChargeFeesView, DailyCashView, FeeScheduleCreateView, FeeScheduleDeleteView, FeeScheduleListView,
+    FeeScheduleUpdateView, FinanceHomeView, ReceiptView, ReverseEntryView, StudentAccountView,
+)
+
+urlpatterns = [
+    # Tableau financier : caisse du jour + impayés (?classroom=<id>&q=<élève>)
+    path("finances/", FinanceHomeView.as_view(), name="finance_home"),
+    path("finances/eleves/<int:pk>/", StudentAccountView.as_view(), name="finance_account"),
+    path("finances/ecritures/<int:pk>/annuler/", ReverseEntryView.as_view(), name="ledger_reverse"),
+    path("finances/recus/<int:pk>/", ReceiptView.as_view(), name="finance_receipt"),
+    # Journal de caisse : ?date=AAAA-MM-JJ
+    path("finances/caisse/", DailyCashView.as_view(), name="daily_cash"),
+    # Barème des frais de l'année active
+    path("finances/frais/", FeeScheduleListView.as_view(), name="fee_list"),
+    path("finances/frais/new/", FeeScheduleCreateView.as_view(), name="fee_new"),
+    path("finances/frais/<int:pk>/edit/", FeeScheduleUpdateView.as_view(), name="fee_edit"),
+    path("finances/frais/<int:pk>/delete/", FeeScheduleDeleteView.as_view(), name="fee_delete"),
+    path("finances/frais/facturer/", ChargeFeesView.as_view(), name="fee_charge"),
+]
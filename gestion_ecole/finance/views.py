@@ -0,0 +1,303 @@
+# finance/views.py
+from datetime import datetime, time, timedelta
+
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.core.exceptions import PermissionDenied
+from django.db.models import Exists, OuterRef, ProtectedError, Q, Sum
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.functional import cached_property
+from django.views import View
+from django.views.generic import CreateView, DeleteView, ListView, TemplateView, UpdateView
+
+from catalog.models import Classroom
+from students.models import Enrollment, Student
+from students.search import search_students
+from .forms import FeeScheduleForm, PaymentForm
+from .ledger import applicable_fees, charge_fees, record_payment, reverse_entry
+from .models import DailyCash, FeeSchedule, LedgerEntry, StudentBalance
+from .receipts import receipt_pdf
+
+
+def _school_year(request):
+    return getattr(request, "active_school_year", None)
+
+
+def _students(request):
+    """Élèves de l'école active : classe courante, ou inscription dans l'une de ses années (sortants)."""
+    school = getattr(request, "active_school", None)
+    if school is None:
+        return Student.objects.none()
+    enrolled = Enrollment.objects.filter(student=OuterRef("pk"), school_year__school=school)
+    return Student.objects.filter(Q(classroom__school=school) | Q(Exists(enrolled)))
+
+
+def _day(raw):
+    """?date=AAAA-MM-JJ ; absente, mal formée ou impossible (2026-02-30) : aujourd'hui."""
+    try:
+        return parse_date(raw or "") or timezone.localdate()
+    except ValueError:
+        return timezone.localdate()
+
+
+def _entries(request):
+    """Écritures de l'année active (annulation, reçus) : jamais celles d'une autre école."""
+    return LedgerEntry.objects.filter(school_year=_school_year(request))
+
+
+# ——————————————————————————————————————
+#  Tableau financier : caisse du jour + impayés (lectures d'index)
+# ——————————————————————————————————————
+class FinanceHomeView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+    """GET /finances/?classroom=<id>&q=<élève> : impayés de l'année active, du plus gros au plus petit."""
+    permission_required = "finance.view_ledgerentry"
+    template_name = "finance/home.html"
+    context_object_name = "balances"
+    paginate_by = 50
+
+    @cached_property
+    def classrooms(self):
+        """Classes de l'école active : liste du filtre, et contrôle de ?classroom= sans autre requête."""
+        school_year = _school_year(self.request)
+        if school_year is None:
+            return []
+        return list(Classroom.objects.filter(school_id=school_year.school_id).order_by("label"))
+
+    @cached_property
+    def classroom_id(self):
+        """?classroom= : id d'une classe de l'école active, sinon None (pas de filtre)."""
+        try:
+            pk = int(self.request.GET.get("classroom") or "")
+        except ValueError:
+            return None
+        return pk if any(c.pk == pk for c in self.classrooms) else None
+
+    def get_queryset(self):
+        school_year = _school_year(self.request)
+        if school_year is None:
+            return StudentBalance.objects.none()
+        qs = StudentBalance.objects.filter(school_year=school_year, balance__gt=0)
+        if self.classroom_id is not None:
+            qs = qs.filter(student__classroom_id=self.classroom_id)
+        return qs.select_related("student__classroom").order_by("-balance", "student_id")
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        school_year = _school_year(self.request)
+        ctx["school_year"] = school_year
+        if school_year is None:
+            return ctx
+        today = timezone.localdate()
+        cash = list(DailyCash.objects.filter(school_id=school_year.school_id, date=today).order_by("method"))
+        ctx.update(
+            today=today, cash=cash, cash_total=sum(c.total for c in cash),
+            classrooms=self.classrooms,
+            selected=str(self.classroom_id or ""),
+            outstanding=StudentBalance.objects.filter(school_year=school_year, balance__gt=0).aggregate(
+                total=Sum("balance")
+            )["total"],
+        )
+        q = (self.request.GET.get("q") or "").strip()
+        if q:
+            students = Student.objects.filter(classroom__school_id=school_year.school_id)
+            ctx["q"] = q
+            ctx["found"] = search_students(students, q).select_related("classroom").order_by("-search_rank")[:20]
+        return ctx
+
+
+# ——————————————————————————————————————
+#  Compte d'un élève : relevé + encaissement
+# ——————————————————————————————————————
+class StudentAccountView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
+    """GET : relevé de l'année active ; POST (finance.add_ledgerentry) : encaisse un paiement."""
+    permission_required = "finance.view_ledgerentry"
+    template_name = "finance/account.html"
+
+    @cached_property
+    def student(self):
+        return get_object_or_404(_students(self.request).select_related("classroom"), pk=self.kwargs["pk"])
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        school_year = _school_year(self.request)
+        ctx.update(student=self.student, school_year=school_year, form=kwargs.get("form") or PaymentForm())
+        if school_year is not None:
+            ctx["entries"] = (
+                LedgerEntry.objects.filter(student=self.student, school_year=school_year)
+                .select_related("fee", "reverses", "reversed_by").order_by("created_at", "pk")
+            )
+            ctx["balance"] = StudentBalance.objects.filter(student=self.student, school_year=school_year).first()
+            if self.student.classroom_id:
+                ctx["fees"] = applicable_fees(school_year).get(self.student.classroom_id, [])
+        return ctx
+
+    def post(self, request, *args, **kwargs):
+        if not request.user.has_perm("finance.add_ledgerentry"):
+            raise PermissionDenied
+        school_year = _school_year(request)
+        if school_year is None:
+            messages.error(request, "Sélectionnez d'abord une année scolaire active.")
+            return redirect("finance_account", pk=self.student.pk)
+        form = PaymentForm(request.POST)
+        if not form.is_valid():
+            return self.render_to_response(self.get_context_data(form=form))
+        entry = record_payment(self.student, school_year, user=request.user, **form.cleaned_data)
+        messages.success(request, f"Paiement de {entry.amount} enregistré (reçu {entry.receipt_number}).")
+        return redirect("finance_account", pk=self.student.pk)
+
+
+class ReverseEntryView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """POST /finances/ecritures/<pk>/annuler/ : écriture d'annulation (droit « supprimer » du grand livre)."""
+    permission_required = "finance.delete_ledgerentry"
+
+    def post(self, request, pk):
+        entry = get_object_or_404(_entries(request).select_related("school_year"), pk=pk)
+        try:
+            reverse_entry(entry, user=request.user, reference=request.POST.get("reference", "")[:100])
+        except ValueError as exc:
+            messages.error(request, str(exc))
+        else:
+            messages.success(request, f"{entry.get_kind_display()} de {entry.amount} annulé(e).")
+        return redirect("finance_account", pk=entry.student_id)
+
+
+class ReceiptView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """GET /finances/recus/<pk>/ : reçu PDF d'un paiement."""
+    permission_required = "finance.view_ledgerentry"
+
+    def get(self, request, pk):
+        entry = get_object_or_404(
+            _entries(request).select_related("student__classroom", "school_year__school", "created_by"),
+            pk=pk, kind=LedgerEntry.Kind.PAYMENT,
+        )
+        return HttpResponse(
+            receipt_pdf(entry), content_type="application/pdf",
+            headers={"Content-Disposition": f'inline; filename="recu_{entry.receipt_number}.pdf"'},
+        )
+
+
+# ——————————————————————————————————————
+#  Journal de caisse d'une journée
+# ——————————————————————————————————————
+class DailyCashView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
+    """GET /finances/caisse/?date=AAAA-MM-JJ : totaux par mode (DailyCash) et détail des opérations."""
+    permission_required = "finance.view_ledgerentry"
+    template_name = "finance/daily_cash.html"
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        school = getattr(self.request, "active_school", None)
+        day = _day(self.request.GET.get("date"))
+        ctx.update(day=day, previous=day - timedelta(days=1), next=day + timedelta(days=1))
+        if school is None:
+            return ctx
+        cash = list(DailyCash.objects.filter(school=school, date=day).order_by("method"))
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        ctx.update(
+            cash=cash, cash_total=sum(c.total for c in cash),
+            operations=LedgerEntry.objects.filter(
+                kind__in=[LedgerEntry.Kind.PAYMENT, LedgerEntry.Kind.REVERSAL],
+                created_at__gte=start, created_at__lt=start + timedelta(days=1),
+                school_year__school=school,
+            ).exclude(kind=LedgerEntry.Kind.REVERSAL, reverses__kind=LedgerEntry.Kind.CHARGE)
+            .select_related("student", "reverses", "created_by").order_by("created_at", "pk"),
+        )
+        return ctx
+
+
+# ——————————————————————————————————————
+#  Barème des frais (année active)
+# ——————————————————————————————————————
+class FeeScheduleListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+    permission_required = "finance.view_feeschedule"
+    template_name = "finance/fee_list.html"
+    context_object_name = "items"
+
+    def get_queryset(self):
+        school_year = _school_year(self.request)
+        if school_year is None:
+            return FeeSchedule.objects.none()
+        return FeeSchedule.objects.filter(school_year=school_year).select_related("cycle", "classroom")
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["school_year"] = _school_year(self.request)
+        return ctx
+
+
+class FeeScheduleCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
+    permission_required = "finance.add_feeschedule"
+    model = FeeSchedule
+    form_class = FeeScheduleForm
+    template_name = "catalog/form.html"
+    success_url = reverse_lazy("fee_list")
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated and _school_year(request) is None:
+            messages.error(request, "Sélectionnez d'abord une année scolaire active.")
+            return redirect("fee_list")
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["instance"] = FeeSchedule(school_year=_school_year(self.request))
+        return kwargs
+
+    def form_valid(self, form):
+        messages.success(self.request, "Frais créés.")
+        return super().form_valid(form)
+
+
+class FeeScheduleUpdateView(LoginRequiredMixin, PermissionRequiredMixin, UpdateView):
+    permission_required = "finance.change_feeschedule"
+    model = FeeSchedule
+    form_class = FeeScheduleForm
+    template_name = "catalog/form.html"
+    success_url = reverse_lazy("fee_list")
+
+    def get_queryset(self):
+        # Frais de l'année active seulement (pas ceux d'une autre école)
+        return FeeSchedule.objects.filter(school_year=_school_year(self.request))
+
+    def form_valid(self, form):
+        messages.success(self.request, "Frais mis à jour (les frais déjà facturés ne changent pas).")
+        return super().form_valid(form)
+
+
+class FeeScheduleDeleteView(LoginRequiredMixin, PermissionRequiredMixin, DeleteView):
+    permission_required = "finance.delete_feeschedule"
+    model = FeeSchedule
+    template_name = "catalog/confirm_delete.html"
+    success_url = reverse_lazy("fee_list")
+
+    def get_queryset(self):
+        # Frais de l'année active seulement (pas ceux d'une autre école)
+        return FeeSchedule.objects.filter(school_year=_school_year(self.request))
+
+    def form_valid(self, form):
+        try:
+            return super().form_valid(form)
+        except ProtectedError:
+            messages.error(self.request, "Ces frais ont déjà été facturés : annulez les écritures d'abord.")
+            return redirect("fee_list")
+
+
+class ChargeFeesView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """POST /finances/frais/facturer/ [classroom=<id>] : passe les frais dus (idempotent)."""
+    permission_required = "finance.add_ledgerentry"
+
+    def post(self, request):
+        school_year = _school_year(request)
+        if school_year is None:
+            messages.error(request, "Sélectionnez d'abord une année scolaire active.")
+            return redirect("fee_list")
+        classroom = None
+        if request.POST.get("classroom"):
+            classroom = get_object_or_404(Classroom, pk=request.POST["classroom"], school_id=school_year.school_id)
+        created = charge_fees(school_year, classroom=classroom, user=request.user)
+        messages.success(request, f"{created} frais facturé(s).")
+        return redirect(reverse("fee_list"))
@@ -0,0 +1,26 @@
+# grading/admin.py
+from django.contrib import admin
+
+from .models import Mark, TermResult
+
+
+@admin.register(Mark)
+class MarkAdmin(admin.ModelAdmin):
+    list_display = ("student", "subject", "classroom", "school_year", "term", "value", "out_of")
+    list_filter = ("school_year", "term", "classroom", "subject")
+    list_select_related = ("student", "subject", "classroom", "school_year", "school_year__school")
+    autocomplete_fields = ("student", "classroom")
+
+
+@admin.register(TermResult)
+class TermResultAdmin(admin.ModelAdmin):
+    # table dérivée (grading/results.py) : consultation seulement
+    list_display = ("student", "classroom", "school_year", "term", "average", "rank", "ranked", "computed_at")
+    list_filter = ("school_year", "term", "classroom")
+    list_select_related = ("student", "classroom", "school_year", "school_year__school")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
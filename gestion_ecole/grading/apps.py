@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class GradingConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'grading'
+    verbose_name = "Notes"
+
+    def ready(self):
+        from . import signals  # noqa
@@ -0,0 +1,81 @@
+# grading/entry.py
+"""
+Saisie des notes par colonne (une matière, une classe, un trimestre).
+
+- parse_column() : valeurs du formulaire -> {élève: Decimal | None} + erreurs ;
+- save_column() : une transaction, une lecture des notes existantes puis
+  bulk_create (nouvelles cases) et bulk_update (cases modifiées) — quelques
+  requêtes pour toute la colonne, quel que soit l'effectif.
+Une case vidée garde sa ligne avec value = NULL (non noté). Les résultats de
+la classe sont remis en file de recalcul (cf. grading/results.py).
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Mark
+from .results import schedule
+
+BATCH_SIZE = 500
+MAX_OUT_OF = 100
+FIELD_PREFIX = "mark_"
+
+
+def parse_out_of(raw, default):
+    try:
+        out_of = int(raw)
+    except (TypeError, ValueError):
+        return default
+    return out_of if 1 <= out_of <= MAX_OUT_OF else default
+
+
+def parse_column(data, student_ids, out_of):
+    """({student_id: Decimal | None}, {student_id: message d'erreur})."""
+    values, errors = {}, {}
+    for sid in student_ids:
+        raw = (data.get(f"{FIELD_PREFIX}{sid}") or "").strip().replace(",", ".")
+        if not raw:
+            values[sid] = None
+            continue
+        try:
+            value = Decimal(raw).quantize(Decimal("0.01"))
+        except InvalidOperation:
+            errors[sid] = f"« {raw} » n'est pas une note."
+            continue
+        if not 0 <= value <= out_of:
+            errors[sid] = f"La note doit être comprise entre 0 et {out_of}."
+            continue
+        values[sid] = value
+    return values, errors
+
+
+@transaction.atomic
+def save_column(classroom, school_year, term, subject, values, out_of):
+    """Enregistre la colonne ; retourne (cases créées, cases modifiées)."""
+    existing = {
+        m.student_id: m
+        for m in Mark.objects.select_for_update().filter(
+            school_year=school_year, term=term, subject=subject, student_id__in=list(values),
+        )
+    }
+    now = timezone.now()
+    to_create, to_update = [], []
+    keys = {(classroom.pk, school_year.pk, term)}
+    for sid, value in values.items():
+        mark = existing.get(sid)
+        if mark is None:
+            if value is not None:
+                to_create.append(Mark(
+                    student_id=sid, classroom=classroom, school_year=school_year,
+                    subject=subject, term=term, value=value, out_of=out_of,
+                ))
+        elif (mark.value, mark.out_of, mark.classroom_id) != (value, out_of, classroom.pk):
+            keys.add((mark.classroom_id, school_year.pk, term))  # ancienne classe éventuelle
+            mark.value, mark.out_of, mark.classroom_id, mark.updated_at = value, out_of, classroom.pk, now
+            to_update.append(mark)
+    Mark.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+    Mark.objects.bulk_update(to_update, ["value", "out_of", "classroom", "updated_at"], batch_size=BATCH_SIZE)
+    if to_create or to_update:
+        schedule(keys)
+    return len(to_create), len(to_update)
@@ -0,0 +1,50 @@
+"""
+Reconstruction des résultats trimestriels matérialisés (TermResult).
+
+    python manage.py rebuild_results                 # toutes les années, 3 trimestres
+    python manage.py rebuild_results --year 4 --term 2
+    python manage.py rebuild_results --pending       # file en attente seulement (cron, après redémarrage)
+
+À lancer après un import de notes hors application (SQL direct, loaddata)
+ou au premier déploiement. Une école entière = une matrice NumPy, un upsert.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.models import SchoolYear
+from grading.models import Mark
+from grading.results import process_due, rebuild
+
+
+class Command(BaseCommand):
+    help = "Recalcule les moyennes et rangs matérialisés (TermResult)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, action="append", help="id d'année scolaire (répétable ; défaut : toutes)")
+        parser.add_argument("--term", type=int, choices=Mark.Term.values, action="append", help="Trimestre (répétable)")
+        parser.add_argument("--pending", action="store_true", help="Traiter seulement la file de recalcul échue")
+
+    def handle(self, *args, **opts):
+        if opts["pending"]:
+            start = time.perf_counter()
+            wait = process_due()
+            self.stdout.write(f"File traitée en {time.perf_counter() - start:.2f} s"
+                              + (f" (prochaine échéance dans {wait:.0f} s)" if wait is not None else ""))
+            return
+
+        years = SchoolYear.objects.select_related("school").order_by("school__name", "-start_date")
+        if opts["year"]:
+            years = years.filter(pk__in=opts["year"])
+            if not years:
+                raise CommandError("Aucune année scolaire trouvée.")
+        terms = opts["term"] or Mark.Term.values
+        total = 0
+        for year in years:
+            for term in terms:
+                start = time.perf_counter()
+                rows = rebuild(year, term)
+                total += rows
+                if rows:
+                    self.stdout.write(f"{year} T{term} : {rows} élève(s) en {time.perf_counter() - start:.2f} s")
+        self.stdout.write(self.style.SUCCESS(f"{total} résultat(s) recalculé(s)"))
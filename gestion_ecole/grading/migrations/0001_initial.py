@@ -0,0 +1,37 @@
+# Generated by Django 5.1.1 on 2026-10-17 15:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('catalog', '0007_change_stamp'),
+        ('students', '0008_promotion_journal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Mark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.PositiveSmallIntegerField(choices=[(1, '1er trimestre'), (2, '2e trimestre'), (3, '3e trimestre')], verbose_name='Trimestre')),
+                ('value', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, verbose_name='Note')),
+                ('out_of', models.PositiveSmallIntegerField(default=20, verbose_name='Sur')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('classroom', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='marks', to='catalog.classroom', verbose_name='Classe')),
+                ('school_year', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='marks', to='catalog.schoolyear', verbose_name='Année scolaire')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='marks', to='students.student', verbose_name='Élève')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='marks', to='catalog.subject', verbose_name='Matière')),
+            ],
+            options={
+                'verbose_name': 'Note',
+                'verbose_name_plural': 'Notes',
+                'indexes': [models.Index(fields=['school_year', 'term', 'classroom'], name='idx_mark_year_term_class')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'subject', 'school_year', 'term'), name='uniq_mark_student_subject_term')],
+            },
+        ),
+    ]
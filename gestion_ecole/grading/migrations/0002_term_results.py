@@ -0,0 +1,53 @@
+# Generated by Django 5.1.1 on 2026-10-17 15:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_change_stamp'),
+        ('grading', '0001_initial'),
+        ('students', '0008_promotion_journal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.PositiveSmallIntegerField(choices=[(1, '1er trimestre'), (2, '2e trimestre'), (3, '3e trimestre')])),
+                ('due_at', models.DateTimeField(db_index=True)),
+                ('classroom', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.classroom')),
+                ('school_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.schoolyear')),
+            ],
+            options={
+                'verbose_name': 'Recalcul en attente',
+                'verbose_name_plural': 'Recalculs en attente',
+                'constraints': [models.UniqueConstraint(fields=('classroom', 'school_year', 'term'), name='uniq_result_refresh')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TermResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.PositiveSmallIntegerField(choices=[(1, '1er trimestre'), (2, '2e trimestre'), (3, '3e trimestre')], verbose_name='Trimestre')),
+                ('average', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, verbose_name='Moyenne')),
+                ('rank', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Rang')),
+                ('ranked', models.PositiveSmallIntegerField(default=0, verbose_name='Élèves classés')),
+                ('scale', models.PositiveSmallIntegerField(default=20, verbose_name='Barème')),
+                ('marks', models.JSONField(default=dict, verbose_name='Notes par matière')),
+                ('computed_at', models.DateTimeField()),
+                ('classroom', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.classroom')),
+                ('school_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.schoolyear')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_results', to='students.student')),
+            ],
+            options={
+                'verbose_name': 'Résultat trimestriel',
+                'verbose_name_plural': 'Résultats trimestriels',
+                'indexes': [models.Index(fields=['school_year', 'term', 'classroom', 'rank'], name='idx_result_class_rank'), models.Index(fields=['school_year', 'term', 'rank'], name='idx_result_term_rank')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'school_year', 'term'), name='uniq_result_student_term')],
+            },
+        ),
+    ]
@@ -0,0 +1,103 @@
+# grading/models.py
+from django.db import models
+
+from catalog.models import Classroom, SchoolYear, Subject
+from students.models import Student
+
+
+class Mark(models.Model):
+    """
+    Note d'un élève dans une matière pour un trimestre : une ligne par case de
+    la grille de saisie (élève × matière × année × trimestre).
+    `value` est saisie sur `out_of` (barème du devoir) puis ramenée au barème
+    du cycle de la classe au calcul des moyennes (cf. grading/engine.py).
+    """
+    class Term(models.IntegerChoices):
+        T1 = 1, "1er trimestre"
+        T2 = 2, "2e trimestre"
+        T3 = 3, "3e trimestre"
+
+    student = models.ForeignKey(Student, verbose_name="Élève", on_delete=models.CASCADE, related_name="marks")
+    # classe au moment de la saisie : la grille d'une classe se lit sans jointure
+    classroom = models.ForeignKey(Classroom, verbose_name="Classe", on_delete=models.PROTECT, related_name="marks")
+    school_year = models.ForeignKey(
+        SchoolYear, verbose_name="Année scolaire", on_delete=models.PROTECT, related_name="marks"
+    )
+    subject = models.ForeignKey(Subject, verbose_name="Matière", on_delete=models.PROTECT, related_name="marks")
+    term = models.PositiveSmallIntegerField("Trimestre", choices=Term.choices)
+    value = models.DecimalField("Note", max_digits=5, decimal_places=2, null=True, blank=True)  # NULL = non noté
+    out_of = models.PositiveSmallIntegerField("Sur", default=20)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Note"
+        verbose_name_plural = "Notes"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "subject", "school_year", "term"], name="uniq_mark_student_subject_term"
+            ),
+        ]
+        indexes = [
+            # Matrice d'une classe (ou de toute l'école) pour un trimestre : une lecture d'index
+            models.Index(fields=["school_year", "term", "classroom"], name="idx_mark_year_term_class"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.student_id} — {self.subject_id} T{self.term} : {self.value}/{self.out_of}"
+
+
+class TermResult(models.Model):
+    """
+    Résultats matérialisés d'un élève pour un trimestre : notes ramenées au
+    barème, moyenne générale et rang dans la classe. Table dérivée de Mark,
+    recalculée par classe (cf. grading/results.py) : bulletins et tableau
+    d'honneur la lisent sans refaire le calcul.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="term_results")
+    classroom = models.ForeignKey(Classroom, on_delete=models.CASCADE, related_name="+")
+    school_year = models.ForeignKey(SchoolYear, on_delete=models.CASCADE, related_name="+")
+    term = models.PositiveSmallIntegerField("Trimestre", choices=Mark.Term.choices)
+    average = models.DecimalField("Moyenne", max_digits=5, decimal_places=2, null=True, blank=True)
+    rank = models.PositiveSmallIntegerField("Rang", null=True, blank=True)  # NULL = non classé
+    ranked = models.PositiveSmallIntegerField("Élèves classés", default=0)
+    scale = models.PositiveSmallIntegerField("Barème", default=20)
+    marks = models.JSONField("Notes par matière", default=dict)  # {str(subject_id): note /scale}
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Résultat trimestriel"
+        verbose_name_plural = "Résultats trimestriels"
+        constraints = [
+            models.UniqueConstraint(fields=["student", "school_year", "term"], name="uniq_result_student_term"),
+        ]
+        indexes = [
+            # Bulletins / liste d'une classe par rang
+            models.Index(fields=["school_year", "term", "classroom", "rank"], name="idx_result_class_rank"),
+            # Tableau d'honneur : N premiers de chaque classe
+            models.Index(fields=["school_year", "term", "rank"], name="idx_result_term_rank"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.student_id} T{self.term} : {self.average} ({self.rank or '—'})"
+
+
+class ResultRefresh(models.Model):
+    """
+    File des recalculs de TermResult : une ligne par (classe, année, trimestre)
+    à recalculer à partir de `due_at`. Chaque modification de note repousse
+    l'échéance (anti-rebond) ; la file survit à un redémarrage.
+    """
+    classroom = models.ForeignKey(Classroom, on_delete=models.CASCADE, related_name="+")
+    school_year = models.ForeignKey(SchoolYear, on_delete=models.CASCADE, related_name="+")
+    term = models.PositiveSmallIntegerField(choices=Mark.Term.choices)
+    due_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "Recalcul en attente"
+        verbose_name_plural = "Recalculs en attente"
+        constraints = [
+            models.UniqueConstraint(fields=["classroom", "school_year", "term"], name="uniq_result_refresh"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.classroom_id} / {self.school_year_id} T{self.term} ({self.due_at:%H:%M:%S})"
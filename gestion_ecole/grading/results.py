@@ -0,0 +1,168 @@
+# grading/results.py
+"""
+Résultats trimestriels matérialisés (table TermResult).
+
+- schedule() : une note change -> (classe, année, trimestre) entre dans la
+  file ResultRefresh, échéance à RESULTS_DEBOUNCE secondes ; chaque nouvelle
+  modification repousse l'échéance : une saisie de colonne ou une rafale de
+  corrections ne coûte qu'UN recalcul de la classe ;
+- un fil de fond par processus traite les échéances (RESULTS_DEBOUNCE = 0 :
+  recalcul synchrone à la validation de la transaction) ; la file étant en
+  base, `manage.py rebuild_results --pending` reprend ce qu'un redémarrage
+  aurait laissé ;
+- recompute_class() : moteur NumPy pour la classe, puis un upsert
+  (bulk_create … update_conflicts, cf. _upsert pour MySQL) de ses lignes ;
+- rebuild() : toute l'école pour un trimestre (une seule matrice) ;
+- class_term_results() : lecture indexée pour les bulletins ; une classe
+  encore en file est recalculée sur place (un bulletin n'est jamais en retard).
+"""
+import logging
+import threading
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from catalog.models import Classroom
+from .engine import DECIMALS, class_results, school_results
+from .models import ResultRefresh, TermResult
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+_UPDATE_FIELDS = ["classroom", "average", "rank", "ranked", "scale", "marks", "computed_at"]
+
+
+# ——— Écriture
+def _upsert(model, rows, unique_fields, update_fields, batch_size=None):
+    """
+    bulk_create … update_conflicts. MySQL (ON DUPLICATE KEY UPDATE) ne prend
+    pas de cible de conflit : unique_fields n'est passé qu'aux bases qui
+    l'acceptent (PostgreSQL, SQLite) ; sinon toute clé unique déclenche la mise à jour.
+    """
+    features = connections[router.db_for_write(model)].features
+    target = unique_fields if features.supports_update_conflicts_with_target else None
+    model.objects.bulk_create(
+        rows, batch_size=batch_size, update_conflicts=True, unique_fields=target, update_fields=update_fields,
+    )
+
+
+def _save(results, school_year_id, term, classroom_id=None):
+    """Upsert des résultats ; supprime les lignes devenues sans objet (élèves partis)."""
+    now = timezone.now()
+    keys = [str(s.pk) for s in results.subjects]
+    marks = np.round(results.marks, DECIMALS).tolist()
+    averages, ranks = results.averages.tolist(), results.ranks.tolist()
+    class_ids, scales = results.classroom_ids.tolist(), results.scales.tolist()
+    classes, counts = np.unique(results.classroom_ids[results.ranks > 0], return_counts=True)
+    ranked = dict(zip(classes.tolist(), counts.tolist()))
+
+    rows = [
+        TermResult(
+            student_id=sid, classroom_id=class_ids[i], school_year_id=school_year_id, term=term,
+            average=None if averages[i] != averages[i] else Decimal(f"{averages[i]:.{DECIMALS}f}"),  # NaN
+            rank=ranks[i] or None, ranked=ranked.get(class_ids[i], 0), scale=int(scales[i]),
+            marks={k: v for k, v in zip(keys, marks[i]) if v == v}, computed_at=now,
+        )
+        for i, sid in enumerate(results.student_ids.tolist())
+    ]
+    with transaction.atomic():
+        _upsert(TermResult, rows, ["student", "school_year", "term"], _UPDATE_FIELDS, batch_size=BATCH_SIZE)
+        stale = TermResult.objects.filter(school_year_id=school_year_id, term=term)
+        if classroom_id is not None:
+            stale = stale.filter(classroom_id=classroom_id)
+        stale.exclude(computed_at=now).delete()
+    return rows
+
+
+def recompute_class(classroom, school_year_id, term):
+    """[TermResult] de la classe, recalculés et enregistrés."""
+    results = class_results(classroom, school_year_id, term)
+    return _save(results, school_year_id, term, classroom.pk)
+
+
+def rebuild(school_year, term):
+    """Toute l'école pour un trimestre ; vide la file correspondante. Retourne le nombre de lignes."""
+    rows = _save(school_results(school_year, term), school_year.pk, term)
+    ResultRefresh.objects.filter(school_year=school_year, term=term).delete()
+    return len(rows)
+
+
+# ——— File de recalcul (anti-rebond)
+def schedule(keys):
+    """keys : [(classroom_id, school_year_id, term)] dont les résultats sont à refaire."""
+    keys = {k for k in keys if None not in k}
+    if not keys:
+        return
+    debounce = settings.RESULTS_DEBOUNCE
+    due = timezone.now() + timedelta(seconds=debounce)
+    _upsert(
+        ResultRefresh,
+        [ResultRefresh(classroom_id=c, school_year_id=y, term=t, due_at=due) for c, y, t in keys],
+        ["classroom", "school_year", "term"], ["due_at"],
+    )
+    transaction.on_commit(process_due if debounce <= 0 else _debouncer.kick)
+
+
+def process_due():
+    """Recalcule les classes arrivées à échéance ; secondes avant la suivante (None : file vide)."""
+    now = timezone.now()
+    due = list(ResultRefresh.objects.filter(due_at__lte=now).order_by("due_at"))
+    classrooms = Classroom.objects.in_bulk({item.classroom_id for item in due})
+    for item in due:
+        classroom = classrooms.get(item.classroom_id)
+        if classroom is not None:
+            recompute_class(classroom, item.school_year_id, item.term)
+        # une note modifiée pendant le calcul a repoussé due_at : la ligne reste
+        ResultRefresh.objects.filter(pk=item.pk, due_at=item.due_at).delete()
+    upcoming = ResultRefresh.objects.order_by("due_at").values_list("due_at", flat=True).first()
+    if upcoming is None:
+        return None
+    return max(0.0, (upcoming - timezone.now()).total_seconds())
+
+
+class _Debouncer:
+    """Fil de fond (démarré au premier besoin) qui attend la prochaine échéance de la file."""
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def kick(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="term-results", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        wait = None
+        while True:
+            self._wake.wait(wait)  # None : jusqu'au prochain kick()
+            self._wake.clear()
+            try:
+                wait = process_due()
+            except Exception:  # base momentanément indisponible : nouvel essai plus tard
+                logger.exception("Recalcul des résultats trimestriels")
+                wait = max(settings.RESULTS_DEBOUNCE, 1)
+            finally:
+                connections.close_all()  # connexions de ce fil uniquement
+
+
+_debouncer = _Debouncer()
+
+
+# ——— Lecture
+def class_term_results(classroom, school_year, term):
+    """{student_id: TermResult} de la classe (une lecture indexée)."""
+    pending = ResultRefresh.objects.filter(classroom=classroom, school_year=school_year, term=term)
+    if pending.exists():
+        rows = recompute_class(classroom, school_year.pk, term)
+        pending.delete()
+    else:
+        rows = list(TermResult.objects.filter(school_year=school_year, term=term, classroom=classroom))
+    return {row.student_id: row for row in rows}
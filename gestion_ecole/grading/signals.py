@@ -0,0 +1,56 @@
+# grading/signals.py
+"""
+Mise en file des recalculs de TermResult (cf. grading/results.py).
+La saisie par colonne (bulk_create / bulk_update, sans signaux) appelle
+schedule() elle-même.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from catalog.models import Classroom, Cycle, Subject
+from students.models import Enrollment
+from .models import Mark, TermResult
+from .results import schedule
+
+_KEY = ("classroom_id", "school_year_id", "term")
+
+
+@receiver([post_save, post_delete], sender=Mark)
+def mark_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule([(instance.classroom_id, instance.school_year_id, instance.term)])
+
+
+@receiver(post_save, sender=Subject)
+def subject_changed(sender, instance, created, raw=False, **kwargs):
+    # coefficient : toutes les classes notées dans la matière
+    if not (created or raw):
+        schedule(Mark.objects.filter(subject=instance).values_list(*_KEY).distinct())
+
+
+@receiver(post_save, sender=Cycle)
+def cycle_changed(sender, instance, created, raw=False, **kwargs):
+    # barème (notation) des classes du cycle
+    if not (created or raw):
+        schedule(TermResult.objects.filter(classroom__cycle=instance).values_list(*_KEY).distinct())
+
+
+@receiver(post_save, sender=Classroom)
+def classroom_changed(sender, instance, created, raw=False, **kwargs):
+    # changement de cycle, donc de barème
+    if not (created or raw):
+        schedule(TermResult.objects.filter(classroom=instance).values_list(*_KEY).distinct())
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def enrollment_changed(sender, instance, raw=False, **kwargs):
+    # effectif classé de la classe (rangs) ; ancienne classe de l'élève s'il change de classe
+    if raw:
+        return
+    keys = set(Mark.objects.filter(
+        classroom_id=instance.classroom_id, school_year_id=instance.school_year_id,
+    ).values_list(*_KEY).distinct())
+    keys.update(TermResult.objects.filter(
+        student_id=instance.student_id, school_year_id=instance.school_year_id,
+    ).values_list(*_KEY))
+    schedule(keys)
@@ -0,0 +1,175 @@
+from datetime import date
+from io import StringIO
+from decimal import Decimal
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from catalog.models import Classroom, Cycle, School, SchoolYear, Subject
+from core import active_context
+from students.models import Enrollment, Student
+from .engine import class_results, group_ranks, school_results, weighted_averages
+from .models import Mark, ResultRefresh, TermResult
+from .results import class_term_results, recompute_class, schedule
+
+
+class EngineArrayTests(SimpleTestCase):
+    def test_weighted_averages_skip_unmarked(self):
+        marks = np.array([[10.0, 16.0], [np.nan, 12.0], [np.nan, np.nan]])
+        averages = weighted_averages(marks, np.array([1.0, 3.0]))
+        self.assertEqual(averages[0], 14.5)
+        self.assertEqual(averages[1], 12.0)
+        self.assertTrue(np.isnan(averages[2]))
+
+    def test_group_ranks_ties_per_group(self):
+        groups = np.array([1, 1, 1, 1, 2, 2, 2])
+        values = np.array([12.0, 15.0, 15.0, 9.0, 8.0, np.nan, 11.0])
+        self.assertEqual(group_ranks(groups, values).tolist(), [3, 1, 1, 4, 2, 0, 1])
+
+
+class TermResultsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        school = School.objects.create(name="École A")
+        cls.year = SchoolYear.objects.create(
+            school=school, label="2025-2026", start_date=date(2025, 10, 1), end_date=date(2026, 6, 30)
+        )
+        cls.classroom = Classroom.objects.create(
+            school=school, label="7ème Année A", cycle=Cycle.objects.create(name="Second Cycle", notation=10)
+        )
+        other = Classroom.objects.create(school=school, label="CP")  # sans cycle : /20
+        cls.maths = Subject.objects.create(school=school, name="Maths", coefficient=Decimal("3"))
+        cls.french = Subject.objects.create(school=school, name="Français", coefficient=Decimal("1"))
+        cls.students = []
+        for i, classroom in enumerate([cls.classroom] * 3 + [other]):
+            student = Student.objects.create(last_name=f"Nom{i}", first_name="X", classroom=classroom)
+            Enrollment.objects.create(student=student, classroom=classroom, school_year=cls.year)
+            cls.students.append(student)
+        a, b, c, d = cls.students
+        for student, subject, value, out_of in [
+            (a, cls.maths, "16", 20), (a, cls.french, "8", 10),
+            (b, cls.maths, "8", 10), (b, cls.french, "8", 10),
+            (c, cls.french, None, 20),
+            (d, cls.maths, "14", 20),
+        ]:
+            Mark.objects.create(
+                student=student, classroom=student.classroom, school_year=cls.year, subject=subject,
+                term=1, value=value, out_of=out_of,
+            )
+        cls.user = get_user_model().objects.create_superuser("direction", "d@ecole.test", "x")
+
+    def test_class_results_normalised_to_cycle_scale(self):
+        a, b, c, _ = self.students
+        with self.assertNumQueries(2):  # inscriptions + notes (matières fournies)
+            results = class_results(self.classroom, self.year, 1, [self.french, self.maths])
+        self.assertEqual(results.student(a.pk), {"marks": [8.0, 8.0], "average": 8.0, "rank": 1, "scale": 10})
+        self.assertEqual(results.student(b.pk)["rank"], 1)
+        self.assertEqual(results.student(c.pk), {"marks": [None, None], "average": None, "rank": None, "scale": 10})
+        self.assertEqual(results.ranked(self.classroom.pk), 2)
+        french = results.subject_stats(self.classroom.pk)[0]
+        self.assertEqual((french["count"], french["mean"], french["min"], french["max"]), (2, 8.0, 8.0, 8.0))
+
+    def test_school_results_rank_per_classroom(self):
+        results = school_results(self.year, 1)
+        d = self.students[3]
+        self.assertEqual(results.student(d.pk), {"marks": [None, 14.0], "average": 14.0, "rank": 1, "scale": 20})
+
+    def test_grid_saves_column(self):
+        a, b, c, _ = self.students
+        active_context.clear_cache()  # cache du processus : ids recyclés d'une classe de tests à l'autre
+        self.client.force_login(self.user)
+        self.client.get(reverse("switch_schoolyear", args=[self.year.pk]))
+        url = reverse("mark_grid")
+        data = {
+            "classroom": self.classroom.pk, "term": 1, "subject": self.french.pk, "out_of": 10,
+            f"mark_{a.pk}": "9,5", f"mark_{b.pk}": "", f"mark_{c.pk}": "7",
+        }
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+        marks = dict(Mark.objects.filter(subject=self.french, term=1).values_list("student_id", "value"))
+        self.assertEqual(marks[a.pk], Decimal("9.5"))
+        self.assertIsNone(marks[b.pk])
+        self.assertEqual(marks[c.pk], Decimal("7"))
+
+        data[f"mark_{a.pk}"] = "12"  # > barème : rien n'est enregistré
+        response = self.client.post(url, data)
+        self.assertContains(response, "invalide")
+        self.assertEqual(Mark.objects.get(student=a, subject=self.french).value, Decimal("9.5"))
+
+
+class MaterializedResultsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        school = School.objects.create(name="École A")
+        cls.year = SchoolYear.objects.create(
+            school=school, label="2025-2026", start_date=date(2025, 10, 1), end_date=date(2026, 6, 30)
+        )
+        cls.classroom = Classroom.objects.create(school=school, label="6ème Année")
+        cls.subject = Subject.objects.create(school=school, name="Maths", coefficient=Decimal("2"))
+        cls.students = []
+        for i in range(3):
+            student = Student.objects.create(last_name=f"Nom{i}", first_name="X", classroom=cls.classroom)
+            Enrollment.objects.create(student=student, classroom=cls.classroom, school_year=cls.year)
+            cls.students.append(student)
+
+    def add_mark(self, student, value):
+        return Mark.objects.create(
+            student=student, classroom=self.classroom, school_year=self.year,
+            subject=self.subject, term=2, value=value, out_of=20,
+        )
+
+    @override_settings(RESULTS_DEBOUNCE=0)
+    def test_recomputed_on_commit(self):
+        a, b, _ = self.students
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_mark(a, "12")
+            self.add_mark(b, "15")
+        rows = {r.student_id: r for r in TermResult.objects.filter(school_year=self.year, term=2)}
+        self.assertEqual((rows[a.pk].average, rows[a.pk].rank, rows[a.pk].ranked), (Decimal("12"), 2, 2))
+        self.assertEqual(rows[b.pk].marks, {str(self.subject.pk): 15.0})
+        self.assertIsNone(rows[self.students[2].pk].rank)
+        self.assertFalse(ResultRefresh.objects.exists())
+
+    @override_settings(RESULTS_DEBOUNCE=60)
+    def test_pending_class_recomputed_on_read(self):
+        a = self.students[0]
+        self.add_mark(a, "9")  # en file, échéance dans 60 s
+        self.assertFalse(TermResult.objects.exists())
+        results = class_term_results(self.classroom, self.year, 2)
+        self.assertEqual(results[a.pk].average, Decimal("9"))
+        self.assertFalse(ResultRefresh.objects.exists())
+        with self.assertNumQueries(2):  # file vide : une lecture indexée
+            class_term_results(self.classroom, self.year, 2)
+
+    def test_rebuild_command(self):
+        self.add_mark(self.students[1], "18")
+        TermResult.objects.all().delete()
+        call_command("rebuild_results", "--year", str(self.year.pk), "--term", "2", stdout=StringIO())
+        self.assertEqual(TermResult.objects.get(student=self.students[1], term=2).rank, 1)
+        self.assertFalse(ResultRefresh.objects.exists())
+
+    def test_upsert_without_conflict_target(self):
+        """MySQL (ON DUPLICATE KEY UPDATE) refuse unique_fields : les upserts n'en passent pas."""
+        self.add_mark(self.students[0], "11")
+        calls = []
+
+        def check(qs, objs, **kwargs):
+            # même contrôle que bulk_create, avant toute requête
+            fields = lambda names: names and [qs.model._meta.get_field(n) for n in names]  # noqa: E731
+            qs._check_bulk_create_options(
+                False, kwargs["update_conflicts"], fields(kwargs["update_fields"]), fields(kwargs["unique_fields"]),
+            )
+            calls.append((qs.model, kwargs["unique_fields"]))
+            return objs
+
+        with mock.patch.object(connection.features, "supports_update_conflicts_with_target", False), \
+                mock.patch.object(QuerySet, "bulk_create", autospec=True, side_effect=check):
+            schedule([(self.classroom.pk, self.year.pk, 2)])
+            recompute_class(self.classroom, self.year.pk, 2)
+        self.assertEqual(calls, [(ResultRefresh, None), (TermResult, None)])
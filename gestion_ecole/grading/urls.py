@@ -0,0 +1,11 @@
+# grading/urls.py
+from django.urls import path
+
+from .views import HonourRollView, MarkGridView
+
+urlpatterns = [
+    # Saisie des notes : ?classroom=<id>&term=1..3&subject=<id>
+    path("notes/", MarkGridView.as_view(), name="mark_grid"),
+    # Tableau d'honneur : ?term=1..3&top=N
+    path("notes/tableau-honneur/", HonourRollView.as_view(), name="honour_roll"),
+]
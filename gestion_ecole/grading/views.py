@@ -0,0 +1,152 @@
+# grading/views.py
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.shortcuts import redirect
+from django.urls import reverse
+from django.views.generic import TemplateView
+
+from catalog.models import Classroom
+from students.bulletins import class_students
+from .engine import DEFAULT_NOTATION, class_results, school_subjects
+from .entry import FIELD_PREFIX, parse_column, parse_out_of, save_column
+from .models import Mark, TermResult
+
+
+def _pick(items, raw, default=None):
+    """Élément de `items` dont le pk vaut `raw` (paramètre GET/POST), sinon le premier."""
+    for item in items:
+        if str(item.pk) == str(raw):
+            return item
+    return items[0] if items else default
+
+
+# ——————————————————————————————————————
+#  Grille de saisie (classe × matières, un trimestre)
+# ——————————————————————————————————————
+class MarkGridView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
+    """
+    GET /notes/?classroom=<id>&term=1..3&subject=<id> : notes de la classe
+    (ramenées au barème du cycle), moyennes et rangs ; la colonne `subject`
+    est éditable (notes brutes sur « Sur »).
+    POST : enregistre toute la colonne (cf. grading/entry.py).
+    """
+    permission_required = "grading.change_mark"
+    template_name = "grading/mark_grid.html"
+
+    def setup_grid(self, params):
+        request = self.request
+        self.school = getattr(request, "active_school", None)
+        self.school_year = getattr(request, "active_school_year", None)
+        self.classrooms = (
+            list(Classroom.objects.filter(school=self.school).select_related("cycle").order_by("label"))
+            if self.school else []
+        )
+        self.classroom = _pick(self.classrooms, params.get("classroom"))
+        self.subjects = school_subjects(self.school.pk) if self.school else []
+        self.subject = _pick(self.subjects, params.get("subject"))
+        term = params.get("term") or ""
+        self.term = int(term) if term in {str(t) for t in Mark.Term.values} else Mark.Term.T1
+
+    def grid_url(self):
+        params = {"classroom": self.classroom.pk, "term": self.term, "subject": self.subject.pk}
+        return f"{reverse('mark_grid')}?{urlencode(params)}"
+
+    def get_context_data(self, posted=None, errors=None, out_of=None, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx.update(
+            school=self.school, school_year=self.school_year, classrooms=self.classrooms,
+            classroom=self.classroom, subjects=self.subjects, subject=self.subject,
+            term=self.term, terms=Mark.Term.choices,
+        )
+        if not (self.school_year and self.classroom and self.subject):
+            return ctx
+
+        notation = self.classroom.cycle.notation if self.classroom.cycle_id else DEFAULT_NOTATION
+        students = list(class_students(self.classroom, self.school_year))
+        results = class_results(self.classroom, self.school_year, self.term, self.subjects)
+        raw = {
+            sid: (value, o)
+            for sid, value, o in Mark.objects.filter(
+                school_year=self.school_year, term=self.term, subject=self.subject,
+                student_id__in=[s.pk for s in students],
+            ).values_list("student_id", "value", "out_of")
+        }
+        if out_of is None:  # barème le plus fréquent de la colonne, à défaut celui du cycle
+            used = Counter(o for value, o in raw.values() if value is not None)
+            out_of = used.most_common(1)[0][0] if used else notation
+
+        column = self.subjects.index(self.subject)
+        errors = errors or {}
+        rows = []
+        for student in students:
+            summary = results.student(student.pk) or {"marks": [None] * len(self.subjects), "average": None, "rank": None}
+            if posted is not None:
+                entry = posted.get(f"{FIELD_PREFIX}{student.pk}", "")
+            else:
+                value = raw.get(student.pk, (None, None))[0]
+                entry = "" if value is None else f"{value.normalize():f}"
+            rows.append({
+                "student": student, "summary": summary, "entry": entry, "error": errors.get(student.pk),
+                "cells": [(j == column, mark) for j, mark in enumerate(summary["marks"])],
+            })
+        ctx.update(
+            rows=rows, notation=notation, out_of=out_of, field_prefix=FIELD_PREFIX,
+            stats=results.subject_stats(self.classroom.pk), ranked=results.ranked(self.classroom.pk),
+        )
+        return ctx
+
+    def get(self, request, *args, **kwargs):
+        self.setup_grid(request.GET)
+        return super().get(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        self.setup_grid(request.POST)
+        if not (self.school_year and self.classroom and self.subject):
+            messages.error(request, "Choisissez une année scolaire active, une classe et une matière.")
+            return redirect("mark_grid")
+        notation = self.classroom.cycle.notation if self.classroom.cycle_id else DEFAULT_NOTATION
+        out_of = parse_out_of(request.POST.get("out_of"), notation)
+        student_ids = [s.pk for s in class_students(self.classroom, self.school_year)]
+        values, errors = parse_column(request.POST, student_ids, out_of)
+        if errors:
+            messages.error(request, f"{len(errors)} note(s) invalide(s) : rien n'a été enregistré.")
+            ctx = self.get_context_data(posted=request.POST, errors=errors, out_of=out_of)
+            return self.render_to_response(ctx)
+        created, updated = save_column(self.classroom, self.school_year, self.term, self.subject, values, out_of)
+        messages.success(request, f"{self.subject.name} : {created + updated} note(s) enregistrée(s).")
+        return redirect(self.grid_url())
+
+
+# ——————————————————————————————————————
+#  Tableau d'honneur (résultats matérialisés)
+# ——————————————————————————————————————
+HONOUR_TOP = 3
+HONOUR_TOP_MAX = 10
+
+
+class HonourRollView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
+    """GET /notes/tableau-honneur/?term=1..3&top=N : N premiers de chaque classe (index (année, trimestre, rang))."""
+    permission_required = "grading.view_mark"
+    template_name = "grading/honour_roll.html"
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        params = self.request.GET
+        school_year = getattr(self.request, "active_school_year", None)
+        term = params.get("term") or ""
+        term = int(term) if term in {str(t) for t in Mark.Term.values} else Mark.Term.T1
+        try:
+            top = min(max(1, int(params.get("top", HONOUR_TOP))), HONOUR_TOP_MAX)
+        except (TypeError, ValueError):
+            top = HONOUR_TOP
+        ctx.update(school_year=school_year, term=term, terms=Mark.Term.choices, top=top)
+        if school_year is not None:
+            ctx["results"] = (
+                TermResult.objects.filter(school_year=school_year, term=term, rank__lte=top)
+                .select_related("student", "classroom")
+                .order_by("classroom__label", "rank", "student__last_name", "student__first_name")
+            )
+        return ctx
@@ -1,12 +1,76 @@
 # students/admin.py
+import re
+
+from django import forms
 from django.contrib import admin
-from .models import Student
+from django.db import transaction
+
+from .capacity import ClassroomFull, ensure_capacity
+from .models import Enrollment, Student
+from .search import search_students
+
+PHONE_RE = re.compile(r"\+?[\d .-]{6,}")
+
+
+def _arrivals(classroom_id, previous_id):
+    return {classroom_id: 1} if classroom_id and classroom_id != previous_id else {}
+
+
+class StudentAdminForm(forms.ModelForm):
+    """
+    Capacité de la classe vérifiée à la validation : la vue d'admin tourne
+    dans une transaction, le verrou posé ici tient jusqu'au COMMIT.
+    """
+    class Meta:
+        model = Student
+        fields = "__all__"
+
+    def clean(self):
+        cleaned = super().clean()
+        classroom = cleaned.get("classroom")
+        try:
+            ensure_capacity(_arrivals(classroom and classroom.pk, self.instance.classroom_id))
+        except ClassroomFull as exc:
+            self.add_error("classroom", str(exc))
+        return cleaned
+
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
+    form = StudentAdminForm
     list_display = ("last_name", "first_name", "gender", "classroom", "matricule", "enrollment_date")
     list_filter = ("gender", "classroom")
     # ✅ requis quand on utilise autocomplete_fields quelque part
+    # (la recherche elle-même passe par les index, cf. get_search_results)
     search_fields = ("last_name", "first_name", "matricule", "parent_phone", "city", "district")
     # champ FK -> widget d’autocomplétion
     autocomplete_fields = ("classroom",)
+
+    def save_model(self, request, obj, form, change):
+        # comme les autres chemins d'inscription : verrou + contrôle dans la transaction de l'écriture
+        previous = form.initial.get("classroom") if change else None
+        with transaction.atomic():
+            ensure_capacity(_arrivals(obj.classroom_id, previous))
+            super().save_model(request, obj, form, change)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Même index que la liste des élèves (nom, prénom, matricule, ville,
+        # quartier, classe, cycle) ; un numéro de téléphone est cherché par
+        # préfixe sur idx_student_parent_phone (LIKE 'terme%', jamais '%terme%').
+        term = (search_term or "").strip()
+        if not term:
+            return queryset, False
+        matched = queryset.filter(pk__in=search_students(queryset, term).values("pk"))
+        if PHONE_RE.fullmatch(term):
+            # istartswith : LIKE sans BINARY sous MySQL, l'index reste utilisable
+            matched |= queryset.filter(parent_phone__istartswith=term)
+        return matched, False
+
+
+@admin.register(Enrollment)
+class EnrollmentAdmin(admin.ModelAdmin):
+    list_display = ("student", "classroom", "school_year", "date", "status")
+    list_filter = ("school_year", "status", "classroom")
+    list_select_related = ("student", "classroom", "school_year", "school_year__school")
+    autocomplete_fields = ("student", "classroom")
+    date_hierarchy = "date"
@@ -0,0 +1,79 @@
+# students/bulletins.py
+"""
+Bulletins PDF par classe et année scolaire.
+
+Le HTML de chaque élève est rendu par Django dans le processus courant
+(toutes les données chargées en quelques requêtes), puis WeasyPrint tourne en
+parallèle dans un pool de processus (cf. core/pdf.py).
+Avec un trimestre, notes, moyenne et rang sont lus dans les résultats
+matérialisés (grading/results.py) : une lecture indexée par classe.
+"""
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.template.loader import render_to_string
+from django.utils.text import slugify
+
+from catalog.models import Subject
+from core.pdf import merge_pdfs, render_many, zip_pdfs
+from grading.results import class_term_results
+from .models import Enrollment, Student
+
+BULLETIN_TEMPLATE = "students/bulletin.html"
+BULLETIN_CSS = "css/bulletin.css"
+
+
+def bulletin_css_paths():
+    path = finders.find(BULLETIN_CSS)
+    return [path] if path else []
+
+
+def class_students(classroom, school_year):
+    """Élèves inscrits dans la classe pour l'année (à défaut : classe courante)."""
+    if school_year is None:
+        students = Student.objects.filter(classroom=classroom)
+    else:
+        students = Student.objects.filter(
+            enrollments__classroom=classroom, enrollments__school_year=school_year,
+            enrollments__status=Enrollment.Status.ACTIVE,
+        )
+    return students.order_by("last_name", "first_name", "id")
+
+
+def build_bulletins(classroom, school_year, term=None):
+    """[(nom_fichier, html)] pour chaque élève de la classe (notes du trimestre `term`)."""
+    subjects = list(Subject.objects.filter(school_id=classroom.school_id).order_by("name"))
+    results = class_term_results(classroom, school_year, term) if term and school_year else {}
+    base = {
+        "school": classroom.school,
+        "school_year": school_year,
+        "classroom": classroom,
+        "subjects": subjects,
+        "notation": classroom.cycle.notation if classroom.cycle_id else 20,
+        "term": term,
+    }
+    items = []
+    for student in class_students(classroom, school_year):
+        result = results.get(student.pk)
+        marks = result.marks if result else {}
+        lines = []
+        for subject in subjects:
+            mark = marks.get(str(subject.pk))
+            lines.append((subject, mark, None if mark is None else round(mark * float(subject.coefficient), 2)))
+        html = render_to_string(BULLETIN_TEMPLATE, {**base, "student": student, "lines": lines, "result": result})
+        name = f"{slugify(student.last_name)}_{slugify(student.first_name)}_{student.pk}.pdf"
+        items.append((name, html))
+    return items
+
+
+def render_bulletins(items, workers=None):
+    """[(nom, html)] -> [(nom, pdf)] (ordre conservé)."""
+    base_url = str(settings.BASE_DIR)
+    return list(render_many(items, bulletin_css_paths(), base_url=base_url, workers=workers))
+
+
+def class_bulletins_pdf(classroom, school_year, workers=None, term=None) -> bytes:
+    return merge_pdfs(pdf for _, pdf in render_bulletins(build_bulletins(classroom, school_year, term), workers))
+
+
+def class_bulletins_zip(classroom, school_year, workers=None, term=None) -> bytes:
+    return zip_pdfs(render_bulletins(build_bulletins(classroom, school_year, term), workers))
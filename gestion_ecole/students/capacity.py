@@ -0,0 +1,72 @@
+# students/capacity.py
+"""
+Respect de Classroom.capacity lors des inscriptions et changements de classe.
+
+Toute écriture qui ajoute des élèves à une classe passe par ensure_capacity()
+(ou free_seats() pour un tri ligne à ligne, cf. importer), DANS la transaction qui fait l'écriture : les lignes Classroom concernées sont
+verrouillées (SELECT … FOR UPDATE, dans l'ordre des id : pas d'interblocage),
+puis l'effectif est lu dans ClassroomHeadcount. Deux secrétariats qui
+inscrivent en même temps dans la même classe sont donc servis l'un après
+l'autre, et le second voit la place prise par le premier.
+
+capacity = 0 : pas de limite.
+"""
+from django.db import transaction
+from django.db.models import Count
+
+from catalog.models import Classroom
+from .models import ClassroomHeadcount, Student
+
+
+class ClassroomFull(ValueError):
+    def __init__(self, overflows):
+        # [(classroom, capacité, effectif qui en résulterait)]
+        self.overflows = overflows
+        detail = ", ".join(f"{c.label} ({after}/{capacity})" for c, capacity, after in overflows)
+        super().__init__(f"Capacité dépassée : {detail}.")
+
+
+def free_seats(classroom_ids, lock=True):
+    """
+    {id classe: (classroom, places libres | None si sans limite)}.
+    lock=True : verrouille les classes (dans transaction.atomic()).
+    """
+    ids = sorted({cid for cid in classroom_ids if cid})
+    if not ids:
+        return {}
+    classrooms = Classroom.objects.filter(pk__in=ids).order_by("pk").only("pk", "label", "capacity")
+    if lock:
+        if not transaction.get_connection().in_atomic_block:
+            raise RuntimeError("Verrou de capacité hors de transaction.atomic().")
+        classrooms = classrooms.select_for_update()
+    classrooms = list(classrooms)
+    occupancy = dict(
+        ClassroomHeadcount.objects.filter(classroom_id__in=ids).values_list("classroom_id", "total")
+    )
+    missing = [cid for cid in ids if cid not in occupancy]
+    if missing:  # compteur pas encore créé (cf. counters.bump)
+        occupancy.update(
+            Student.objects.filter(classroom_id__in=missing).order_by()
+            .values_list("classroom_id").annotate(n=Count("id"))
+        )
+    return {
+        c.pk: (c, c.capacity - occupancy.get(c.pk, 0) if c.capacity else None)
+        for c in classrooms
+    }
+
+
+def ensure_capacity(arrivals, departures=None):
+    """
+    arrivals / departures : {id classe: nombre d'élèves}. Verrouille les
+    classes d'arrivée et lève ClassroomFull si l'une d'elles dépasserait sa
+    capacité. À appeler dans transaction.atomic(), avant l'écriture.
+    """
+    arrivals = {cid: n for cid, n in arrivals.items() if cid and n > 0}
+    departures = departures or {}
+    overflows = []
+    for cid, (classroom, free) in free_seats(arrivals).items():
+        need = arrivals[cid] - departures.get(cid, 0)
+        if free is not None and need > free:
+            overflows.append((classroom, classroom.capacity, classroom.capacity - free + need))
+    if overflows:
+        raise ClassroomFull(overflows)
@@ -0,0 +1,138 @@
+# students/counters.py
+"""
+Effectifs par classe maintenus incrémentalement (table ClassroomHeadcount).
+
+- bump() : +n / -n atomique (UPDATE … SET total = total + n), appelé par les
+  signaux post_save / post_delete de Student ; une décrémentation s'arrête à
+  0 (colonne non signée) si le compteur a dérivé ;
+- bump_many() : deltas par classe des écritures groupées qui contournent les
+  signaux (bulk_create, queryset.update : import, réinscription, passage) ;
+- fingerprint() : empreinte de la table (ETag de la liste des classes) ;
+- headcounts() : lecture en UNE requête pour le tableau de bord et les stats ;
+- year_headcounts() : même forme, pour une année scolaire (agrégat sur
+  l'index (school_year, classroom) d'Enrollment) ;
+- reconcile() : recalcul complet, sans verrou, pour `manage.py
+  reconcile_headcounts` seulement (dérive, SQL direct, loaddata) : appelé
+  pendant l'activité, il écraserait les bump() concurrents.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from catalog.models import Classroom
+from .models import ClassroomHeadcount, Enrollment, Student
+
+
+def _add(delta):
+    """total + delta, borné à 0 : GREATEST(total, n) - n ne passe jamais sous 0 (pas d'erreur UNSIGNED sous MySQL)."""
+    if delta >= 0:
+        return F("total") + delta
+    return Greatest(F("total"), -delta) - (-delta)
+
+
+def bump(classroom_id, delta: int) -> None:
+    """Ajoute `delta` à l'effectif de la classe (None = élèves sans classe)."""
+    if not delta:
+        return
+    updated = ClassroomHeadcount.objects.filter(classroom_id=classroom_id).update(
+        total=_add(delta), updated_at=timezone.now(),
+    )
+    if updated:
+        return
+    # Première fois pour cette classe : on repart du vrai compte (évite toute dérive)
+    school_id = (
+        Classroom.objects.filter(pk=classroom_id).values_list("school_id", flat=True).first()
+        if classroom_id else None
+    )
+    try:
+        with transaction.atomic():
+            ClassroomHeadcount.objects.create(
+                classroom_id=classroom_id, school_id=school_id,
+                total=Student.objects.filter(classroom_id=classroom_id).count(),
+            )
+    except IntegrityError:  # créée entre-temps par une autre requête (y compris « sans classe »)
+        ClassroomHeadcount.objects.filter(classroom_id=classroom_id).update(
+            total=_add(delta), updated_at=timezone.now(),
+        )
+
+
+def bump_many(arrivals, departures=None) -> None:
+    """
+    Effectifs après un déplacement groupé (UPDATE sans signaux) :
+    {classe: arrivées} et {classe: départs}, None = sans classe. Classes
+    traitées dans un ordre fixe : deux écritures concurrentes verrouillent
+    leurs lignes dans le même ordre (pas d'interblocage).
+    """
+    departures = departures or {}
+    changed = set(arrivals) | set(departures)
+    for classroom_id in sorted(changed, key=lambda c: (c is None, c or 0)):
+        bump(classroom_id, arrivals.get(classroom_id, 0) - departures.get(classroom_id, 0))
+
+
+def fingerprint():
+    """(nombre de lignes, somme des effectifs, dernière mise à jour) — une requête."""
+    agg = ClassroomHeadcount.objects.aggregate(n=Count("id"), total=Sum("total"), last=Max("updated_at"))
+    return agg["n"], agg["total"] or 0, agg["last"]
+
+
+def headcounts(school_id=None):
+    """
+    Effectifs par classe (triés par libellé) et total, en une requête.
+    Retourne (lignes, total) ; chaque ligne a la forme historique
+    {"classroom__id", "classroom__label", "total"}.
+    """
+    qs = ClassroomHeadcount.objects.values("classroom__id", "classroom__label", "total")
+    if school_id:
+        qs = qs.filter(school_id=school_id)
+    rows = sorted(qs, key=lambda r: (r["classroom__label"] is None, r["classroom__label"] or ""))
+    return rows, sum(r["total"] for r in rows)
+
+
+def year_headcounts(school_year_id):
+    """Effectifs (inscriptions actives) par classe pour une année : (lignes, total), une requête."""
+    rows = list(
+        Enrollment.objects.filter(school_year_id=school_year_id, status=Enrollment.Status.ACTIVE)
+        .values("classroom__id", "classroom__label")
+        .annotate(total=Count("id"))
+        .order_by("classroom__label")
+    )
+    return rows, sum(r["total"] for r in rows)
+
+
+def reconcile(dry_run: bool = False):
+    """
+    Recalcule tous les effectifs depuis Student. Retourne la liste des écarts
+    [(classroom_id, attendu, enregistré)].
+    """
+    actual = dict(
+        Student.objects.order_by().values_list("classroom_id").annotate(n=Count("id"))
+    )
+    schools = dict(Classroom.objects.values_list("id", "school_id"))
+    for cid in schools:
+        actual.setdefault(cid, 0)
+    actual.setdefault(None, 0)
+
+    stored = {row.classroom_id: row for row in ClassroomHeadcount.objects.all()}
+
+    drift = []
+    to_create, to_update = [], []
+    now = timezone.now()
+    for cid, n in actual.items():
+        row = stored.get(cid)
+        if row is None:
+            drift.append((cid, n, None))
+            to_create.append(ClassroomHeadcount(
+                classroom_id=cid, school_id=schools.get(cid), total=n,
+                unassigned=True if cid is None else None,
+            ))
+        elif row.total != n or row.school_id != schools.get(cid):
+            drift.append((cid, n, row.total))
+            row.total, row.school_id, row.updated_at = n, schools.get(cid), now
+            to_update.append(row)
+
+    if not dry_run:
+        with transaction.atomic():
+            ClassroomHeadcount.objects.bulk_create(to_create, batch_size=500)
+            ClassroomHeadcount.objects.bulk_update(to_update, ["total", "school", "updated_at"], batch_size=500)
+    return drift
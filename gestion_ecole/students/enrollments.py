@@ -0,0 +1,174 @@
+# students/enrollments.py
+"""
+Inscriptions annuelles (Enrollment).
+
+- enroll() : inscription / changement de classe d'un élève pour une année ;
+- reenroll() : réinscription en masse des classes d'une année sur la suivante
+  (un SELECT, un bulk_create ; les lignes de l'année passée ne sont pas touchées) ;
+- enroll_current_classes() : crée les inscriptions manquantes d'une année à
+  partir de Student.classroom (toute l'école) ;
+- enroll_students() : même chose pour une liste d'élèves (ceux d'un import
+  en masse), inscription existante réaffectée à la classe courante.
+
+Student.classroom reste la classe courante : reenroll() peut l'aligner sur la
+nouvelle année (update_current), en requêtes groupées par classe cible, dans
+la limite des capacités (ClassroomFull sinon, rien n'est écrit).
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from catalog.models import Classroom
+
+from .capacity import ensure_capacity
+from .counters import bump_many
+from .models import Enrollment, Student
+from .search import reindex_students
+
+BATCH_SIZE = 500
+
+
+def enroll(student, school_year, classroom=None, date=None):
+    """Inscrit (ou réaffecte) `student` pour `school_year`, par défaut dans sa classe courante."""
+    classroom = classroom or student.classroom
+    enrollment, _ = Enrollment.objects.update_or_create(
+        student=student, school_year=school_year,
+        defaults={
+            "classroom": classroom,
+            "date": date or student.enrollment_date or timezone.localdate(),
+            "status": Enrollment.Status.ACTIVE,
+        },
+    )
+    return enrollment
+
+
+def reenroll(from_year, to_year, classroom_map=None, date=None, update_current=True):
+    """
+    Réinscrit dans `to_year` les élèves inscrits (ACTIVE) dans `from_year`.
+
+    classroom_map : {id classe source: id classe cible} — classes absentes
+    ignorées, cible None = non réinscrits ; une cible d'une autre école que
+    `to_year` lève ValueError. Sans map : même classe (les années scolaires
+    appartiennent à une école, les classes aussi).
+    Les élèves déjà inscrits dans `to_year` sont laissés tels quels.
+    Retourne (créées, ignorées).
+    """
+    if classroom_map is None and from_year.school_id != to_year.school_id:
+        raise ValueError("Années d'écoles différentes : fournir la correspondance des classes.")
+    if classroom_map:
+        targets = {cid for cid in classroom_map.values() if cid is not None}
+        foreign = targets - set(Classroom.objects.filter(
+            pk__in=targets, school_id=to_year.school_id,
+        ).values_list("pk", flat=True))
+        if foreign:
+            raise ValueError(
+                f"Classes cibles hors de l'école de {to_year.label} : {', '.join(map(str, sorted(foreign)))}."
+            )
+    date = date or to_year.start_date
+
+    source = Enrollment.objects.filter(school_year=from_year, status=Enrollment.Status.ACTIVE)
+    if classroom_map is not None:
+        source = source.filter(classroom_id__in=list(classroom_map))
+    already = Enrollment.objects.filter(school_year=to_year, student_id=OuterRef("student_id"))
+    rows = source.annotate(done=Exists(already)).values_list("student_id", "classroom_id", "done")
+
+    to_create, moves, skipped = [], {}, 0
+    for student_id, classroom_id, done in rows.iterator(chunk_size=2000):
+        target = classroom_id if classroom_map is None else classroom_map.get(classroom_id)
+        if done or target is None:
+            skipped += 1
+            continue
+        to_create.append(Enrollment(
+            student_id=student_id, classroom_id=target, school_year=to_year, date=date,
+        ))
+        moves.setdefault(target, []).append(student_id)
+
+    with transaction.atomic():
+        Enrollment.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+        if update_current and moves:
+            _move_students(moves)
+    return len(to_create), skipped
+
+
+def _move_students(moves):
+    """{classe cible: [élèves]} -> Student.classroom, sans signaux (UPDATE groupés)."""
+    target_of = {sid: target for target, ids in moves.items() for sid in ids}
+    changed, arrivals, departures = {}, Counter(), Counter()
+    ids = list(target_of)
+    for i in range(0, len(ids), BATCH_SIZE):
+        current = Student.objects.filter(pk__in=ids[i:i + BATCH_SIZE]).values_list("pk", "classroom_id")
+        for sid, cid in current:
+            target = target_of[sid]
+            if cid != target:
+                changed.setdefault(target, []).append(sid)
+                arrivals[target] += 1
+                departures[cid] += 1
+    ensure_capacity(arrivals, departures)
+
+    moved = []
+    for target, ids in changed.items():
+        for i in range(0, len(ids), BATCH_SIZE):
+            Student.objects.filter(pk__in=ids[i:i + BATCH_SIZE]).update(classroom_id=target)
+        moved.extend(ids)
+    if moved:
+        # queryset.update contourne les signaux : effectifs (deltas exacts) et index de recherche
+        bump_many(arrivals, departures)
+        reindex_students(Student.objects.filter(pk__in=moved))
+
+
+def enroll_current_classes(school_year, date=None):
+    """
+    Crée, pour `school_year`, l'inscription des élèves dont la classe courante
+    appartient à l'école de l'année et qui n'y sont pas encore inscrits.
+    Retourne le nombre d'inscriptions créées.
+    """
+    missing = (
+        Student.objects.filter(classroom__school_id=school_year.school_id)
+        .exclude(Exists(Enrollment.objects.filter(school_year=school_year, student_id=OuterRef("pk"))))
+        .values_list("pk", "classroom_id", "enrollment_date")
+    )
+    rows = [
+        Enrollment(student_id=sid, classroom_id=cid, school_year=school_year,
+                   date=date or enrolled or school_year.start_date)
+        for sid, cid, enrolled in missing.iterator(chunk_size=2000)
+    ]
+    # inscrites entre-temps par une autre requête : ignorées (contrainte d'unicité)
+    Enrollment.objects.bulk_create(rows, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    return len(rows)
+
+
+def enroll_students(school_year, student_ids, date=None):
+    """
+    Inscrit dans `school_year`, dans leur classe courante, les élèves `student_ids`
+    dont la classe appartient à l'école de l'année ; une inscription existante
+    d'une autre classe suit la classe courante. Retourne (créées, réaffectées).
+    """
+    created = moved = 0
+    ids = list(student_ids)
+    for i in range(0, len(ids), BATCH_SIZE):
+        current = {
+            sid: (cid, enrolled) for sid, cid, enrolled in Student.objects.filter(
+                pk__in=ids[i:i + BATCH_SIZE], classroom__school_id=school_year.school_id,
+            ).values_list("pk", "classroom_id", "enrollment_date")
+        }
+        stale = []
+        existing = Enrollment.objects.filter(school_year=school_year, student_id__in=list(current))
+        for enrollment in existing.only("pk", "student_id", "classroom_id"):
+            cid, _ = current.pop(enrollment.student_id)
+            if enrollment.classroom_id != cid:
+                enrollment.classroom_id = cid
+                stale.append(enrollment)
+        rows = [
+            Enrollment(student_id=sid, classroom_id=cid, school_year=school_year,
+                       date=date or enrolled or school_year.start_date)
+            for sid, (cid, enrolled) in current.items()
+        ]
+        with transaction.atomic():
+            Enrollment.objects.bulk_update(stale, ["classroom"], batch_size=BATCH_SIZE)
+            # inscrites entre-temps par une autre requête : ignorées (contrainte d'unicité)
+            Enrollment.objects.bulk_create(rows, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        created += len(rows)
+        moved += len(stale)
+    return created, moved
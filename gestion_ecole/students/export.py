@@ -0,0 +1,96 @@
+# students/export.py
+"""
+Export de la liste des élèves (CSV / XLSX) en mémoire constante.
+
+Les lignes sont lues par lots via la pagination keyset (cf. pagination.seek)
+et `values_list` : ni instances de modèle, ni jeu de résultats complet en
+mémoire — y compris sous MySQL, où `.iterator()` bufferise tout côté client.
+"""
+import csv
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+
+from .pagination import SEEK_ORDERING, seek
+
+EXPORT_BATCH_SIZE = 2000
+
+# (champ, en-tête)
+EXPORT_COLUMNS = [
+    ("matricule", "Matricule"),
+    ("last_name", "Nom"),
+    ("first_name", "Prénom"),
+    ("gender", "Sexe"),
+    ("birth_date", "Date de naissance"),
+    ("classroom__label", "Classe"),
+    ("classroom__cycle__name", "Cycle"),
+    ("city", "Ville"),
+    ("district", "Quartier"),
+    ("parent_name", "Nom du parent"),
+    ("parent_phone", "Téléphone du parent"),
+    ("enrollment_date", "Date d'inscription"),
+]
+GENDER_LABELS = {"M": "Masculin", "F": "Féminin"}
+
+
+def iter_export_rows(queryset, batch_size=EXPORT_BATCH_SIZE):
+    """Tuples prêts à écrire (dates JJ/MM/AAAA, sexe en toutes lettres)."""
+    fields = [f for f, _ in EXPORT_COLUMNS]
+    n = len(fields)
+    gender_idx = fields.index("gender")
+    date_idx = [i for i, f in enumerate(fields) if f.endswith("date")]
+    cursor = None
+    while True:
+        batch = list(seek(queryset, cursor).values_list(*fields, *SEEK_ORDERING)[:batch_size])
+        for row in batch:
+            out = ["" if v is None else v for v in row[:n]]
+            out[gender_idx] = GENDER_LABELS.get(out[gender_idx], out[gender_idx])
+            for i in date_idx:
+                if out[i]:
+                    out[i] = out[i].strftime("%d/%m/%Y")
+            yield out
+        if len(batch) < batch_size:
+            return
+        cursor = batch[-1][n:]
+
+
+class _Echo:
+    """Pseudo-fichier : csv.writer renvoie directement la ligne formatée."""
+
+    def write(self, value):
+        return value
+
+
+def csv_response(queryset, filename):
+    writer = csv.writer(_Echo(), delimiter=";")
+
+    def stream():
+        yield "\ufeff"  # BOM : Excel détecte l'UTF-8
+        yield writer.writerow([h for _, h in EXPORT_COLUMNS])
+        for row in iter_export_rows(queryset):
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(stream(), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def xlsx_response(queryset, filename):
+    """
+    openpyxl en mode write_only (lignes écrites au fil de l'eau) vers un fichier
+    temporaire, puis envoyé par blocs : un XLSX (zip) ne se termine qu'à la fin.
+    """
+    from openpyxl import Workbook  # dépendance optionnelle (requirements.txt)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Élèves")
+    ws.append([h for _, h in EXPORT_COLUMNS])
+    for row in iter_export_rows(queryset):
+        ws.append(row)
+    tmp = tempfile.TemporaryFile()
+    wb.save(tmp)
+    tmp.seek(0)
+    return FileResponse(
+        tmp, as_attachment=True, filename=f"{filename}.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
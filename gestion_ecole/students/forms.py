@@ -54,6 +54,11 @@ class StudentEnrollForm(forms.ModelForm):
 
     def clean_matricule(self):
         v = (self.cleaned_data.get("matricule") or "").strip()
+        # Pas de nouveau doublon (lookup sur idx_student_matricule)
+        if v and "matricule" in self.changed_data:
+            clash = Student.objects.filter(matricule=v).exclude(pk=self.instance.pk)
+            if clash.exists():
+                raise forms.ValidationError("Ce matricule est déjà attribué à un autre élève.")
         return v or None
 
 
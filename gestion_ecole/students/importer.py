@@ -0,0 +1,407 @@
+# students/importer.py
+"""
+Import en masse d'élèves (CSV / XLSX), pensé pour la rentrée.
+
+- Lecture en flux : les lignes sont lues et traitées par paquets (`chunk_size`),
+  la mémoire reste stable quel que soit le nombre de lignes.
+- Validation contre des index préchargés en mémoire (classes de l'école,
+  matricules existants) : aucune requête SQL par ligne.
+- Écriture par `bulk_create` / `bulk_update`, une transaction par paquet.
+- Matricule déjà connu (sans tenir compte de la casse, comme la collation
+  MySQL) => mise à jour des colonnes fournies ; sinon création. Avec une
+  école, seuls ses élèves (classe courante, à défaut inscription) sont mis à
+  jour : le matricule d'un élève d'une autre école est une erreur de ligne.
+- Sans école, un libellé de classe porté par plusieurs écoles est ambigu
+  (erreur de ligne) : utiliser classroom_id.
+- Capacité des classes respectée (cf. capacity.py) : les lignes en surnombre
+  sont rejetées, les effectifs ajustés dans la transaction du paquet.
+- Les erreurs sont collectées par ligne et rendues à la fin (ImportReport) ;
+  longueurs maximales vérifiées ici (MySQL strict refuserait tout le paquet).
+  Un fichier illisible lève l'une des READ_ERRORS.
+- ImportReport.student_ids : élèves créés ou mis à jour, seuls à inscrire
+  ensuite (cf. enrollments.enroll_students).
+
+Format : en-têtes optionnels. Sans en-tête, colonnes `matricule;classroom_id`.
+"""
+import csv
+import datetime
+import io
+import zipfile
+from collections import Counter, defaultdict
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from catalog.models import Classroom
+from .capacity import free_seats
+from .counters import bump_many
+from .models import Enrollment, Student
+from .search import normalize
+
+DEFAULT_COLUMNS = ["matricule", "classroom_id"]
+
+# en-tête normalisé (minuscules, sans accents) -> champ
+COLUMN_ALIASES = {
+    "matricule": "matricule",
+    "nom": "last_name", "last_name": "last_name",
+    "prenom": "first_name", "first_name": "first_name",
+    "classroom_id": "classroom_id", "classe_id": "classroom_id",
+    "classe": "classroom_label", "classroom": "classroom_label",
+    "date_de_naissance": "birth_date", "date_naissance": "birth_date", "birth_date": "birth_date",
+    "sexe": "gender", "genre": "gender", "gender": "gender",
+    "ville": "city", "city": "city",
+    "quartier": "district", "district": "district",
+    "nom_du_parent": "parent_name", "parent": "parent_name", "parent_name": "parent_name",
+    "telephone": "parent_phone", "telephone_parent": "parent_phone", "parent_phone": "parent_phone",
+    "date_d_inscription": "enrollment_date", "date_inscription": "enrollment_date",
+    "enrollment_date": "enrollment_date",
+    "observation": "notes", "notes": "notes",
+}
+
+# champs repris dans Student.search_text
+SEARCH_FIELDS = {"last_name", "first_name", "matricule", "city", "district", "classroom"}
+TEXT_FIELDS = ("last_name", "first_name", "city", "district", "parent_name", "parent_phone", "notes")
+GENDERS = {"m": "M", "masculin": "M", "garcon": "M", "f": "F", "feminin": "F", "fille": "F"}
+DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%d.%m.%Y")
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.rows = 0
+        self.error_count = 0
+        self.student_ids = []  # élèves créés / mis à jour (vide en simulation)
+        self.errors = []  # [(n° de ligne, message)], tronqué à MAX_REPORTED_ERRORS
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def __str__(self):
+        return (
+            f"{self.rows} ligne(s) : {self.created} créé(s), {self.updated} mis à jour, "
+            f"{self.error_count} erreur(s)"
+        )
+
+
+class RowError(ValueError):
+    pass
+
+
+# Fichier illisible (encodage, CSV mal formé, XLSX corrompu) : arrête l'import
+READ_ERRORS = (RowError, UnicodeDecodeError, csv.Error, zipfile.BadZipFile)
+
+
+def _cell(value) -> str:
+    """Valeur de cellule -> texte ; un nombre entier lu en flottant (XLSX : 12345.0) perd son « .0 »."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value if value is not None else "").strip()
+
+
+def _matricule_key(matricule) -> str:
+    return matricule.casefold()
+
+
+def _check_length(name, value):
+    field = Student._meta.get_field(name)
+    if field.max_length and len(value) > field.max_length:
+        raise RowError(f"{field.verbose_name} trop long : {len(value)} caractères (maximum {field.max_length}).")
+    return value
+
+
+# ——— Lecture en flux ———
+def _header_to_field(value):
+    return COLUMN_ALIASES.get(normalize(value).replace(" ", "_"))
+
+
+def _rows_with_header(rows):
+    """(n° ligne, dict champ->valeur) ; détecte l'en-tête sur la 1re ligne non vide."""
+    columns = None
+    for line, values in enumerate(rows, start=1):
+        values = ["" if v is None else v for v in values]
+        if not any(str(v).strip() for v in values):
+            continue
+        if columns is None:
+            fields = [_header_to_field(str(v)) for v in values]
+            if any(fields):
+                if "matricule" not in fields and not {"last_name", "first_name"} <= set(fields):
+                    raise RowError("En-têtes manquants : colonne matricule, ou nom et prénom, requise.")
+                columns = fields
+                continue
+            columns = DEFAULT_COLUMNS
+        yield line, {f: v for f, v in zip(columns, values) if f}
+
+
+def iter_csv(fileobj, delimiter=None):
+    """`fileobj` : flux binaire (fichier ouvert en 'rb', UploadedFile.file…)."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    if delimiter is None:
+        sample = text.readline()
+        delimiter = ";" if sample.count(";") >= sample.count(",") else ","
+        rows = csv.reader(_chain_first(sample, text), delimiter=delimiter)
+    else:
+        rows = csv.reader(text, delimiter=delimiter)
+    return _rows_with_header(rows)
+
+
+def _chain_first(first, rest):
+    yield first
+    yield from rest
+
+
+def iter_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:  # dépendance optionnelle
+        raise RowError("Import XLSX indisponible : installer openpyxl.") from exc
+    # read_only : lecture ligne à ligne, sans charger la feuille en mémoire
+    try:
+        wb = load_workbook(fileobj, read_only=True, data_only=True)
+    except KeyError as exc:  # archive ZIP valide sans les parties d'un classeur
+        raise RowError(f"Classeur XLSX incomplet : {exc}") from exc
+    try:
+        yield from _rows_with_header(wb.active.iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+
+def iter_rows(fileobj, filename="", delimiter=None):
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        return iter_xlsx(fileobj)
+    return iter_csv(fileobj, delimiter=delimiter)
+
+
+# ——— Import ———
+class StudentImporter:
+    def __init__(self, school=None, chunk_size=1000, dry_run=False):
+        self.school = school
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.report = ImportReport()
+        self._load_indexes()
+
+    def _load_indexes(self):
+        classrooms = Classroom.objects.select_related("cycle")
+        if self.school is not None:
+            classrooms = classrooms.filter(school=self.school)
+        # objets Classroom complets : Student.build_search_text() n'a rien à requêter
+        self.classrooms = {c.id: c for c in classrooms}
+        # libellé -> classe (None = libellé de plusieurs écoles, ambigu)
+        self.classrooms_by_label = {}
+        for c in self.classrooms.values():
+            key = normalize(c.label)
+            self.classrooms_by_label[key] = None if key in self.classrooms_by_label else c
+        # matricule -> id élève (None = déjà créé / mis à jour par cet import)
+        self.matricules = {}
+        # matricules des élèves d'une autre école : jamais mis à jour d'ici
+        self.foreign_matricules = set()
+        students = Student.objects.exclude(matricule__isnull=True)
+        if self.school is None:
+            rows = ((m, pk, True) for m, pk in students.values_list("matricule", "id").iterator(chunk_size=5000))
+        else:
+            rows = self._matricules_with_owner(students)
+        for matricule, pk, mine in rows:
+            key = _matricule_key(matricule)
+            if mine:
+                self.matricules[key] = pk
+            else:
+                self.foreign_matricules.add(key)
+
+    def _matricules_with_owner(self, students):
+        """(matricule, id, élève de self.school ?) — classe courante, à défaut inscriptions."""
+        enrollments = Enrollment.objects.filter(student=OuterRef("pk"))
+        rows = students.annotate(
+            enrolled_here=Exists(enrollments.filter(school_year__school=self.school)),
+            enrolled=Exists(enrollments),
+        ).values_list("matricule", "id", "classroom__school_id", "enrolled_here", "enrolled")
+        for matricule, pk, school_id, enrolled_here, enrolled in rows.iterator(chunk_size=5000):
+            if school_id is not None:
+                yield matricule, pk, school_id == self.school.pk
+            else:
+                # sans classe : rattaché par ses inscriptions ; sans inscription, à personne
+                yield matricule, pk, enrolled_here or not enrolled
+
+    def run(self, rows) -> ImportReport:
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self._process_chunk(chunk)
+        return self.report
+
+    def _process_chunk(self, chunk):
+        creates, updates = [], {}
+        for line, data in chunk:
+            self.report.rows += 1
+            try:
+                values = self._clean(data)
+            except RowError as exc:
+                self.report.add_error(line, str(exc))
+                continue
+            matricule = values.get("matricule")
+            key = _matricule_key(matricule) if matricule else None
+            if key and key not in self.matricules and key in self.foreign_matricules:
+                self.report.add_error(line, f"Matricule {matricule} : élève d'une autre école.")
+                continue
+            if key and key in self.matricules:
+                pk = self.matricules[key]
+                if pk is None:
+                    self.report.add_error(line, f"Matricule {matricule} en double dans le fichier.")
+                    continue
+                updates[pk] = (line, values)
+                self.matricules[key] = None  # déjà traité : une 2e occurrence est un doublon
+            else:
+                if not values.get("last_name") or not values.get("first_name"):
+                    self.report.add_error(line, "Nouvel élève : nom et prénom obligatoires.")
+                    continue
+                if key:
+                    self.matricules[key] = None
+                creates.append((line, values))
+
+        existing = Student.objects.in_bulk(list(updates)) if updates else {}
+        # (n° ligne, création ?, ancienne classe, nouvelle classe)
+        moves = [
+            (line, True, None, values["classroom"].pk if "classroom" in values else None)
+            for line, values in creates
+        ]
+        for pk, (line, values) in updates.items():
+            student = existing.get(pk)
+            if student is not None and "classroom" in values and values["classroom"].pk != student.classroom_id:
+                moves.append((line, False, student.classroom_id, values["classroom"].pk))
+
+        with transaction.atomic():
+            # Capacité des classes : verrouillées jusqu'à la fin du paquet
+            seats = free_seats({new for *_, new in moves}, lock=not self.dry_run)
+            rejected, deltas = set(), Counter()
+            for line, created, old, new in sorted(moves):
+                classroom, free = seats.get(new, (None, None))
+                if free is not None:
+                    if free <= 0:
+                        self.report.add_error(line, f"Classe {classroom.label} complète ({classroom.capacity} places).")
+                        rejected.add(line)
+                        continue
+                    seats[new] = (classroom, free - 1)
+                deltas[new] += 1
+                if not created:
+                    deltas[old] -= 1
+
+            to_create = []
+            for line, values in creates:
+                if line not in rejected:
+                    student = Student(**values)
+                    student.search_text = student.build_search_text()
+                    to_create.append(student)
+
+            to_update, fields = [], set()
+            for pk, (line, values) in updates.items():
+                student = existing.get(pk)
+                if student is None or line in rejected:
+                    continue
+                for name, value in values.items():
+                    setattr(student, name, value)
+                fields.update(values)
+                if SEARCH_FIELDS & values.keys():
+                    if "classroom" not in values and student.classroom_id in self.classrooms:
+                        student.classroom = self.classrooms[student.classroom_id]
+                    student.search_text = student.build_search_text()
+                    fields.add("search_text")
+                to_update.append(student)
+
+            if not self.dry_run:
+                last_pk = Student.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+                Student.objects.bulk_create(to_create, batch_size=500)
+                _assign_created_pks(to_create, last_pk)
+                if to_update:
+                    Student.objects.bulk_update(to_update, sorted(fields), batch_size=500)
+                self.report.student_ids.extend(s.pk for s in to_create + to_update if s.pk)
+                # bulk_* ne déclenchent pas les signaux : effectifs tenus à jour ici,
+                # sous verrou, pour les inscriptions concurrentes
+                bump_many(deltas)
+        self.report.created += len(to_create)
+        self.report.updated += len(to_update)
+
+    def _clean(self, data):
+        values = {}
+        matricule = _cell(data.get("matricule"))
+        if matricule:
+            values["matricule"] = _check_length("matricule", matricule)
+
+        cid = _cell(data.get("classroom_id"))
+        label = _cell(data.get("classroom_label"))
+        if cid:
+            try:
+                classroom = self.classrooms.get(int(float(cid)))
+            except ValueError:
+                classroom = None
+            if classroom is None:
+                raise RowError(f"Classe introuvable (id {cid}).")
+            values["classroom"] = classroom
+        elif label:
+            key = normalize(label)
+            if key not in self.classrooms_by_label:
+                raise RowError(f"Classe introuvable : « {label} ».")
+            classroom = self.classrooms_by_label[key]
+            if classroom is None:
+                raise RowError(f"Classe « {label} » présente dans plusieurs écoles : utiliser classroom_id.")
+            values["classroom"] = classroom
+
+        for name in TEXT_FIELDS:
+            value = _cell(data.get(name))
+            if value:
+                values[name] = _check_length(name, value)
+
+        gender = normalize(data.get("gender") or "")
+        if gender:
+            if gender not in GENDERS:
+                raise RowError(f"Sexe invalide : « {data.get('gender')} » (M/F).")
+            values["gender"] = GENDERS[gender]
+
+        for name in ("birth_date", "enrollment_date"):
+            if data.get(name):
+                values[name] = _parse_date(data[name])
+
+        if not values or values.keys() == {"matricule"}:
+            raise RowError("Ligne sans donnée exploitable.")
+        return values
+
+
+# colonnes qui identifient une ligne créée quand bulk_create ne renvoie pas les id
+CREATED_KEY = ("last_name", "first_name", "matricule", "classroom_id")
+
+
+def _assign_created_pks(students, last_pk):
+    """
+    bulk_create sous MySQL ne renvoie pas les id : relus parmi les lignes
+    d'id > `last_pk` et rapprochés des objets créés (dans l'ordre d'insertion).
+    """
+    waiting = defaultdict(list)
+    for student in students:
+        if student.pk is None:
+            waiting[tuple(getattr(student, f) for f in CREATED_KEY)].append(student)
+    if not waiting:
+        return
+    rows = Student.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", *CREATED_KEY)
+    for pk, *key in rows.iterator(chunk_size=2000):
+        pending = waiting.get(tuple(key))
+        if pending:
+            pending.pop(0).pk = pk
+
+
+def _parse_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    value = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise RowError(f"Date invalide : « {value} » (JJ/MM/AAAA).")
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from students.models import Student
+from students.photos import process_photo, thumbnail_names
+
+
+class Command(BaseCommand):
+    help = "Génère les vignettes (et retire l'EXIF) des photos d'élèves existantes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Regénère aussi les photos déjà traitées")
+
+    def handle(self, *args, **opts):
+        done = skipped = failed = 0
+        students = Student.objects.exclude(photo="").exclude(photo__isnull=True).only("id", "photo")
+        for student in students.iterator(chunk_size=500):
+            storage, name = student.photo.storage, student.photo.name
+            if not storage.exists(name):
+                self.stderr.write(f"#{student.pk} : fichier absent ({name})")
+                failed += 1
+                continue
+            if not opts["force"] and all(storage.exists(t) for t in thumbnail_names(name)):
+                skipped += 1
+                continue
+            try:
+                new_name = process_photo(student.photo)
+            except OSError as exc:  # image illisible / tronquée
+                self.stderr.write(f"#{student.pk} : {exc}")
+                failed += 1
+                continue
+            if new_name != name:
+                Student.objects.filter(pk=student.pk).update(photo=new_name)
+            done += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"{done} photo(s) traitée(s), {skipped} déjà à jour, {failed} en échec"
+        ))
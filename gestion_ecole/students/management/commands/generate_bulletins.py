@@ -0,0 +1,60 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.text import slugify
+
+from catalog.models import Classroom, SchoolYear
+from core.pdf import merge_pdfs, zip_pdfs
+from students.bulletins import build_bulletins, render_bulletins
+
+
+class Command(BaseCommand):
+    help = "Génère les bulletins PDF d'une école (un fichier par classe) pour une année scolaire"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, required=True, help="id de l'année scolaire")
+        parser.add_argument("--classroom", type=int, action="append", help="id de classe (répétable ; défaut : toutes)")
+        parser.add_argument("--term", type=int, choices=[1, 2, 3], help="Trimestre (notes, moyennes et rangs)")
+        parser.add_argument("--out", default="bulletins", help="Dossier de sortie")
+        parser.add_argument("--format", choices=["pdf", "zip"], default="pdf")
+        parser.add_argument("--workers", type=int, help="Processus WeasyPrint (défaut : settings.PDF_WORKERS)")
+
+    def handle(self, *args, **opts):
+        school_year = SchoolYear.objects.select_related("school").filter(pk=opts["year"]).first()
+        if school_year is None:
+            raise CommandError(f"Année scolaire {opts['year']} introuvable.")
+        classrooms = (
+            Classroom.objects.filter(school_id=school_year.school_id)
+            .select_related("school", "cycle", "main_teacher").order_by("label")
+        )
+        if opts["classroom"]:
+            classrooms = classrooms.filter(pk__in=opts["classroom"])
+
+        # Tout le HTML d'abord, puis UN seul pool pour toute l'école
+        items, owner = [], {}
+        for classroom in classrooms:
+            for name, html in build_bulletins(classroom, school_year, opts["term"]):
+                key = (classroom.pk, name)
+                owner[key] = classroom
+                items.append((key, html))
+        if not items:
+            self.stdout.write(self.style.WARNING("Aucun élève : rien à générer."))
+            return
+
+        per_class = {}
+        for (cid, name), pdf in render_bulletins(items, workers=opts["workers"]):
+            per_class.setdefault(cid, []).append((name, pdf))
+
+        out = Path(opts["out"])
+        out.mkdir(parents=True, exist_ok=True)
+        for cid, pdfs in per_class.items():
+            classroom = owner[(cid, pdfs[0][0])]
+            stem = f"bulletins_{slugify(classroom.label)}_{slugify(school_year.label)}"
+            if opts["format"] == "zip":
+                path = out / f"{stem}.zip"
+                path.write_bytes(zip_pdfs(pdfs))
+            else:
+                path = out / f"{stem}.pdf"
+                path.write_bytes(merge_pdfs(pdf for _, pdf in pdfs))
+            self.stdout.write(f"{path} ({len(pdfs)} élève(s))")
+        self.stdout.write(self.style.SUCCESS(f"{len(items)} bulletin(s) générés dans {out}"))
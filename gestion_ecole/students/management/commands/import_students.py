@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.models import School, SchoolYear
+from students.enrollments import enroll_students
+from students.importer import READ_ERRORS, StudentImporter, iter_rows
+
+
+class Command(BaseCommand):
+    help = "Importe des élèves depuis un fichier CSV (; ou ,) ou XLSX — création ou mise à jour par matricule"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Fichier .csv ou .xlsx")
+        parser.add_argument("--school", type=int, help="id de l'école (restreint les classes acceptées)")
+        parser.add_argument(
+            "--year", type=int,
+            help="id de l'année scolaire où inscrire les élèves importés (défaut : année active de --school)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--delimiter", help="Séparateur CSV (détecté par défaut)")
+        parser.add_argument("--dry-run", action="store_true", help="Valide le fichier sans rien écrire")
+        parser.add_argument("--max-errors", type=int, default=50, help="Nombre d'erreurs affichées")
+
+    def handle(self, *args, **opts):
+        school = None
+        if opts["school"]:
+            school = School.objects.filter(pk=opts["school"]).first()
+            if school is None:
+                raise CommandError(f"École {opts['school']} introuvable.")
+        school_year = None
+        if opts["year"]:
+            school_year = SchoolYear.objects.filter(pk=opts["year"]).first()
+            if school_year is None or (school and school_year.school_id != school.pk):
+                raise CommandError(f"Année scolaire {opts['year']} introuvable pour cette école.")
+        elif school:
+            school_year = SchoolYear.objects.filter(school=school, is_active=True).order_by("-start_date").first()
+
+        importer = StudentImporter(school=school, chunk_size=opts["chunk_size"], dry_run=opts["dry_run"])
+        report = importer.report
+        try:
+            with open(opts["path"], "rb") as fh:
+                importer.run(iter_rows(fh, opts["path"], delimiter=opts["delimiter"]))
+        except (OSError, *READ_ERRORS) as exc:
+            # les paquets précédents sont déjà enregistrés : inscrits comme les autres
+            self.enroll(school_year, report)
+            raise CommandError(f"Fichier illisible : {exc} (après {report})")
+
+        for line, message in report.errors[: opts["max_errors"]]:
+            self.stdout.write(f"ligne {line} : {message}")
+        if report.error_count > opts["max_errors"]:
+            self.stdout.write(f"… et {report.error_count - opts['max_errors']} autre(s) erreur(s)")
+        self.enroll(school_year, report)
+        style = self.style.WARNING if report.error_count else self.style.SUCCESS
+        prefix = "[simulation] " if opts["dry_run"] else ""
+        self.stdout.write(style(prefix + str(report)))
+
+    def enroll(self, school_year, report):
+        """Comme StudentImportView : seuls les élèves du fichier sont inscrits / réaffectés."""
+        if school_year and report.student_ids:
+            created, moved = enroll_students(school_year, report.student_ids)
+            self.stdout.write(f"{school_year.label} : {created} inscription(s) créée(s), {moved} réaffectée(s)")
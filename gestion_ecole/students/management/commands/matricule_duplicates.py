@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+
+from students.models import Student
+
+INDEX = "idx_student_matricule"
+
+
+class Command(BaseCommand):
+    help = "Liste les matricules en double ; sans doublon, --make-unique rend idx_student_matricule UNIQUE"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=50, help="Nombre max de doublons affichés")
+        parser.add_argument(
+            "--fail", action="store_true",
+            help="Code de sortie non nul s'il reste des doublons (CI / déploiement)",
+        )
+        parser.add_argument(
+            "--make-unique", action="store_true",
+            help="Sans doublon : recrée idx_student_matricule en index UNIQUE",
+        )
+
+    def handle(self, *args, **opts):
+        # Une seule agrégation pour trouver les groupes, une requête pour leurs élèves
+        groups = list(
+            Student.objects
+            .exclude(matricule__isnull=True)
+            .values("matricule")
+            .annotate(n=Count("id"))
+            .filter(n__gt=1)
+            .order_by("-n", "matricule")
+        )
+        blanks = Student.objects.filter(matricule="").count()
+
+        if blanks:
+            self.stdout.write(self.style.WARNING(
+                f"{blanks} matricule(s) vide(s) — à remettre à NULL (comptés comme doublons)"
+            ))
+        if not groups:
+            self.stdout.write(self.style.SUCCESS("Aucun matricule en double."))
+            if opts["make_unique"]:
+                self.make_unique()
+            return
+
+        shown = groups[: opts["limit"]]
+        ids_by_matricule = {}
+        rows = (
+            Student.objects
+            .filter(matricule__in=[g["matricule"] for g in shown])
+            .values_list("matricule", "id", "last_name", "first_name")
+            .order_by("matricule", "id")
+        )
+        for matricule, pk, last_name, first_name in rows:
+            ids_by_matricule.setdefault(matricule, []).append(f"#{pk} {last_name} {first_name}")
+
+        for g in shown:
+            self.stdout.write(f"{g['matricule']!r} ×{g['n']} : " + ", ".join(ids_by_matricule.get(g["matricule"], [])))
+        if len(groups) > len(shown):
+            self.stdout.write(f"… et {len(groups) - len(shown)} autre(s) groupe(s)")
+
+        total = sum(g["n"] for g in groups)
+        msg = f"{len(groups)} matricule(s) en double ({total} élèves) — à corriger dans la fiche des élèves."
+        if opts["fail"]:
+            raise CommandError(msg)
+        self.stdout.write(self.style.WARNING(msg))
+
+    def make_unique(self):
+        # Base seulement : l'état Django garde un index simple (0005), les
+        # bases qui ont encore des doublons restant migrables
+        table = Student._meta.db_table
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+        if constraints.get(INDEX, {}).get("unique"):
+            self.stdout.write(f"{INDEX} est déjà UNIQUE.")
+            return
+        with connection.schema_editor() as editor:
+            qn = editor.quote_name
+            if INDEX in constraints:
+                editor.execute(editor._delete_index_sql(Student, INDEX))
+            editor.execute(f"CREATE UNIQUE INDEX {qn(INDEX)} ON {qn(table)} ({qn('matricule')})")
+        self.stdout.write(self.style.SUCCESS(f"{INDEX} recréé en UNIQUE."))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.models import School, SchoolYear
+from students.models import PromotionRun
+from students.promotion import MOVE, OUT, STRATEGIES, apply_plan, build_plan, plan_mapping, revert_run
+
+
+class Command(BaseCommand):
+    help = "Passage en classe supérieure de toutes les classes d'une école (aperçu par défaut)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--school", type=int, help="Id de l'école")
+        parser.add_argument("--strategy", choices=STRATEGIES, default="auto")
+        parser.add_argument("--to-year", type=int, help="Inscrire les élèves déplacés dans cette année")
+        parser.add_argument("--apply", action="store_true", help="Applique le plan affiché")
+        parser.add_argument("--revert", type=int, metavar="RUN", help="Annule le passage RUN")
+
+    def handle(self, *args, **opts):
+        if opts["revert"]:
+            run = PromotionRun.objects.filter(pk=opts["revert"]).first()
+            if run is None:
+                raise CommandError(f"Passage #{opts['revert']} introuvable.")
+            try:
+                revert_run(run)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(self.style.SUCCESS(f"Passage #{run.pk} annulé ({run.moved} élève(s))."))
+            return
+
+        school = School.objects.filter(pk=opts["school"]).first() if opts["school"] else None
+        if school is None:
+            raise CommandError("--school : école introuvable.")
+        to_year = None
+        if opts["to_year"]:
+            to_year = SchoolYear.objects.filter(pk=opts["to_year"], school=school).first()
+            if to_year is None:
+                raise CommandError("--to-year : année introuvable pour cette école.")
+
+        steps = build_plan(school, opts["strategy"])
+        for step in steps:
+            if step.status == MOVE:
+                target = step.target.label
+            elif step.status == OUT:
+                target = "sortants"
+            else:
+                target = f"(inchangée : {step.reason})"
+            self.stdout.write(f"{step.source.label:<30} {step.count:>5}  -> {target}")
+
+        if not opts["apply"]:
+            self.stdout.write(self.style.WARNING("Aperçu seulement : relancer avec --apply."))
+            return
+        try:
+            run = apply_plan(school, plan_mapping(steps), to_year=to_year, strategy=opts["strategy"])
+        except ValueError as exc:  # y compris ClassroomFull (capacité dépassée)
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f"Passage #{run.pk} : {run.moved} élève(s) déplacé(s) (annulation : --revert {run.pk})."
+        ))
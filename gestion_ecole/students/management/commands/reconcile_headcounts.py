@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from students.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recalcule les effectifs par classe (ClassroomHeadcount) et corrige les écarts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Affiche les écarts sans rien corriger")
+
+    def handle(self, *args, **opts):
+        drift = reconcile(dry_run=opts["dry_run"])
+        for cid, expected, stored in drift:
+            label = f"classe #{cid}" if cid else "sans classe"
+            self.stdout.write(f"{label} : enregistré={stored if stored is not None else '—'} réel={expected}")
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Effectifs OK (aucun écart)"))
+        elif opts["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"{len(drift)} écart(s) (non corrigés : --dry-run)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(drift)} écart(s) corrigé(s)"))
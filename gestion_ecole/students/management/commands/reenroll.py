@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.models import SchoolYear
+from students.enrollments import enroll_current_classes, reenroll
+
+
+class Command(BaseCommand):
+    help = "Réinscrit en masse les élèves d'une année scolaire dans l'année suivante"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="from_year", type=int, help="Id de l'année source")
+        parser.add_argument("--to", dest="to_year", type=int, required=True, help="Id de l'année cible")
+        parser.add_argument(
+            "--classroom", action="append", type=int, default=[],
+            help="Limiter à cette classe source (répétable)",
+        )
+        parser.add_argument(
+            "--keep-current-class", action="store_true",
+            help="Ne pas mettre à jour la classe courante des élèves (Student.classroom)",
+        )
+        parser.add_argument(
+            "--from-current-classes", action="store_true",
+            help="Sans --from : inscrire dans --to les élèves d'après leur classe courante",
+        )
+
+    def handle(self, *args, **opts):
+        to_year = self._year(opts["to_year"])
+        if opts["from_current_classes"]:
+            created = enroll_current_classes(to_year)
+            self.stdout.write(self.style.SUCCESS(f"{created} inscription(s) créée(s) pour {to_year.label}"))
+            return
+        if not opts["from_year"]:
+            raise CommandError("--from est requis (ou --from-current-classes).")
+        from_year = self._year(opts["from_year"])
+        classroom_map = {cid: cid for cid in opts["classroom"]} or None
+        try:
+            created, skipped = reenroll(
+                from_year, to_year, classroom_map=classroom_map,
+                update_current=not opts["keep_current_class"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f"{created} réinscription(s) {from_year.label} -> {to_year.label}, {skipped} ignorée(s)"
+        ))
+
+    def _year(self, pk):
+        year = SchoolYear.objects.filter(pk=pk).first()
+        if year is None:
+            raise CommandError(f"Année scolaire #{pk} introuvable.")
+        return year
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-17 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_alter_classroom_options_alter_cycle_options_and_more'),
+        ('students', '0002_alter_student_options_alter_student_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='idx_student_name_seek'),
+        ),
+    ]
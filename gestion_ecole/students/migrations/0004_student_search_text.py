@@ -0,0 +1,65 @@
+# Generated by Django 5.1.1 on 2026-10-17 14:47
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+def _normalize(text):
+    # copie figée de students.search.normalize
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return re.sub(r"[^0-9a-z]+", " ", stripped.lower()).strip()
+
+
+def fill_search_text(apps, schema_editor):
+    Student = apps.get_model("students", "Student")
+    batch = []
+    for s in Student.objects.select_related("classroom__cycle").iterator(chunk_size=500):
+        parts = [s.last_name, s.first_name, s.matricule]
+        if s.classroom_id:
+            parts.append(s.classroom.label)
+            if s.classroom.cycle_id:
+                parts.append(s.classroom.cycle.name)
+        s.search_text = _normalize(" ".join(p for p in parts if p))[:500]
+        batch.append(s)
+        if len(batch) >= 500:
+            Student.objects.bulk_update(batch, ["search_text"])
+            batch = []
+    if batch:
+        Student.objects.bulk_update(batch, ["search_text"])
+
+
+def add_fulltext_index(apps, schema_editor):
+    # SQLite : la table FTS5 est (re)créée au post_migrate (students/signals.py)
+    if schema_editor.connection.vendor != "mysql":
+        return
+    base = "ALTER TABLE students_student ADD FULLTEXT INDEX ft_student_search (search_text)"
+    try:
+        schema_editor.execute(base + " WITH PARSER ngram")
+    except Exception:
+        # MariaDB : pas de parser ngram -> index FULLTEXT standard
+        schema_editor.execute(base)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute("ALTER TABLE students_student DROP INDEX ft_student_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0003_student_name_seek_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='search_text',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
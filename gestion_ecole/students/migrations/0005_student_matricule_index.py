@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+def clean_matricules(apps, schema_editor):
+    Student = apps.get_model("students", "Student")
+    # '' et espaces parasites : sinon faux doublons dans le rapport (matricule_duplicates)
+    Student.objects.filter(matricule="").update(matricule=None)
+    batch = []
+    for s in Student.objects.exclude(matricule__isnull=True).only("id", "matricule").iterator(chunk_size=1000):
+        cleaned = s.matricule.strip()
+        if cleaned != s.matricule:
+            s.matricule = cleaned or None
+            batch.append(s)
+    Student.objects.bulk_update(batch, ["matricule"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("students", "0004_student_search_text"),
+    ]
+
+    operations = [
+        migrations.RunPython(clean_matricules, migrations.RunPython.noop),
+        # Index simple : des doublons historiques peuvent subsister (cf. `manage.py
+        # matricule_duplicates`) ; les nouveaux sont refusés par le formulaire et l'import
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(fields=["matricule"], name="idx_student_matricule"),
+        ),
+    ]
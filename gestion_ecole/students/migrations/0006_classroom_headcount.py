@@ -0,0 +1,49 @@
+# Generated by Django 5.1.1 on 2026-10-17 14:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_headcounts(apps, schema_editor):
+    Student = apps.get_model("students", "Student")
+    Classroom = apps.get_model("catalog", "Classroom")
+    ClassroomHeadcount = apps.get_model("students", "ClassroomHeadcount")
+    counts = dict(Student.objects.order_by().values_list("classroom_id").annotate(n=Count("id")))
+    rows = [
+        ClassroomHeadcount(classroom_id=cid, school_id=school_id, total=counts.get(cid, 0))
+        for cid, school_id in Classroom.objects.values_list("id", "school_id")
+    ]
+    rows.append(ClassroomHeadcount(classroom_id=None, school_id=None, total=counts.get(None, 0), unassigned=True))
+    ClassroomHeadcount.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_alter_classroom_options_alter_cycle_options_and_more'),
+        ('students', '0005_student_matricule_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassroomHeadcount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Effectif')),
+                ('unassigned', models.BooleanField(editable=False, null=True, unique=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('classroom', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='headcount', to='catalog.classroom', verbose_name='Classe')),
+                ('school', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.school')),
+            ],
+            options={
+                'verbose_name': 'Effectif',
+                'verbose_name_plural': 'Effectifs',
+                'indexes': [
+                    models.Index(fields=['school', 'classroom'], name='idx_headcount_school'),
+                    models.Index(fields=['school', 'total'], name='idx_headcount_school_total'),
+                ],
+            },
+        ),
+        migrations.RunPython(fill_headcounts, migrations.RunPython.noop),
+    ]
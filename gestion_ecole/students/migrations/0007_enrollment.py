@@ -0,0 +1,71 @@
+# Generated by Django 5.1.1 on 2026-10-17 14:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_enrollments(apps, schema_editor):
+    """
+    Student.classroom / enrollment_date -> une Enrollment par élève classé.
+    Année : celle de l'école de la classe qui contient la date d'inscription,
+    à défaut l'année active la plus récente. École sans année : ignorée.
+    """
+    Student = apps.get_model("students", "Student")
+    Classroom = apps.get_model("catalog", "Classroom")
+    SchoolYear = apps.get_model("catalog", "SchoolYear")
+    Enrollment = apps.get_model("students", "Enrollment")
+
+    years = {}  # school_id -> [(start, end, id, is_active)], actives récentes d'abord
+    for sy in SchoolYear.objects.order_by("-is_active", "-start_date"):
+        years.setdefault(sy.school_id, []).append((sy.start_date, sy.end_date, sy.id, sy.is_active))
+    schools = dict(Classroom.objects.values_list("id", "school_id"))
+
+    def year_for(classroom_id, date):
+        candidates = years.get(schools.get(classroom_id), [])
+        if date:
+            for start, end, syid, _ in candidates:
+                if start <= date <= end:
+                    return syid, date
+        if candidates:
+            return candidates[0][2], date or candidates[0][0]
+        return None, None
+
+    rows = []
+    students = Student.objects.exclude(classroom=None).values_list("id", "classroom_id", "enrollment_date")
+    for sid, cid, date in students.iterator(chunk_size=2000):
+        syid, date = year_for(cid, date)
+        if syid:
+            rows.append(Enrollment(student_id=sid, classroom_id=cid, school_year_id=syid, date=date))
+        if len(rows) >= 2000:
+            Enrollment.objects.bulk_create(rows)
+            rows = []
+    Enrollment.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_alter_classroom_options_alter_cycle_options_and_more'),
+        ('students', '0006_classroom_headcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Enrollment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(blank=True, null=True, verbose_name="Date d'inscription")),
+                ('status', models.CharField(choices=[('ACTIVE', 'Inscrit'), ('TRANSFERRED', 'Transféré'), ('WITHDRAWN', 'Abandon')], default='ACTIVE', max_length=20, verbose_name='Statut')),
+                ('classroom', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='enrollments', to='catalog.classroom', verbose_name='Classe')),
+                ('school_year', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='enrollments', to='catalog.schoolyear', verbose_name='Année scolaire')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='students.student', verbose_name='Élève')),
+            ],
+            options={
+                'verbose_name': 'Inscription',
+                'verbose_name_plural': 'Inscriptions',
+                'indexes': [models.Index(fields=['school_year', 'classroom'], name='idx_enrollment_year_class')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'school_year'), name='uniq_enrollment_student_year')],
+            },
+        ),
+        migrations.RunPython(fill_enrollments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.1 on 2026-10-17 15:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_alter_classroom_options_alter_cycle_options_and_more'),
+        ('students', '0007_enrollment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromotionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('strategy', models.CharField(max_length=20, verbose_name='Correspondance')),
+                ('moved', models.PositiveIntegerField(default=0, verbose_name='Élèves déplacés')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reverted_at', models.DateTimeField(blank=True, null=True, verbose_name='Annulé le')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.school', verbose_name='École')),
+                ('to_year', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.schoolyear', verbose_name='Année cible')),
+            ],
+            options={
+                'verbose_name': 'Passage en classe supérieure',
+                'verbose_name_plural': 'Passages en classe supérieure',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PromotionMove',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('enrolled', models.BooleanField(default=False)),
+                ('from_classroom', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.classroom')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='students.student')),
+                ('to_classroom', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.classroom')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='moves', to='students.promotionrun')),
+            ],
+        ),
+    ]
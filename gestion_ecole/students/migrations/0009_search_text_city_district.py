@@ -0,0 +1,49 @@
+# Generated by Django 5.1.1 on 2026-10-17 18:00
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+def _normalize(text):
+    # copie figée de students.search.normalize
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return re.sub(r"[^0-9a-z]+", " ", stripped.lower()).strip()
+
+
+def fill_search_text(apps, schema_editor):
+    """Ville et quartier rejoignent search_text (recherche de l'admin par l'index)."""
+    Student = apps.get_model("students", "Student")
+    batch = []
+    for s in Student.objects.select_related("classroom__cycle").iterator(chunk_size=500):
+        parts = [s.last_name, s.first_name, s.matricule, s.city, s.district]
+        if s.classroom_id:
+            parts.append(s.classroom.label)
+            if s.classroom.cycle_id:
+                parts.append(s.classroom.cycle.name)
+        text = _normalize(" ".join(p for p in parts if p))[:500]
+        if text != s.search_text:
+            s.search_text = text
+            batch.append(s)
+        if len(batch) >= 500:
+            Student.objects.bulk_update(batch, ["search_text"])
+            batch = []
+    if batch:
+        Student.objects.bulk_update(batch, ["search_text"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("students", "0008_promotion_journal"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(fields=["parent_phone"], name="idx_student_parent_phone"),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+    ]
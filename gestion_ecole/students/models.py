@@ -1,7 +1,8 @@
 # students/models.py
+from django.conf import settings
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from catalog.models import Classroom
+from catalog.models import Classroom, School, SchoolYear
 
 
 class Student(models.Model):
@@ -22,7 +23,10 @@ class Student(models.Model):
     photo = models.ImageField("Photo", upload_to="students/", null=True, blank=True)
 
     # ——— Informations supplémentaires
-    # (évite unique=True pour ne pas échouer si tu as des doublons historiques)
+    # (pas de unique=True : des doublons historiques peuvent subsister, listés par
+    #  `manage.py matricule_duplicates`. idx_student_matricule est un index simple,
+    #  rendu UNIQUE en base par `matricule_duplicates --make-unique` une fois les
+    #  doublons corrigés ; les nouveaux sont refusés par StudentEnrollForm et l'import)
     matricule = models.CharField("Matricule", max_length=50, null=True, blank=True)
     classroom = models.ForeignKey(
         Classroom, verbose_name="Classe",
@@ -35,15 +39,168 @@ class Student(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # ——— Recherche (colonne dénormalisée, indexée plein texte — cf. students/search.py)
+    search_text = models.CharField(max_length=500, blank=True, default="", editable=False)
+
     class Meta:
         ordering = ["last_name", "first_name"]
+        indexes = [
+            # Sert l'ordre de la liste et la pagination keyset (nom, prénom, id)
+            models.Index(fields=["last_name", "first_name", "id"], name="idx_student_name_seek"),
+            # Recherche exacte / par préfixe du matricule (accueil, scan de cartes)
+            models.Index(fields=["matricule"], name="idx_student_matricule"),
+            # Recherche par préfixe du numéro du parent (admin)
+            models.Index(fields=["parent_phone"], name="idx_student_parent_phone"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.last_name} {self.first_name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Classe d'origine : permet aux signaux de décompter un changement de classe
+        instance._loaded_classroom_id = instance.__dict__.get("classroom_id")
+        # Photo d'origine : les vignettes ne sont régénérées qu'au changement
+        instance._loaded_photo = instance.__dict__.get("photo") or ""
+        return instance
 
+    def build_search_text(self) -> str:
+        """Nom, prénom, matricule, ville, quartier, classe et cycle — minuscules, sans accents."""
+        from .search import normalize
 
+        parts = [self.last_name, self.first_name, self.matricule, self.city, self.district]
+        classroom = self.classroom
+        if classroom is not None:
+            parts.append(classroom.label)
+            if classroom.cycle_id:
+                parts.append(classroom.cycle.name)
+        return normalize(" ".join(p for p in parts if p))[:500]
 
+    def save(self, *args, **kwargs):
+        self.search_text = self.build_search_text()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "search_text" not in update_fields:
+            kwargs["update_fields"] = {*update_fields, "search_text"}
+        super().save(*args, **kwargs)
 
 
+class Enrollment(models.Model):
+    """
+    Inscription d'un élève dans une classe pour une année scolaire : une ligne
+    par élève et par année, jamais écrasée d'une année sur l'autre (historique).
+    Student.classroom reste la classe courante (listes, recherche, effectifs).
+    """
+    class Status(models.TextChoices):
+        ACTIVE = "ACTIVE", _("Inscrit")
+        TRANSFERRED = "TRANSFERRED", _("Transféré")
+        WITHDRAWN = "WITHDRAWN", _("Abandon")
 
+    student = models.ForeignKey(
+        Student, verbose_name="Élève", on_delete=models.CASCADE, related_name="enrollments"
+    )
+    classroom = models.ForeignKey(
+        Classroom, verbose_name="Classe", on_delete=models.PROTECT, related_name="enrollments"
+    )
+    school_year = models.ForeignKey(
+        SchoolYear, verbose_name="Année scolaire", on_delete=models.PROTECT, related_name="enrollments"
+    )
+    date = models.DateField("Date d'inscription", null=True, blank=True)
+    status = models.CharField("Statut", max_length=20, choices=Status.choices, default=Status.ACTIVE)
+
+    class Meta:
+        verbose_name = "Inscription"
+        verbose_name_plural = "Inscriptions"
+        constraints = [
+            # Une ligne par élève et par année ; sert aussi « déjà inscrit cette année ? »
+            models.UniqueConstraint(fields=["student", "school_year"], name="uniq_enrollment_student_year"),
+        ]
+        indexes = [
+            # Effectifs d'une année (par classe) : un seul agrégat sur l'index
+            models.Index(fields=["school_year", "classroom"], name="idx_enrollment_year_class"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.student} — {self.classroom} ({self.school_year.label})"
+
+
+class ClassroomHeadcount(models.Model):
+    """
+    Effectif courant par classe, tenu à jour par les signaux de Student
+    (cf. students/counters.py). La ligne `classroom=NULL` compte les élèves
+    sans classe. `manage.py reconcile_headcounts` corrige une éventuelle dérive
+    (imports en masse, modifications SQL directes…).
+    """
+    classroom = models.OneToOneField(
+        Classroom, verbose_name="Classe",
+        on_delete=models.CASCADE, null=True, blank=True, related_name="headcount",
+    )
+    # dénormalisé depuis classroom.school : filtre par école sans jointure
+    school = models.ForeignKey(School, on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    total = models.PositiveIntegerField("Effectif", default=0)
+    # NULL ne collisionne jamais dans l'unicité de `classroom` : la ligne « sans
+    # classe » porte True ici (NULL pour les classes), clé unique simple
+    # (pas d'index sur expression, ignoré par MariaDB / MySQL < 8.0.13)
+    unassigned = models.BooleanField(null=True, unique=True, editable=False)
+    # posé par counters.bump / reconcile : empreinte de la liste des classes (ETag)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Effectif"
+        verbose_name_plural = "Effectifs"
+        indexes = [
+            models.Index(fields=["school", "classroom"], name="idx_headcount_school"),
+            # Liste des classes triée / filtrée par effectif au sein d'une école
+            models.Index(fields=["school", "total"], name="idx_headcount_school_total"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.classroom or 'Sans classe'} : {self.total}"
+
+    def save(self, *args, **kwargs):
+        # bulk_create ne passe pas ici : poser `unassigned` soi-même (cf. counters.reconcile)
+        self.unassigned = True if self.classroom_id is None else None
+        super().save(*args, **kwargs)
+
+
+class PromotionRun(models.Model):
+    """
+    Journal d'un passage en classe supérieure (cf. students/promotion.py) :
+    une ligne PromotionMove par élève déplacé, de quoi annuler l'opération.
+    """
+    school = models.ForeignKey(School, verbose_name="École", on_delete=models.CASCADE, related_name="+")
+    to_year = models.ForeignKey(
+        SchoolYear, verbose_name="Année cible", on_delete=models.SET_NULL,
+        null=True, blank=True, related_name="+",
+    )
+    strategy = models.CharField("Correspondance", max_length=20)
+    moved = models.PositiveIntegerField("Élèves déplacés", default=0)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    reverted_at = models.DateTimeField("Annulé le", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Passage en classe supérieure"
+        verbose_name_plural = "Passages en classe supérieure"
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"{self.school} — {self.created_at:%d/%m/%Y %H:%M} ({self.moved} élève(s))"
+
+
+class PromotionMove(models.Model):
+    run = models.ForeignKey(PromotionRun, on_delete=models.CASCADE, related_name="moves")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="+")
+    # SET_NULL : l'annulation reste possible (vers « sans classe ») si une classe disparaît
+    from_classroom = models.ForeignKey(
+        Classroom, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    to_classroom = models.ForeignKey(  # NULL = sortant (fin de cycle)
+        Classroom, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    enrolled = models.BooleanField(default=False)  # Enrollment créée dans run.to_year
+
+    def __str__(self) -> str:
+        return f"{self.student_id}: {self.from_classroom_id} -> {self.to_classroom_id}"
@@ -0,0 +1,59 @@
+# students/pagination.py
+"""
+Pagination « keyset » (seek) pour le scroll infini.
+
+Au lieu de `OFFSET n` + `COUNT(*)`, on reprend la lecture juste après la
+dernière ligne affichée : WHERE (last_name, first_name, id) > (…).
+Le coût d'un fragment reste constant quelle que soit la profondeur du scroll.
+"""
+import base64
+import json
+
+from django.db.models import Q
+
+# Ordre total : (nom, prénom, id) — l'id départage les homonymes
+SEEK_ORDERING = ("last_name", "first_name", "id")
+
+
+def encode_cursor(obj) -> str:
+    """Jeton opaque (base64 url-safe) à partir de la dernière ligne affichée."""
+    raw = json.dumps([getattr(obj, f) for f in SEEK_ORDERING], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str):
+    """Retourne (last_name, first_name, id) ou None si le jeton est invalide."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        last_name, first_name, pk = values
+        return str(last_name), str(first_name), int(pk)
+    except (ValueError, TypeError, UnicodeError):
+        return None
+
+
+def seek(queryset, cursor):
+    """Filtre le queryset sur les lignes strictement après `cursor`."""
+    qs = queryset.order_by(*SEEK_ORDERING)
+    if cursor is None:
+        return qs
+    last_name, first_name, pk = cursor
+    return qs.filter(
+        Q(last_name__gt=last_name)
+        | Q(last_name=last_name, first_name__gt=first_name)
+        | Q(last_name=last_name, first_name=first_name, id__gt=pk)
+    )
+
+
+def seek_page(queryset, cursor, size: int):
+    """
+    Lit `size` lignes après `cursor` (une de plus pour savoir s'il y a une suite).
+    Retourne (lignes, jeton_suivant|None) — aucun COUNT(*).
+    """
+    rows = list(seek(queryset, cursor)[: size + 1])
+    if len(rows) > size:
+        rows = rows[:size]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
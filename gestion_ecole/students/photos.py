@@ -0,0 +1,132 @@
+# students/photos.py
+"""
+Photos d'élèves : traitement à l'upload (Pillow).
+
+- L'original est réorienté (tag EXIF Orientation), ramené à ORIGINAL_MAX px
+  au plus et réenregistré SANS métadonnées EXIF (GPS, appareil…).
+- Des vignettes carrées de taille fixe (THUMBNAIL_SIZES) sont générées en
+  WebP et en JPEG, à côté de l'original :
+      students/abc.jpg -> students/abc_64.webp, students/abc_64.jpg, …
+  Leur nom se déduit de celui de l'original : aucun champ en base.
+
+Listes et cartes n'affichent que les vignettes (balise `student_photo`,
+cf. core/templatetags/core_extras.py). Photos antérieures :
+`manage.py build_thumbnails`.
+"""
+import io
+import os
+
+from django.core.files.base import ContentFile
+from django.templatetags.static import static
+from PIL import Image, ImageOps  # déjà requis par ImageField
+
+THUMBNAIL_SIZES = (64, 128, 256)
+THUMBNAIL_FORMATS = (("webp", "WEBP"), ("jpg", "JPEG"))
+ORIGINAL_MAX = 1024
+QUALITY = 82
+
+DEFAULT_PHOTOS = {
+    "F": "img/profil_fille_defaut.png",
+    "M": "img/profil_garcon_defaut.jpeg",
+}
+
+
+def thumbnail_name(name, size, ext):
+    stem, _ = os.path.splitext(name)
+    return f"{stem}_{size}.{ext}"
+
+
+def thumbnail_names(name):
+    return [thumbnail_name(name, size, ext) for size in THUMBNAIL_SIZES for ext, _ in THUMBNAIL_FORMATS]
+
+
+def _flatten(img):
+    """JPEG : pas de transparence, fond blanc."""
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, "white")
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB") if img.mode != "RGB" else img
+
+
+def _encode(img, fmt):
+    out = io.BytesIO()
+    if fmt == "JPEG":
+        _flatten(img).save(out, "JPEG", quality=QUALITY, optimize=True, progressive=True)
+    elif fmt == "WEBP":
+        img.save(out, "WEBP", quality=QUALITY, method=4)
+    else:
+        img.save(out, fmt)
+    return out.getvalue()
+
+
+def _replace(storage, name, data):
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(data))
+
+
+def process_photo(field_file):
+    """
+    Nettoie l'original et (re)génère ses vignettes. Renvoie le nom final de
+    l'original (identique sauf collision improbable dans le stockage).
+    """
+    storage, name = field_file.storage, field_file.name
+    with storage.open(name, "rb") as fh:
+        img = Image.open(fh)
+        fmt = img.format or "JPEG"
+        img = ImageOps.exif_transpose(img)  # applique l'orientation, puis l'oublie
+        img.load()
+
+    if img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+        img = img.convert("RGB")
+    if max(img.size) > ORIGINAL_MAX:
+        img.thumbnail((ORIGINAL_MAX, ORIGINAL_MAX), Image.LANCZOS)
+    # réencodé sans paramètre exif= : les métadonnées ne sont pas recopiées
+    name = _replace(storage, name, _encode(img, fmt))
+
+    if img.mode == "P":
+        img = img.convert("RGBA")
+    for size in THUMBNAIL_SIZES:
+        # recadrage carré, légèrement vers le haut (visage)
+        thumb = ImageOps.fit(img, (size, size), Image.LANCZOS, centering=(0.5, 0.4))
+        for ext, thumb_fmt in THUMBNAIL_FORMATS:
+            _replace(storage, thumbnail_name(name, size, ext), _encode(thumb, thumb_fmt))
+    return name
+
+
+def delete_thumbnails(storage, name):
+    for thumb in thumbnail_names(name):
+        if storage.exists(thumb):
+            storage.delete(thumb)
+
+
+def _fitting_size(size):
+    """Plus petite vignette d'au moins `size` px (à défaut, la plus grande)."""
+    return min((s for s in THUMBNAIL_SIZES if s >= size), default=THUMBNAIL_SIZES[-1])
+
+
+def photo_sources(student, size):
+    """
+    {"webp": srcset, "jpg": srcset, "src": url} pour la vignette `size`
+    (et une version 2x pour les écrans denses), ou None si l'élève n'a pas de photo.
+    """
+    if not student.photo:
+        return None
+    one_x, two_x = _fitting_size(size), _fitting_size(size * 2)
+    candidates = [(one_x, "1x")]
+    if two_x != one_x:
+        candidates.append((two_x, "2x"))
+    storage, name = student.photo.storage, student.photo.name
+    sources = {}
+    for ext, _ in THUMBNAIL_FORMATS:
+        sources[ext] = ", ".join(
+            f"{storage.url(thumbnail_name(name, s, ext))} {density}" for s, density in candidates
+        )
+    sources["src"] = storage.url(thumbnail_name(name, one_x, "jpg"))
+    return sources
+
+
+def default_photo_url(student):
+    return static(DEFAULT_PHOTOS.get(student.gender, DEFAULT_PHOTOS["M"]))
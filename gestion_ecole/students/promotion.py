@@ -0,0 +1,272 @@
+# students/promotion.py
+"""
+Passage en classe supérieure (fin d'année), pour toutes les classes d'une école.
+
+1. build_plan() : chaque classe source reçoit une classe cible, d'après
+   - les libellés prédéfinis du cycle (catalog.presets.PRESETS_*) :
+     « 5ème Année B » -> « 6ème Année B » ;
+   - à défaut l'ordre des niveaux (Grade.level) : le niveau dont le nom
+     préfixe le libellé est remplacé par le niveau suivant.
+   Dernière étape d'une filière : élèves « sortants » (plus de classe).
+   Cible introuvable : classe « non résolue », laissée en place.
+2. apply_plan() : une transaction, quelques requêtes ensemblistes :
+   capacité des classes cibles (verrouillées, cf. capacity.py), journal (bulk_create de PromotionMove), UN `UPDATE … CASE` sur les
+   élèves (pas d'effet de chaîne 5ème -> 6ème -> 7ème), inscriptions de
+   l'année cible (bulk_create), puis effectifs / index de recherche.
+3. revert_run() : remet chaque élève dans sa classe d'origine d'après le
+   journal (s'il n'a pas été déplacé depuis).
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Subquery, Value, When
+from django.utils import timezone
+
+from catalog.models import Classroom, Grade
+from catalog.presets import presets_for_cycle_name
+from .capacity import ensure_capacity
+from .counters import bump_many, headcounts
+from .models import Enrollment, PromotionMove, PromotionRun, Student
+from .search import normalize, reindex_students
+
+STRATEGIES = ("auto", "presets", "grades")
+BATCH_SIZE = 1000
+
+_RANK = re.compile(r"\d+")
+
+MOVE, OUT, UNRESOLVED = "move", "out", "unresolved"
+_NOT_FOUND = object()
+
+
+@dataclass
+class PlanStep:
+    source: Classroom
+    target: Classroom | None
+    status: str  # MOVE | OUT | UNRESOLVED
+    count: int = 0
+    reason: str = ""
+
+
+# ——— Correspondance des libellés
+def _rank(label):
+    m = _RANK.search(label)
+    return int(m.group()) if m else None
+
+
+def preset_ladders(presets):
+    """
+    Découpe une liste de presets en filières : suites dont le rang (1er nombre
+    du libellé) augmente de 1. ["10ème", "11ème", "12ème", "1ère", "2ème"] ->
+    [["10ème", "11ème", "12ème"], ["1ère", "2ème"]].
+    """
+    ladders, current = [], []
+    for label in presets:
+        rank = _rank(label)
+        if current and (rank is None or _rank(current[-1]) is None or rank != _rank(current[-1]) + 1):
+            ladders.append(current)
+            current = []
+        current.append(label)
+    if current:
+        ladders.append(current)
+    return ladders
+
+
+def _split_prefix(label, prefixes):
+    """(préfixe reconnu, suffixe d'origine) — le plus long préfixe gagne."""
+    norm = normalize(label)
+    for prefix in sorted(prefixes, key=lambda p: -len(normalize(p))):
+        p = normalize(prefix)
+        if p and (norm == p or norm.startswith(p + " ")):
+            # suffixe pris dans le libellé d'origine (« B », « (Sciences) »…)
+            words = len(p.split())
+            return prefix, " ".join(label.split()[words:])
+    return None, ""
+
+
+def _join(prefix, suffix):
+    return f"{prefix} {suffix}".strip()
+
+
+def _next_by_presets(classroom):
+    """(libellé cible | None si fin de filière) ou KeyError si aucun preset ne s'applique."""
+    presets = presets_for_cycle_name(classroom.cycle.name if classroom.cycle_id else "")
+    for ladder in preset_ladders(presets):
+        prefix, suffix = _split_prefix(classroom.label, ladder)
+        if prefix is not None:
+            i = ladder.index(prefix)
+            return _join(ladder[i + 1], suffix) if i + 1 < len(ladder) else None
+    raise KeyError(classroom.label)
+
+
+def _next_by_grades(classroom, grades):
+    """`grades` : niveaux de l'école triés par level."""
+    names = [g.name for g in grades]
+    prefix, suffix = _split_prefix(classroom.label, names)
+    if prefix is None:
+        raise KeyError(classroom.label)
+    level = next(g.level for g in grades if g.name == prefix)
+    higher = [g for g in grades if g.level > level]
+    return _join(higher[0].name, suffix) if higher else None
+
+
+# ——— Plan
+def build_plan(school, strategy="auto"):
+    """[PlanStep] pour toutes les classes de l'école (3 requêtes)."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Stratégie inconnue : {strategy}")
+    classrooms = list(Classroom.objects.filter(school=school).select_related("cycle").order_by("label"))
+    by_label = {normalize(c.label): c for c in classrooms}
+    grades = list(Grade.objects.filter(school=school).order_by("level", "name"))
+    counts = {r["classroom__id"]: r["total"] for r in headcounts(school.pk)[0]}
+
+    steps = []
+    for classroom in classrooms:
+        step = PlanStep(source=classroom, target=None, status=UNRESOLVED, count=counts.get(classroom.pk, 0))
+        label = _NOT_FOUND
+        for name in ("presets", "grades"):
+            if strategy not in ("auto", name):
+                continue
+            try:
+                label = _next_by_presets(classroom) if name == "presets" else _next_by_grades(classroom, grades)
+                break
+            except KeyError:
+                continue
+        if label is _NOT_FOUND:
+            step.reason = "Libellé non reconnu"
+        elif label is None:
+            step.status = OUT
+        elif normalize(label) in by_label:
+            step.target, step.status = by_label[normalize(label)], MOVE
+        else:
+            step.reason = f"Classe « {label} » introuvable"
+        steps.append(step)
+
+    # Aperçu de la capacité des classes cibles après le passage
+    moving = {s.source.pk for s in steps if s.status in (MOVE, OUT)}
+    incoming = Counter()
+    for s in steps:
+        if s.status == MOVE:
+            incoming[s.target.pk] += s.count
+    for s in steps:
+        if s.status != MOVE or not s.target.capacity:
+            continue
+        after = incoming[s.target.pk] + (0 if s.target.pk in moving else counts.get(s.target.pk, 0))
+        if after > s.target.capacity:
+            s.reason = f"Capacité de {s.target.label} dépassée : {after}/{s.target.capacity}"
+    return steps
+
+
+def plan_mapping(steps):
+    """{id source: id cible | None (sortants)} — classes non résolues exclues."""
+    return {
+        s.source.pk: (s.target.pk if s.target else None)
+        for s in steps if s.status in (MOVE, OUT)
+    }
+
+
+# ——— Application / annulation
+def apply_plan(school, mapping, to_year=None, user=None, strategy="auto"):
+    """
+    mapping : {id classe source: id classe cible | None}. Renvoie le PromotionRun.
+    Toutes les classes sont lues AVANT la mise à jour : une classe à la fois
+    source et cible ne fait pas avancer ses élèves de deux niveaux.
+    """
+    mapping = {int(k): (int(v) if v else None) for k, v in mapping.items()}
+    valid = set(Classroom.objects.filter(school=school).values_list("pk", flat=True))
+    if not set(mapping) <= valid or not {v for v in mapping.values() if v} <= valid:
+        raise ValueError("Classes d'une autre école dans la correspondance.")
+    mapping = {k: v for k, v in mapping.items() if k != v}
+
+    with transaction.atomic():
+        run = PromotionRun.objects.create(school=school, to_year=to_year, strategy=strategy, created_by=user)
+        if not mapping:
+            return run
+
+        already = set()
+        if to_year is not None:
+            already = set(
+                Enrollment.objects.filter(school_year=to_year, student__classroom_id__in=list(mapping))
+                .values_list("student_id", flat=True)
+            )
+
+        moves, enrollments = [], []
+        rows = Student.objects.filter(classroom_id__in=list(mapping)).values_list("pk", "classroom_id")
+        for student_id, classroom_id in rows.iterator(chunk_size=BATCH_SIZE):
+            target = mapping[classroom_id]
+            enrolled = to_year is not None and target is not None and student_id not in already
+            moves.append(PromotionMove(
+                run=run, student_id=student_id,
+                from_classroom_id=classroom_id, to_classroom_id=target, enrolled=enrolled,
+            ))
+            if enrolled:
+                enrollments.append(Enrollment(
+                    student_id=student_id, classroom_id=target,
+                    school_year=to_year, date=to_year.start_date,
+                ))
+        # Classes cibles verrouillées : capacité vérifiée avant toute écriture
+        arrivals = Counter(m.to_classroom_id for m in moves)
+        departures = Counter(m.from_classroom_id for m in moves)
+        ensure_capacity(arrivals, departures)
+        PromotionMove.objects.bulk_create(moves, batch_size=BATCH_SIZE)
+
+        # Un seul UPDATE, limité aux élèves journalisés ; le CASE est évalué
+        # sur la classe d'AVANT la mise à jour
+        journaled = Subquery(run.moves.values("student_id"))
+        Student.objects.filter(pk__in=journaled, classroom_id__in=list(mapping)).update(classroom_id=Case(
+            *[When(classroom_id=src, then=Value(dst)) for src, dst in mapping.items()],
+            output_field=IntegerField(),
+        ))
+        Enrollment.objects.bulk_create(enrollments, batch_size=BATCH_SIZE)
+
+        run.moved = len(moves)
+        run.save(update_fields=["moved"])
+        _refresh(run, arrivals, departures)
+    return run
+
+
+def revert_run(run):
+    """Annule un passage : chaque élève encore dans sa classe cible retrouve sa classe d'origine."""
+    if run.reverted_at is not None:
+        raise ValueError("Ce passage a déjà été annulé.")
+    with transaction.atomic():
+        # Élèves restés dans leur classe cible : seuls ceux-là reviennent
+        still = run.moves.filter(
+            Q(to_classroom__isnull=True, student__classroom__isnull=True)
+            | Q(student__classroom_id=F("to_classroom_id"))
+        )
+        pairs = Counter(still.values_list("from_classroom_id", "to_classroom_id").iterator(chunk_size=BATCH_SIZE))
+        # Classes d'origine verrouillées : des inscriptions ont pu les remplir depuis
+        arrivals, departures = _by_classroom(pairs, 0), _by_classroom(pairs, 1)
+        ensure_capacity(arrivals, departures)
+        if run.to_year_id:
+            # Avant le retour de classe, sinon « still » ne désigne plus personne ;
+            # un élève déplacé à la main depuis garde son inscription
+            Enrollment.objects.filter(
+                school_year_id=run.to_year_id,
+                student_id__in=Subquery(still.filter(enrolled=True).values("student_id")),
+            ).delete()
+        for src, dst in pairs:
+            ids = Subquery(run.moves.filter(from_classroom_id=src, to_classroom_id=dst).values("student_id"))
+            current = {"classroom__isnull": True} if dst is None else {"classroom_id": dst}
+            Student.objects.filter(pk__in=ids, **current).update(classroom_id=src)
+        run.reverted_at = timezone.now()
+        run.save(update_fields=["reverted_at"])
+        _refresh(run, arrivals, departures)
+    return run
+
+
+def _by_classroom(pairs, side):
+    """Counter{(source, cible): n} -> {classe: n} pour side = 0 (source) ou 1 (cible)."""
+    out = Counter()
+    for pair, n in pairs.items():
+        out[pair[side]] += n
+    return out
+
+
+def _refresh(run, arrivals, departures):
+    # queryset.update ne déclenche aucun signal : effectifs (deltas exacts par
+    # classe, None = sans classe) et search_text
+    bump_many(arrivals, departures)
+    reindex_students(Student.objects.filter(pk__in=Subquery(run.moves.values("student_id"))))
@@ -0,0 +1,162 @@
+# students/search.py
+"""
+Recherche plein texte des élèves.
+
+Tout repose sur la colonne dénormalisée `Student.search_text` (nom, prénom,
+matricule, ville, quartier, classe, cycle — en minuscules et sans accents),
+indexée selon le moteur :
+- MySQL  : index FULLTEXT (parser ngram si disponible) ;
+- SQLite : table virtuelle FTS5 synchronisée par triggers (tests / dev) ;
+- autres : simple `LIKE` sur la colonne dénormalisée (sans jointure).
+
+Le backend est choisi d'après `connection.vendor`, ou forcé via
+`settings.STUDENT_SEARCH_BACKEND` (chemin pointé vers une classe).
+"""
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text) -> str:
+    """'Traoré  (5ème A)' -> 'traore 5eme a'"""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", stripped.lower()).strip()
+
+
+def tokenize(query) -> list[str]:
+    return normalize(query).split()
+
+
+class BaseSearchBackend:
+    """Repli portable : un LIKE par mot sur la colonne dénormalisée."""
+
+    def filter(self, queryset, query):
+        """Filtre `queryset` et annote `search_rank` (plus grand = plus pertinent)."""
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        cond = Q()
+        for tok in tokens:
+            cond &= Q(search_text__contains=tok)
+        return queryset.filter(cond).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def install(self, connection):
+        """Crée les structures d'index propres au backend (idempotent)."""
+
+
+class MySQLFulltextBackend(BaseSearchBackend):
+    """MATCH … AGAINST en mode booléen sur l'index FULLTEXT `ft_student_search`."""
+
+    # ngram_token_size par défaut : les mots plus courts ne sont pas indexés
+    min_token_length = 2
+
+    def filter(self, queryset, query):
+        tokens = [t for t in tokenize(query) if len(t) >= self.min_token_length]
+        if not tokens:
+            return super().filter(queryset, query)
+        table = queryset.model._meta.db_table
+        # Chaque mot est obligatoire (+) et cherché comme une phrase de n-grammes
+        expr = " ".join(f'+"{tok}"' for tok in tokens)
+        match = f"MATCH ({table}.search_text) AGAINST (%s IN BOOLEAN MODE)"
+        # MATCH … > 0 dans le WHERE : toujours servi par l'index FULLTEXT
+        return (
+            queryset
+            .annotate(search_rank=RawSQL(match, (expr,), output_field=FloatField()))
+            .filter(search_rank__gt=0)
+        )
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """Table FTS5 « external content » adossée à students_student.search_text."""
+
+    fts_table = "students_student_fts"
+
+    def filter(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return super().filter(queryset, query)
+        table = queryset.model._meta.db_table
+        # Recherche par préfixe sur chaque mot : "tra"* AND "5e"*
+        expr = " AND ".join(f'"{tok}"*' for tok in tokens)
+        fts = self.fts_table
+        return (
+            queryset
+            .filter(pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", (expr,)))
+            # bm25() : plus petit = plus pertinent
+            .annotate(search_rank=RawSQL(
+                f"(SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND rowid = {table}.id)",
+                (expr,), output_field=FloatField(),
+            ))
+        )
+
+    def install(self, connection):
+        # Les triggers disparaissent si Django reconstruit la table (ALTER sous SQLite) :
+        # on les recrée à chaque migrate, puis on reconstruit l'index.
+        if "students_student" not in connection.introspection.table_names():
+            return
+        fts = self.fts_table
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"search_text, content='students_student', content_rowid='id')",
+            f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON students_student BEGIN
+                INSERT INTO {fts}(rowid, search_text) VALUES (new.id, new.search_text);
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON students_student BEGIN
+                INSERT INTO {fts}({fts}, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF search_text ON students_student BEGIN
+                INSERT INTO {fts}({fts}, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+                INSERT INTO {fts}(rowid, search_text) VALUES (new.id, new.search_text);
+            END""",
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ]
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+VENDOR_BACKENDS = {
+    "mysql": MySQLFulltextBackend,
+    "sqlite": SQLiteFTS5Backend,
+}
+
+
+def get_backend(conn=None) -> BaseSearchBackend:
+    path = getattr(settings, "STUDENT_SEARCH_BACKEND", "")
+    if path:
+        return import_string(path)()
+    vendor = (conn or connection).vendor
+    return VENDOR_BACKENDS.get(vendor, BaseSearchBackend)()
+
+
+def search_students(queryset, query):
+    """Point d'entrée unique (liste des élèves, admin) : filtre + annotation `search_rank`."""
+    return get_backend().filter(queryset, query)
+
+
+def reindex_students(queryset, batch_size=500) -> int:
+    """Recalcule `search_text` (ex. après renommage d'une classe ou d'un cycle)."""
+    batch, total = [], 0
+    for student in queryset.select_related("classroom__cycle").iterator(chunk_size=batch_size):
+        text = student.build_search_text()
+        if text != student.search_text:
+            student.search_text = text
+            batch.append(student)
+        if len(batch) >= batch_size:
+            total += len(batch)
+            queryset.model.objects.bulk_update(batch, ["search_text"])
+            batch = []
+    if batch:
+        total += len(batch)
+        queryset.model.objects.bulk_update(batch, ["search_text"])
+    return total
@@ -0,0 +1,120 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from catalog.models import Classroom, Cycle
+from .counters import bump
+from .models import ClassroomHeadcount, Student
+from .photos import delete_thumbnails, process_photo
+from .search import get_backend, reindex_students
+
+
+# ——— Effectifs par classe (ClassroomHeadcount)
+@receiver(post_save, sender=Student)
+def count_student_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:  # loaddata : reconcile_headcounts ensuite
+        return
+    new = instance.classroom_id
+    if created:
+        bump(new, +1)
+    else:
+        old = getattr(instance, "_loaded_classroom_id", new)
+        if old != new:
+            bump(old, -1)
+            bump(new, +1)
+    instance._loaded_classroom_id = new
+
+
+@receiver(post_delete, sender=Student)
+def count_student_deleted(sender, instance, **kwargs):
+    bump(getattr(instance, "_loaded_classroom_id", instance.classroom_id), -1)
+
+
+@receiver(post_save, sender=Classroom)
+def init_classroom_headcount(sender, instance, created, raw=False, **kwargs):
+    # Une ligne par classe, même vide : la liste des effectifs tient en une requête
+    if created and not raw:
+        ClassroomHeadcount.objects.get_or_create(
+            classroom=instance, defaults={"school_id": instance.school_id}
+        )
+    elif not created:
+        ClassroomHeadcount.objects.filter(classroom=instance).exclude(
+            school_id=instance.school_id
+        ).update(school_id=instance.school_id)
+
+
+@receiver(pre_delete, sender=Classroom)
+def release_classroom_headcount(sender, instance, **kwargs):
+    # Student.classroom est SET_NULL (UPDATE en masse, sans signal) :
+    # les élèves rejoignent la ligne « sans classe »
+    total = (
+        ClassroomHeadcount.objects.filter(classroom=instance)
+        .values_list("total", flat=True).first()
+    )
+    bump(None, total or 0)
+
+
+# ——— Photos : original nettoyé + vignettes, à l'upload (cf. students/photos.py)
+@receiver(post_save, sender=Student)
+def process_student_photo(sender, instance, raw=False, **kwargs):
+    if raw:  # loaddata : manage.py build_thumbnails ensuite
+        return
+    old = getattr(instance, "_loaded_photo", "")
+    new = instance.photo.name or ""
+    if new == old:
+        return
+    if old:
+        delete_thumbnails(instance.photo.storage, old)
+    if new:
+        name = process_photo(instance.photo)
+        if name != new:
+            Student.objects.filter(pk=instance.pk).update(photo=name)
+            instance.photo.name = name
+    instance._loaded_photo = instance.photo.name or ""
+
+
+@receiver(post_delete, sender=Student)
+def delete_student_thumbnails(sender, instance, **kwargs):
+    if instance.photo:
+        delete_thumbnails(instance.photo.storage, instance.photo.name)
+
+
+# ——— search_text reprend le libellé de la classe et le nom du cycle :
+# réindexation seulement si l'un d'eux change réellement (pas à chaque save)
+def _indexed_fields_changed(sender, instance, fields, update_fields):
+    if instance.pk is None or (update_fields is not None and not set(fields) & set(update_fields)):
+        return False
+    attnames = [sender._meta.get_field(f).attname for f in fields]
+    old = sender.objects.filter(pk=instance.pk).order_by().values_list(*attnames).first()
+    return old is not None and old != tuple(getattr(instance, a) for a in attnames)
+
+
+@receiver(pre_save, sender=Classroom)
+def snapshot_classroom_label(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._reindex_students = not raw and _indexed_fields_changed(
+        sender, instance, ("label", "cycle"), update_fields
+    )
+
+
+@receiver(pre_save, sender=Cycle)
+def snapshot_cycle_name(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._reindex_students = not raw and _indexed_fields_changed(sender, instance, ("name",), update_fields)
+
+
+@receiver(post_save, sender=Classroom)
+def reindex_classroom_students(sender, instance, created, **kwargs):
+    if not created and getattr(instance, "_reindex_students", False):
+        reindex_students(Student.objects.filter(classroom=instance))
+
+
+@receiver(post_save, sender=Cycle)
+def reindex_cycle_students(sender, instance, created, **kwargs):
+    if not created and getattr(instance, "_reindex_students", False):
+        reindex_students(Student.objects.filter(classroom__cycle=instance))
+
+
+def install_search_index(sender, using="default", **kwargs):
+    """post_migrate : (re)crée l'index plein texte propre au moteur (FTS5 sous SQLite)."""
+    from django.db import connections
+
+    connection = connections[using]
+    get_backend(connection).install(connection)
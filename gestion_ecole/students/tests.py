@@ -1,3 +1,779 @@
-from django.test import TestCase
+import io
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.template import Context, Template
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.models import Classroom, Cycle, School, SchoolYear
+from core import active_context
+from core.pdf import render_many
+from core.testing import QueryBudgetMixin
+from .bulletins import class_bulletins_pdf, class_bulletins_zip
+from .capacity import ClassroomFull, ensure_capacity
+from .counters import bump, reconcile
+from .enrollments import enroll, reenroll
+from .export import iter_export_rows
+from .forms import StudentEnrollForm
+from .importer import RowError, StudentImporter, _assign_created_pks, iter_csv, iter_rows
+from .models import ClassroomHeadcount, Enrollment, PromotionRun, Student
+from .photos import thumbnail_name, thumbnail_names
+from .promotion import apply_plan, build_plan, plan_mapping, revert_run
+from .search import normalize, search_students
+
+
+class StudentPagesQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        school = School.objects.create(name="École A")
+        cycle = Cycle.objects.create(name="Fondamental (1er Cycle)")
+        classrooms = [
+            Classroom.objects.create(school=school, cycle=cycle, label=f"{i}ème Année", capacity=0)
+            for i in range(1, 5)
+        ]
+        for i in range(40):
+            Student.objects.create(last_name=f"Nom{i}", first_name=f"Prénom{i}", classroom=classrooms[i % 4])
+        cls.user = get_user_model().objects.create_superuser("direction", "d@ecole.test", "x")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_student_list(self):
+        self.assertQueryBudget("student_list", budget=3)  # sans recherche : pagination keyset, pas de COUNT
+
+    def test_student_list_search(self):
+        # recherche : un COUNT en plus (pagination numérotée)
+        self.assertQueryBudget("student_list", data={"q": "Nom1"})
+
+    def test_student_stats(self):
+        self.assertQueryBudget("student_stats")
+
+
+class HeadcountTests(TestCase):
+    def test_decrement_stops_at_zero_after_drift(self):
+        classroom = Classroom.objects.create(school=School.objects.create(name="École A"), label="CP")
+        student = Student.objects.create(last_name="Nom", first_name="X", classroom=classroom)
+        ClassroomHeadcount.objects.filter(classroom=classroom).update(total=0)  # dérive
+        student.delete()  # signal post_delete : -1 sur une ligne à 0
+        self.assertEqual(ClassroomHeadcount.objects.get(classroom=classroom).total, 0)
+
+    def test_single_unassigned_row(self):
+        bump(None, 2)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ClassroomHeadcount.objects.create(classroom=None, total=1)
+        bump(None, -5)
+        self.assertEqual(ClassroomHeadcount.objects.get(classroom=None).total, 0)
+
+    def test_reconcile_recreates_unassigned_row(self):
+        Student.objects.create(last_name="Nom", first_name="X")
+        ClassroomHeadcount.objects.all().delete()
+        reconcile()  # bulk_create : sans save(), `unassigned` posé par reconcile
+        row = ClassroomHeadcount.objects.get(classroom=None)
+        self.assertEqual((row.total, row.unassigned), (1, True))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ClassroomHeadcount.objects.create(classroom=None)
+
+
+class StudentImporterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = School.objects.create(name="École A")
+        cls.classroom = Classroom.objects.create(school=cls.school, label="CP", capacity=0)
+        Student.objects.create(last_name="Ancien", first_name="A", matricule="ab-12")
+        cls.user = get_user_model().objects.create_superuser("direction", "d@ecole.test", "x")
+
+    def run_csv(self, text):
+        return StudentImporter(school=self.school).run(iter_csv(io.BytesIO(text.encode())))
+
+    def test_row_errors_and_matricule_normalisation(self):
+        ClassroomHeadcount.objects.filter(classroom=None).update(total=7)  # dérive : pas de recalcul global
+        report = self.run_csv(
+            "matricule;nom;prenom;classe;ville\n"
+            "AB-12;Ancien;Modifié;CP;\n"                      # même matricule, autre casse : mise à jour
+            f"N1;{'x' * 101};Trop;CP;\n"                       # nom > 100 caractères
+            "N2;Nouveau;B;Inconnue;\n"                         # classe inconnue
+            "n3;Nouveau;C;CP;Bamako\n"
+            "N3;Doublon;D;CP;\n"                               # doublon (casse) dans le fichier
+        )
+        self.assertEqual((report.created, report.updated, report.error_count), (1, 1, 3))
+        self.assertEqual(ClassroomHeadcount.objects.get(classroom=self.classroom).total, 2)  # n3 + Ancien
+        self.assertEqual(ClassroomHeadcount.objects.get(classroom=None).total, 6)  # Ancien parti, dérive gardée
+        self.assertEqual([line for line, _ in report.errors], [3, 4, 6])
+        self.assertIn("trop long", report.errors[0][1])
+        self.assertEqual(Student.objects.get(last_name="Ancien").first_name, "Modifié")
+
+    def test_numeric_xlsx_cells(self):
+        rows = [(1, {"matricule": 12345.0, "last_name": "Num", "first_name": "X", "parent_phone": 76001122.0})]
+        StudentImporter(school=self.school).run(rows)
+        student = Student.objects.get(last_name="Num")
+        self.assertEqual((student.matricule, student.parent_phone), ("12345", "76001122"))
+
+    def test_unreadable_files_are_reported(self):
+        self.client.force_login(self.user)
+        active_context.clear_cache()
+        self.client.get(reverse("switch_school", args=[self.school.pk]))
+        for name, content in (
+            ("eleves.xlsx", b"pas un classeur"),                             # zipfile.BadZipFile
+            ("eleves.csv", b'nom;prenom\n"' + b"x" * 200_000 + b'";X\n'),  # csv.Error (champ trop long)
+        ):
+            response = self.client.post(reverse("student_import"), {"file": SimpleUploadedFile(name, content)})
+            self.assertContains(response, "Fichier illisible")
+
+    def test_other_schools_are_left_alone(self):
+        other = School.objects.create(name="École B")
+        cp_b = Classroom.objects.create(school=other, label="CP")
+        Student.objects.create(last_name="Autre", first_name="B", matricule="B-01", classroom=cp_b)
+        report = self.run_csv("matricule;nom;prenom;classe\nB-01;Autre;Déplacé;CP\n")
+        self.assertEqual((report.updated, report.errors), (0, [(2, "Matricule B-01 : élève d'une autre école.")]))
+        self.assertEqual(Student.objects.get(matricule="B-01").classroom, cp_b)
+
+        # sans école : « CP » existe dans les deux écoles
+        report = StudentImporter().run(iter_csv(io.BytesIO("nom;prenom;classe\nNeuf;X;cp\n".encode())))
+        self.assertEqual(report.created, 0)
+        self.assertIn("plusieurs écoles", report.errors[0][1])
+
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile("eleves.csv", "nom;prenom;classe\nNeuf;X;CP\n".encode())
+        self.assertContains(self.client.post(reverse("student_import"), {"file": upload}), "Aucune école active")
+        self.assertFalse(Student.objects.filter(last_name="Neuf").exists())
+
+    def test_missing_headers_and_incomplete_xlsx(self):
+        with self.assertRaisesMessage(RowError, "En-têtes manquants"):
+            self.run_csv("ville;classe\nBamako;CP\n")
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("autre.txt", "archive sans classeur")
+        with self.assertRaisesMessage(RowError, "Classeur XLSX incomplet"):
+            list(iter_rows(io.BytesIO(buf.getvalue()), "eleves.xlsx"))
+
+    def test_only_imported_students_are_enrolled(self):
+        year = SchoolYear.objects.create(
+            school=self.school, label="2025-2026", start_date=date(2025, 10, 1), end_date=date(2026, 6, 30)
+        )
+        ce1 = Classroom.objects.create(school=self.school, label="CE1")
+        ancien = Student.objects.get(matricule="ab-12")
+        enroll(ancien, year, classroom=ce1)
+        Student.objects.create(last_name="Hors", first_name="Fichier", classroom=ce1)  # non inscrit, hors import
+        out = io.StringIO()
+        with tempfile.NamedTemporaryFile("wb", suffix=".csv") as fh:
+            fh.write("matricule;nom;prenom;classe\nAB-12;Ancien;A;CP\nN1;Nouveau;B;CE1\n".encode())
+            fh.flush()
+            call_command("import_students", fh.name, school=self.school.pk, stdout=out)
+        self.assertIn("2025-2026 : 1 inscription(s) créée(s), 1 réaffectée(s)", out.getvalue())
+        self.assertEqual(
+            set(Enrollment.objects.filter(school_year=year).values_list("student__last_name", "classroom")),
+            {("Ancien", self.classroom.pk), ("Nouveau", ce1.pk)},  # « Hors » non inscrit
+        )
+
+    def test_created_pks_read_back_without_returning(self):
+        last_pk = Student.objects.order_by("-pk").values_list("pk", flat=True).first()
+        students = [Student(last_name="Même", first_name="Nom") for _ in range(2)]
+        Student.objects.bulk_create(students)
+        expected = [s.pk for s in students]
+        for student in students:
+            student.pk = None  # bulk_create sous MySQL
+        _assign_created_pks(students, last_pk)
+        self.assertEqual([s.pk for s in students], expected)
+
+    def test_xlsx_upload_enrolls_into_active_year(self):
+        from openpyxl import Workbook
+
+        year = SchoolYear.objects.create(
+            school=self.school, label="2025-2026", start_date=date(2025, 10, 1), end_date=date(2026, 6, 30)
+        )
+        wb = Workbook()
+        wb.active.append(["Nom", "Prénom", "Classe", "Matricule"])
+        wb.active.append(["Koné", "Issa", "CP", 2025001])
+        wb.active.append(["Diarra", "Mariam", "cp", None])
+        buf = io.BytesIO()
+        wb.save(buf)
+        active_context.clear_cache()
+        self.client.force_login(self.user)
+        self.client.get(reverse("switch_schoolyear", args=[year.pk]))
+
+        upload = SimpleUploadedFile("eleves.xlsx", buf.getvalue())
+        self.client.post(reverse("student_import"), {"file": upload, "dry_run": "1"})
+        self.assertFalse(Student.objects.filter(last_name="Koné").exists())  # simulation : rien d'écrit
+
+        upload = SimpleUploadedFile("eleves.xlsx", buf.getvalue())
+        response = self.client.post(reverse("student_import"), {"file": upload})
+        self.assertEqual((response.context["report"].created, response.context["report"].error_count), (2, 0))
+        self.assertEqual(Student.objects.get(last_name="Koné").matricule, "2025001")
+        self.assertEqual(
+            set(Enrollment.objects.filter(school_year=year).values_list("student__last_name", "classroom")),
+            {("Koné", self.classroom.pk), ("Diarra", self.classroom.pk)},
+        )
+
+
+class EnrollmentTests(TestCase):
+    def test_one_enrollment_per_student_and_year(self):
+        school = School.objects.create(name="École A")
+        year = SchoolYear.objects.create(
+            school=school, label="2025-2026", start_date=date(2025, 10, 1), end_date=date(2026, 6, 30)
+        )
+        cp, ce1 = (Classroom.objects.create(school=school, label=label) for label in ("CP", "CE1"))
+        student = Student.objects.create(last_name="Nom", first_name="X", classroom=cp)
+        enroll(student, year)
+        enroll(student, year, classroom=ce1)  # réaffectation : même ligne
+        self.assertEqual(Enrollment.objects.get(student=student).classroom, ce1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Enrollment.objects.create(student=student, classroom=cp, school_year=year)
+
+    def test_reenroll_moves_headcounts_of_the_moved_classrooms_only(self):
+        school = School.objects.create(name="École A")
+        years = [
+            SchoolYear.objects.create(school=school, label=label, start_date=date(y, 10, 1), end_date=date(y + 1, 6, 30))
+            for label, y in (("2025-2026", 2025), ("2026-2027", 2026))
+        ]
+        cp, ce1, other = (Classroom.objects.create(school=school, label=label) for label in ("CP", "CE1", "CM2"))
+        for i in range(3):
+            enroll(Student.objects.create(last_name=f"Nom{i}", first_name="X", classroom=cp), years[0])
+        ClassroomHeadcount.objects.filter(classroom=other).update(total=42)  # dérive hors réinscription
+        self.assertEqual(reenroll(years[0], years[1], classroom_map={cp.pk: ce1.pk}), (3, 0))
+        totals = dict(ClassroomHeadcount.objects.filter(school=school).values_list("classroom__label", "total"))
+        self.assertEqual(totals, {"CP": 0, "CE1": 3, "CM2": 42})
+        self.assertIn("ce1", Student.objects.get(last_name="Nom0").search_text)
+
+    def test_reenroll_rejects_targets_of_another_school(self):
+        school, other_school = School.objects.create(name="École A"), School.objects.create(name="École B")
+        years = [
+            SchoolYear.objects.create(school=school, label=label, start_date=date(y, 10, 1), end_date=date(y + 1, 6, 30))
+            for label, y in (("2025-2026", 2025), ("2026-2027", 2026))
+        ]
+        cp = Classroom.objects.create(school=school, label="CP")
+        foreign = Classroom.objects.create(school=other_school, label="CE1")
+        enroll(Student.objects.create(last_name="Nom", first_name="X", classroom=cp), years[0])
+        with self.assertRaises(ValueError):
+            reenroll(years[0], years[1], classroom_map={cp.pk: foreign.pk})
+        self.assertFalse(Enrollment.objects.filter(school_year=years[1]).exists())
+
+
+class CapacityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = School.objects.create(name="École A")
+        cls.full = Classroom.objects.create(school=cls.school, label="CP", capacity=1)
+        cls.free = Classroom.objects.create(school=cls.school, label="CE1", capacity=5)
+        cls.pupil = Student.objects.create(last_name="Premier", first_name="A", classroom=cls.full)
+        cls.user = get_user_model().objects.create_superuser("direction", "d@ecole.test", "x")
+
+    def test_admin_rejects_full_classroom(self):
+        self.client.force_login(self.user)
+        data = {"last_name": "Second", "first_name": "B", "classroom": self.full.pk}
+        response = self.client.post(reverse("admin:students_student_add"), data)
+        self.assertContains(response, "Capacité dépassée")
+        self.assertEqual(Student.objects.filter(classroom=self.full).count(), 1)
+
+        data["classroom"] = self.free.pk
+        response = self.client.post(reverse("admin:students_student_add"), data)
+        self.assertEqual(response.status_code, 302)
+        # modifier l'élève déjà dans la classe pleine ne compte pas comme une arrivée
+        url = reverse("admin:students_student_change", args=[self.pupil.pk])
+        response = self.client.post(url, {"last_name": "Premier", "first_name": "AA", "classroom": self.full.pk})
+        self.assertEqual(response.status_code, 302)
+
+    def test_import_rejects_rows_beyond_capacity(self):
+        rows = [(i, {"last_name": f"Nom{i}", "first_name": "X", "classroom_id": str(self.free.pk)}) for i in range(1, 8)]
+        report = StudentImporter(school=self.school).run(rows)
+        self.assertEqual((report.created, report.error_count), (5, 2))
+        self.assertIn("complète", report.errors[0][1])
+
+    def test_enroll_view_rejects_full_classroom(self):
+        self.client.force_login(self.user)
+        data = {
+            "last_name": "Second", "first_name": "B", "birth_date": "2018-01-01", "city": "Bamako",
+            "district": "Lafiabougou", "gender": "F", "classroom": self.full.pk,
+        }
+        response = self.client.post(reverse("student_enroll_new"), data)
+        self.assertContains(response, "Capacité dépassée : CP (2/1).")
+        self.assertFalse(Student.objects.filter(last_name="Second").exists())
+
+    def test_ensure_capacity(self):
+        unlimited = Classroom.objects.create(school=self.school, label="CE2", capacity=0)
+        with transaction.atomic():
+            ensure_capacity({self.free.pk: 5, unlimited.pk: 1000})
+            ensure_capacity({self.full.pk: 1}, {self.full.pk: 1})  # un départ libère la place
+            with self.assertRaises(ClassroomFull) as ctx:
+                ensure_capacity({self.full.pk: 1, self.free.pk: 6})
+        self.assertEqual([(c.label, after) for c, _, after in ctx.exception.overflows], [("CP", 2), ("CE1", 6)])
+
+    def test_reenroll_into_full_classroom_writes_nothing(self):
+        years = [
+            SchoolYear.objects.create(
+                school=self.school, label=label, start_date=date(y, 10, 1), end_date=date(y + 1, 6, 30)
+            )
+            for label, y in (("2025-2026", 2025), ("2026-2027", 2026))
+        ]
+        for i in range(2):
+            enroll(Student.objects.create(last_name=f"Nom{i}", first_name="X", classroom=self.free), years[0])
+        with self.assertRaises(ClassroomFull):
+            reenroll(years[0], years[1], classroom_map={self.free.pk: self.full.pk})
+        self.assertFalse(Enrollment.objects.filter(school_year=years[1]).exists())
+        self.assertEqual(Student.objects.filter(classroom=self.free).count(), 2)
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        school = School.objects.create(name="École A")
+        cls.cycle = Cycle.objects.create(name="Primaire")
+        cls.classroom = Classroom.objects.create(school=school, label="CM1", cycle=cls.cycle)
+        cls.awa = Student.objects.create(
+            last_name="Traoré", first_name="Awa", classroom=cls.classroom, city="Bamako", district="Hippodrome",
+        )
+        Student.objects.create(last_name="Diallo", first_name="Issa", classroom=cls.classroom, city="Ségou")
+        cls.user = get_user_model().objects.create_superuser("direction", "d@ecole.test", "x")
+
+    def test_admin_searches_city_and_district(self):
+        self.client.force_login(self.user)
+        url = reverse("admin:students_student_changelist")
+        self.assertContains(self.client.get(url, {"q": "hippodrome"}), "Awa")
+        response = self.client.get(url, {"q": "Ségou"})
+        self.assertContains(response, "Issa")
+        self.assertNotContains(response, "Awa")
+        self.assertContains(self.client.get(url, {"q": "traore"}), "Awa")  # index plein texte
+        Student.objects.filter(pk=self.awa.pk).update(parent_phone="76 00 11 22")
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {"q": "76 00 1"})  # préfixe du numéro
+        self.assertContains(response, "Awa")
+        self.assertNotContains(response, "Issa")
+        self.assertFalse([q for q in ctx.captured_queries if "LIKE '%" in q["sql"] or "LIKE %" in q["sql"]])
+
+    def test_accent_folding_prefix_and_ranking(self):
+        self.assertEqual(normalize("Traoré  (5ème A)"), "traore 5eme a")
+        double = Student.objects.create(last_name="Koné", first_name="Koné", classroom=self.classroom)
+        Student.objects.create(last_name="Koné", first_name="Issa", classroom=self.classroom)
+        self.assertEqual(list(search_students(Student.objects.all(), "TRAORÉ cm1")), [self.awa])
+        self.assertEqual(list(search_students(Student.objects.all(), "tra")), [self.awa])  # préfixe
+        ranked = search_students(Student.objects.all(), "kone").order_by("-search_rank", "id")
+        self.assertEqual(ranked.count(), 2)
+        self.assertEqual(ranked[0], double)  # le mot deux fois : plus pertinent
+
+        self.client.force_login(self.user)
+        items = self.client.get(reverse("student_list"), {"q": "kone"}).context["items"]
+        self.assertEqual(items[0], double)  # liste triée par pertinence
+
+    @override_settings(STUDENT_SEARCH_BACKEND="students.search.BaseSearchBackend")
+    def test_like_fallback(self):
+        self.assertEqual(list(search_students(Student.objects.all(), "raoré primaire")), [self.awa])
+        self.assertEqual(search_students(Student.objects.all(), "  ").count(), 2)  # pas de mot : pas de filtre
+
+    def test_reindex_only_when_label_or_cycle_changes(self):
+        self.classroom.main_teacher = self.user
+        with CaptureQueriesContext(connection) as ctx:
+            self.classroom.save()
+            self.classroom.save(update_fields=["main_teacher"])
+        self.assertFalse([q for q in ctx.captured_queries if "students_student" in q["sql"]])  # pas de réindexation
+        self.classroom.label = "CM1 bis"
+        self.classroom.save()
+        self.awa.refresh_from_db()
+        self.assertIn("cm1 bis", self.awa.search_text)
+        self.cycle.name = "Élémentaire"
+        self.cycle.save()
+        self.awa.refresh_from_db()
+        self.assertIn("elementaire", self.awa.search_text)
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        classroom = Classroom.objects.create(school=School.objects.create(name="École A"), label="CM1")
+        for i in range(7):  # homonymes : l'id départage
+            Student.objects.create(last_name="Traoré" if i < 4 else f"Nom{i}", first_name="Awa", classroom=classroom)
+        cls.user = get_user_model().objects.create_superuser("direction", "d@ecole.test", "x")
+
+    def test_cursor_walks_every_row_once(self):
+        self.client.force_login(self.user)
+        url, seen, params = reverse("student_list"), [], {"partial": "1", "per": "3"}
+        while True:
+            response = self.client.get(url, params)
+            seen += [s.pk for s in response.context["items"]]
+            cursor = response.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params["after"] = cursor
+        expected = list(Student.objects.order_by("last_name", "first_name", "id").values_list("pk", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_restarts_and_page_mode_still_works(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("student_list"), {"after": "pas-un-jeton", "per": "5"})
+        self.assertEqual(len(response.context["items"]), 5)
+        response = self.client.get(reverse("student_list"), {"page": "2", "per": "5"})
+        self.assertEqual(len(response.context["items"]), 2)
+        self.assertNotIn("X-Next-Page", response)
+
+
+class MatriculeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i, m in enumerate(["GS25_A01", "GS25_A010", "GS25_A02", "GS24_B01"]):
+            Student.objects.create(last_name=f"Nom{i}", first_name="X", matricule=m)
+        cls.user = get_user_model().objects.create_superuser("direction", "d@ecole.test", "x")
+
+    def test_lookup_exact_then_prefix(self):
+        self.client.force_login(self.user)
+        url = reverse("student_matricule_lookup")
+        data = self.client.get(url, {"m": "GS25_A01"}).json()
+        self.assertEqual((data["exact"], [r["matricule"] for r in data["results"]]), (True, ["GS25_A01"]))
+        data = self.client.get(url, {"m": "gs25_a"}).json()
+        self.assertFalse(data["exact"])
+        self.assertEqual([r["matricule"] for r in data["results"]], ["GS25_A01", "GS25_A010", "GS25_A02"])
+        self.assertEqual(self.client.get(url, {"m": " "}).json()["results"], [])
+
+    def test_duplicates_report(self):
+        out = io.StringIO()
+        call_command("matricule_duplicates", "--fail", stdout=out)
+        self.assertIn("Aucun matricule en double", out.getvalue())
+        # index simple : un doublon historique s'enregistre, il est signalé par le rapport
+        twin = Student.objects.create(last_name="Double", first_name="X", matricule="GS24_B01")
+        with self.assertRaisesMessage(CommandError, "1 matricule(s) en double (2 élèves)"):
+            call_command("matricule_duplicates", "--fail", stdout=out)
+        self.assertIn("'GS24_B01' ×2 : ", out.getvalue())
+        self.assertIn(f"#{twin.pk} Double X", out.getvalue())
+
+    def test_enroll_form_refuses_taken_matricule(self):
+        data = {
+            "last_name": "Nouveau", "first_name": "X", "birth_date": "2015-01-01", "city": "Bamako",
+            "district": "Badalabougou", "gender": "M", "matricule": " GS25_A02 ",
+        }
+        form = StudentEnrollForm(data)
+        self.assertFalse(form.is_valid())
+        self.assertIn("matricule", form.errors)
+        form = StudentEnrollForm({**data, "matricule": ""})
+        self.assertTrue(form.is_valid())
+        self.assertIsNone(form.cleaned_data["matricule"])  # NULL, pas '' : hors index unique
+
+
+class MatriculeUniqueIndexTests(TransactionTestCase):
+    """DDL (index recréé) : hors transaction de test, index simple rétabli à la fin."""
+
+    def index_is_unique(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Student._meta.db_table)
+        return constraints["idx_student_matricule"]["unique"]
+
+    def tearDown(self):
+        if self.index_is_unique():
+            with connection.schema_editor() as editor:
+                editor.execute(editor._delete_index_sql(Student, "idx_student_matricule"))
+                editor.add_index(Student, next(i for i in Student._meta.indexes if i.name == "idx_student_matricule"))
+
+    def test_make_unique_once_duplicates_are_gone(self):
+        Student.objects.create(last_name="Un", first_name="X", matricule="GS25_A01")
+        twin = Student.objects.create(last_name="Deux", first_name="X", matricule="GS25_A01")
+        out = io.StringIO()
+        call_command("matricule_duplicates", "--make-unique", stdout=out)
+        self.assertFalse(self.index_is_unique())  # doublon restant : rien n'est fait
+
+        twin.matricule = "GS25_A02"
+        twin.save()
+        call_command("matricule_duplicates", "--make-unique", stdout=out)
+        self.assertTrue(self.index_is_unique())
+        self.assertIn("recréé en UNIQUE", out.getvalue())
+        with self.assertRaises(IntegrityError):
+            Student.objects.create(last_name="Trois", first_name="X", matricule="GS25_A02")
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        classroom = Classroom.objects.create(school=School.objects.create(name="École A"), label="CM1")
+        for i in range(5):
+            Student.objects.create(
+                last_name="Traoré" if i < 3 else f"Nom{i}", first_name=f"P{i}", gender="F",
+                birth_date=date(2015, 1, i + 1), classroom=classroom,
+            )
+        cls.user = get_user_model().objects.create_superuser("direction", "d@ecole.test", "x")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_csv_applies_search_filter(self):
+        response = self.client.get(reverse("student_export"), {"format": "csv", "q": "traore"})
+        lines = b"".join(response.streaming_content).decode("utf-8").lstrip("\ufeff").splitlines()
+        self.assertEqual(lines[0].split(";")[:3], ["Matricule", "Nom", "Prénom"])
+        self.assertEqual([line.split(";")[2] for line in lines[1:]], ["P0", "P1", "P2"])
+        self.assertIn(";Féminin;01/01/2015;CM1;", lines[1])
+
+    def test_rows_span_batches(self):
+        rows = list(iter_export_rows(Student.objects.all(), batch_size=2))
+        self.assertEqual([r[2] for r in rows], ["P3", "P4", "P0", "P1", "P2"])  # Nom3, Nom4, Traoré…
+
+    def test_xlsx(self):
+        from openpyxl import load_workbook
+
+        response = self.client.get(reverse("student_export"), {"format": "xlsx"})
+        ws = load_workbook(io.BytesIO(b"".join(response.streaming_content)), read_only=True)["Élèves"]
+        self.assertEqual(len(list(ws.values)), 6)  # en-tête + 5 élèves
+
+
+def tiny_pdf(html, css_paths=(), base_url=None):
+    """Remplace core.pdf.render_pdf (WeasyPrint) : un PDF d'une page blanche."""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def page_count(data):
+    from pypdf import PdfReader
+
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+
+@override_settings(PDF_WORKERS=1)
+@mock.patch("core.pdf.render_pdf", side_effect=tiny_pdf)
+class BulletinTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = School.objects.create(name="École A")
+        cls.year = SchoolYear.objects.create(
+            school=cls.school, label="2025-2026", start_date=date(2025, 10, 1), end_date=date(2026, 6, 30)
+        )
+        cls.cm1 = Classroom.objects.create(school=cls.school, label="CM1")
+        cls.cm2 = Classroom.objects.create(school=cls.school, label="CM2")
+        for name in ("Traoré", "Coulibaly", "Diarra"):
+            enroll(Student.objects.create(last_name=name, first_name="X", classroom=cls.cm1), cls.year)
+        enroll(Student.objects.create(last_name="Keïta", first_name="X", classroom=cls.cm2), cls.year)
+        Student.objects.create(last_name="Sans", first_name="Inscription", classroom=cls.cm1)
+
+    def test_merged_pdf_and_zip(self, render):
+        self.assertEqual(page_count(class_bulletins_pdf(self.cm1, self.year)), 3)  # inscrits de l'année
+        self.assertEqual(page_count(class_bulletins_pdf(self.cm1, None)), 4)  # classe courante
+        with zipfile.ZipFile(io.BytesIO(class_bulletins_zip(self.cm1, self.year))) as zf:
+            names = zf.namelist()
+        self.assertEqual(len(names), 3)
+        self.assertTrue(names[0].startswith("coulibaly_x_"))  # ordre alphabétique
+
+    def test_pool_fan_out_keeps_order(self, render):
+        render.side_effect = lambda html, *args: html.encode()
+        items = [(i, f"<p>{i}</p>") for i in range(10)]
+        with mock.patch("core.pdf._new_pool", side_effect=ThreadPoolExecutor) as new_pool:
+            self.assertEqual(list(render_many(items, workers=3)), [(i, f"<p>{i}</p>".encode()) for i in range(10)])
+        new_pool.assert_called_once_with(3)
+        self.assertEqual(render.call_count, 10)
+
+    def test_command(self, render):
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as tmp:
+            call_command("generate_bulletins", year=self.year.pk, out=tmp, format="zip", stdout=out)
+            with zipfile.ZipFile(Path(tmp) / "bulletins_cm1_2025-2026.zip") as zf:
+                self.assertEqual(len(zf.namelist()), 3)
+            call_command("generate_bulletins", year=self.year.pk, classroom=[self.cm2.pk], out=tmp, stdout=out)
+            self.assertEqual(page_count((Path(tmp) / "bulletins_cm2_2025-2026.pdf").read_bytes()), 1)
+        output = out.getvalue()
+        self.assertIn("bulletins_cm1_2025-2026.zip (3 élève(s))", output)
+        self.assertIn("4 bulletin(s) générés", output)
+        self.assertIn("1 bulletin(s) générés", output)
+        with self.assertRaisesMessage(CommandError, "introuvable"):
+            call_command("generate_bulletins", year=0, stdout=out)
+
+    def test_view_stays_within_the_active_school(self, render):
+        self.client.force_login(get_user_model().objects.create_superuser("direction", "d@ecole.test", "x"))
+        active_context.clear_cache()
+        self.client.get(reverse("switch_schoolyear", args=[self.year.pk]))
+        response = self.client.get(reverse("class_bulletins", args=[self.cm1.pk]))
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(page_count(response.content), 3)
+        response = self.client.get(reverse("class_bulletins", args=[self.cm1.pk]), {"format": "zip"})
+        self.assertIn('filename="bulletins_cm1_2025-2026.zip"', response["Content-Disposition"])
+
+        other = School.objects.create(name="École B")
+        other_year = SchoolYear.objects.create(
+            school=other, label="2025-2026", start_date=date(2025, 10, 1), end_date=date(2026, 6, 30)
+        )
+        foreign = Classroom.objects.create(school=other, label="CM1")
+        self.assertEqual(self.client.get(reverse("class_bulletins", args=[foreign.pk])).status_code, 404)
+        response = self.client.get(reverse("class_bulletins", args=[self.cm1.pk]), {"year": other_year.pk})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(STORAGES={
+    "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+})
+class PhotoTests(TestCase):
+    def upload(self):
+        from PIL import Image
+
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation : pivoter de 90°
+        exif[0x010F] = "Appareil"
+        buf = io.BytesIO()
+        Image.new("RGB", (2000, 1000), "red").save(buf, "JPEG", exif=exif)
+        return SimpleUploadedFile("awa.jpg", buf.getvalue(), content_type="image/jpeg")
+
+    def test_upload_strips_exif_and_builds_thumbnails(self):
+        from PIL import Image
+
+        student = Student.objects.create(last_name="Traoré", first_name="Awa", gender="F", photo=self.upload())
+        storage, name = student.photo.storage, student.photo.name
+        with storage.open(name) as fh:
+            original = Image.open(fh)
+            self.assertEqual(original.size, (512, 1024))  # réorienté puis réduit
+            self.assertFalse(original.getexif())
+        self.assertTrue(all(storage.exists(thumb) for thumb in thumbnail_names(name)))
+
+        html = Template('{% load core_extras %}{% student_photo s 64 %}').render(Context({"s": student}))
+        self.assertIn(storage.url(thumbnail_name(name, 64, "webp")) + " 1x", html)
+        self.assertIn(storage.url(thumbnail_name(name, 128, "jpg")) + " 2x", html)
+        self.assertIn('loading="lazy"', html)
+        self.assertNotIn(f'"{storage.url(name)}"', html)  # jamais l'original
+
+        student.notes = "sans changement de photo"
+        with mock.patch("students.signals.process_photo") as process:
+            student.save()
+        process.assert_not_called()
+        student.delete()
+        self.assertFalse(any(storage.exists(thumb) for thumb in thumbnail_names(name)))
+
+    def test_default_avatar_without_photo(self):
+        student = Student(last_name="Koné", first_name="Issa", gender="M")
+        html = Template('{% load core_extras %}{% student_photo s 64 %}').render(Context({"s": student}))
+        self.assertIn("profil_garcon_defaut.jpeg", html)
+
+
+class PromotionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = School.objects.create(name="École A")
+        cls.next_year = SchoolYear.objects.create(
+            school=cls.school, label="2026-2027", start_date=date(2026, 10, 1), end_date=date(2027, 6, 30)
+        )
+        cycle = Cycle.objects.create(name="Fondamental (1er Cycle)")
+        cls.rooms = {
+            label: Classroom.objects.create(school=cls.school, label=label, cycle=cycle)
+            for label in ("5ème Année A", "6ème Année A", "7ème Année A", "9ème Année A", "Atelier")
+        }
+        cls.students = {}
+        for name, label in (("Awa", "5ème Année A"), ("Issa", "5ème Année A"), ("Mariam", "6ème Année A"),
+                            ("Oumar", "9ème Année A"), ("Sira", "Atelier")):
+            cls.students[name] = Student.objects.create(last_name=name, first_name="X", classroom=cls.rooms[label])
+
+    def classroom_of(self, name):
+        return Student.objects.get(pk=self.students[name].pk).classroom
+
+    def test_plan(self):
+        steps = {s.source.label: s for s in build_plan(self.school)}
+        self.assertEqual((steps["5ème Année A"].status, steps["5ème Année A"].target), ("move", self.rooms["6ème Année A"]))
+        self.assertEqual(steps["5ème Année A"].count, 2)
+        self.assertEqual(steps["9ème Année A"].status, "out")  # fin de filière
+        self.assertEqual(steps["Atelier"].status, "unresolved")
+        self.assertIn("8ème Année A", steps["7ème Année A"].reason)  # cible manquante
+
+    def test_apply_then_revert(self):
+        # dérive d'une classe non concernée : ni lue ni réécrite (pas de recalcul global)
+        ClassroomHeadcount.objects.filter(classroom=self.rooms["Atelier"]).update(total=99)
+        mapping = plan_mapping(build_plan(self.school))
+        run = apply_plan(self.school, mapping, to_year=self.next_year)
+        self.assertEqual(run.moved, 4)
+        # un seul niveau d'avance, même quand la cible est elle-même une source
+        self.assertEqual(self.classroom_of("Awa"), self.rooms["6ème Année A"])
+        self.assertEqual(self.classroom_of("Mariam"), self.rooms["7ème Année A"])
+        self.assertIsNone(self.classroom_of("Oumar"))
+        self.assertEqual(self.classroom_of("Sira"), self.rooms["Atelier"])
+        self.assertEqual(Enrollment.objects.filter(school_year=self.next_year).count(), 3)  # sortant non inscrit
+        self.assertEqual(ClassroomHeadcount.objects.get(classroom=self.rooms["6ème Année A"]).total, 2)
+        self.assertEqual(ClassroomHeadcount.objects.get(classroom=None).total, 1)  # sortant
+        self.assertEqual(ClassroomHeadcount.objects.get(classroom=self.rooms["Atelier"]).total, 99)  # hors passage
+        self.assertIn("6eme annee a", Student.objects.get(pk=self.students["Awa"].pk).search_text)
+
+        issa = Student.objects.get(pk=self.students["Issa"].pk)
+        issa.classroom = self.rooms["Atelier"]  # déplacé à la main depuis : on n'y touche plus
+        issa.save()
+        revert_run(run)
+        self.assertEqual(self.classroom_of("Awa"), self.rooms["5ème Année A"])
+        self.assertEqual(self.classroom_of("Mariam"), self.rooms["6ème Année A"])
+        self.assertEqual(self.classroom_of("Oumar"), self.rooms["9ème Année A"])
+        self.assertEqual(self.classroom_of("Issa"), self.rooms["Atelier"])
+        self.assertQuerySetEqual(
+            Enrollment.objects.filter(school_year=self.next_year).values_list("student__last_name", flat=True),
+            ["Issa"],
+        )
+        self.assertEqual(ClassroomHeadcount.objects.get(classroom=self.rooms["5ème Année A"]).total, 1)
+        with self.assertRaisesMessage(ValueError, "déjà été annulé"):
+            revert_run(run)
+
+    def test_revert_keeps_enrollment_of_students_moved_since(self):
+        run = apply_plan(self.school, plan_mapping(build_plan(self.school)), to_year=self.next_year)
+        awa = Student.objects.get(pk=self.students["Awa"].pk)
+        awa.classroom = self.rooms["7ème Année A"]
+        awa.save()
+        revert_run(run)
+        self.assertEqual(self.classroom_of("Awa"), self.rooms["7ème Année A"])
+        self.assertTrue(Enrollment.objects.filter(student=awa, school_year=self.next_year).exists())
+        self.assertFalse(Enrollment.objects.filter(student=self.students["Issa"], school_year=self.next_year).exists())
+
+    def test_revert_respects_capacity(self):
+        run = apply_plan(self.school, plan_mapping(build_plan(self.school)))
+        fifth = self.rooms["5ème Année A"]
+        Classroom.objects.filter(pk=fifth.pk).update(capacity=2)
+        Student.objects.create(last_name="Nouvelle", first_name="X", classroom=fifth)  # inscrite depuis
+        with self.assertRaises(ClassroomFull):
+            revert_run(run)  # Awa et Issa : 3/2
+        run.refresh_from_db()
+        self.assertIsNone(run.reverted_at)
+        self.assertEqual(self.classroom_of("Awa"), self.rooms["6ème Année A"])
+
+        Student.objects.filter(last_name="Nouvelle").delete()
+        revert_run(run)
+        self.assertEqual(self.classroom_of("Awa"), fifth)
+
+    def test_apply_rejects_full_target_and_foreign_classrooms(self):
+        Classroom.objects.filter(pk=self.rooms["6ème Année A"].pk).update(capacity=1)
+        with self.assertRaises(ClassroomFull):
+            apply_plan(self.school, {self.rooms["5ème Année A"].pk: self.rooms["6ème Année A"].pk})
+        self.assertEqual(self.classroom_of("Awa"), self.rooms["5ème Année A"])  # rien n'a bougé
+        self.assertFalse(PromotionRun.objects.exists())
+        other = Classroom.objects.create(school=School.objects.create(name="École B"), label="6ème Année A")
+        with self.assertRaisesMessage(ValueError, "autre école"):
+            apply_plan(self.school, {self.rooms["5ème Année A"].pk: other.pk})
+
+    def test_command_reports_full_classroom(self):
+        # classe remplie entre l'aperçu et l'application
+        full = ClassroomFull([(self.rooms["6ème Année A"], 1, 3)])
+        with mock.patch("students.management.commands.promote_classes.apply_plan", side_effect=full):
+            with self.assertRaisesMessage(CommandError, "Capacité dépassée : 6ème Année A (3/1)."):
+                call_command("promote_classes", school=self.school.pk, apply=True, stdout=io.StringIO())
+
+    def test_views(self):
+        self.client.force_login(get_user_model().objects.create_superuser("direction", "d@ecole.test", "x"))
+        active_context.clear_cache()
+        self.client.get(reverse("switch_schoolyear", args=[self.next_year.pk]))
+        self.assertContains(self.client.get(reverse("student_promotion")), "Atelier")
+        self.client.post(reverse("student_promotion"), {
+            f"target_{self.rooms['5ème Année A'].pk}": self.rooms["7ème Année A"].pk,  # cible corrigée
+            f"target_{self.rooms['9ème Année A'].pk}": "out",
+            f"target_{self.rooms['Atelier'].pk}": "",
+        })
+        self.assertEqual(self.classroom_of("Awa"), self.rooms["7ème Année A"])
+        self.assertEqual(self.classroom_of("Mariam"), self.rooms["6ème Année A"])  # hors correspondance
+        run = PromotionRun.objects.get()
+
+        other = School.objects.create(name="École B")
+        other_year = SchoolYear.objects.create(
+            school=other, label="2026-2027", start_date=date(2026, 10, 1), end_date=date(2027, 6, 30)
+        )
+        self.client.get(reverse("switch_schoolyear", args=[other_year.pk]))
+        response = self.client.post(reverse("student_promotion_revert", args=[run.pk]))
+        self.assertEqual(response.status_code, 404)  # passage d'une autre école
+        self.assertEqual(self.classroom_of("Awa"), self.rooms["7ème Année A"])
+
+        self.client.get(reverse("switch_schoolyear", args=[self.next_year.pk]))
+        self.client.post(reverse("student_promotion_revert", args=[run.pk]))
+        self.assertEqual(self.classroom_of("Awa"), self.rooms["5ème Année A"])
+        self.assertEqual(self.classroom_of("Oumar"), self.rooms["9ème Année A"])
@@ -3,13 +3,19 @@ from django.urls import path
 from .views import (
     StudentsHubView,
     StudentListView,
+    StudentExportView,
     StudentEnrollNewView,
     StudentEnrollOldView,
     StudentStatsView,
+    StudentImportView,
+    ClassBulletinsView,
+    PromotionView,
+    PromotionRevertView,
+    matricule_lookup,
 )
 
-# Optionnel : utile si tu veux namespacer plus tard (ex: 'students:student_list')
-app_name = "students"
+# Pas de namespace : base.html et les vues utilisent 'student_list', 'student_stats'…
+# (un app_name ici obligerait à écrire 'students:student_list' partout)
 
 urlpatterns = [
     # Hub "Gestion des élèves"
@@ -17,6 +23,11 @@ urlpatterns = [
 
     # 1) Liste des élèves (scroll infini via ?page=N&partial=1)
     path("students/list/", StudentListView.as_view(), name="student_list"),
+    # Export de la liste (?format=csv|xlsx, même ?q=)
+    path("students/export/", StudentExportView.as_view(), name="student_export"),
+
+    # Recherche rapide par matricule (JSON) : ?m=GS25_A0…
+    path("students/lookup/", matricule_lookup, name="student_matricule_lookup"),
 
     # 2) Inscription — Nouvel élève
     path("students/enroll/new/", StudentEnrollNewView.as_view(), name="student_enroll_new"),
@@ -28,6 +39,16 @@ urlpatterns = [
     # Alias compat (anciens liens)
     path("enroll/old/", StudentEnrollOldView.as_view(), name="student_enroll_old_legacy"),
 
+    # Import CSV / XLSX (lien "Import CSV" du tableau de bord)
+    path("students/import/", StudentImportView.as_view(), name="student_import"),
+
+    # Bulletins PDF d'une classe (?year=<id>&format=pdf|zip)
+    path("students/bulletins/<int:pk>/", ClassBulletinsView.as_view(), name="class_bulletins"),
+
+    # Passage en classe supérieure (aperçu / application / annulation)
+    path("students/promotion/", PromotionView.as_view(), name="student_promotion"),
+    path("students/promotion/<int:pk>/revert/", PromotionRevertView.as_view(), name="student_promotion_revert"),
+
     # 4) Tableau effectifs / statistiques
     path("students/stats/", StudentStatsView.as_view(), name="student_stats"),
 ]
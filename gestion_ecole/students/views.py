@@ -1,12 +1,30 @@
 # students/views.py
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
-from django.db.models import Q, Count
+from django.db import transaction
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
-from django.views.generic import TemplateView, ListView, CreateView
+from django.utils import timezone
+from django.utils.text import slugify
+from django.views.decorators.http import require_GET
+from django.views.generic import TemplateView, ListView, CreateView, View
 
-from .models import Student
+from catalog.models import Classroom, SchoolYear
+from core.db_routing import ReplicaReadMixin, bind_reads
+
+from .bulletins import class_bulletins_pdf, class_bulletins_zip
+from .capacity import ClassroomFull, ensure_capacity
+from .counters import headcounts, year_headcounts
+from .enrollments import enroll, enroll_students
+from .export import csv_response, xlsx_response
+from .models import PromotionRun, Student
+from .pagination import decode_cursor, seek_page
+from .search import search_students
 from .forms import StudentEnrollForm
+from .importer import READ_ERRORS, StudentImporter, iter_rows
+from .promotion import MOVE, OUT, STRATEGIES, apply_plan, build_plan, revert_run
 
 
 # ——————————————————————————————————————
@@ -26,20 +44,34 @@ class StudentsHubView(LoginRequiredMixin, TemplateView):
 # ——————————————————————————————————————
 #  Liste des élèves — pagination infinie
 # ——————————————————————————————————————
-class StudentListView(LoginRequiredMixin, ListView):
+class StudentListView(LoginRequiredMixin, ReplicaReadMixin, ListView):
+    """
+    Deux modes de pagination :
+    - par défaut : « keyset » (?after=<jeton>) — pas de COUNT ni d'OFFSET,
+      latence constante quelle que soit la profondeur du scroll ;
+    - ?page=N ou recherche ?q= : paginator Django (liens existants, et tri
+      par pertinence qui ne se prête pas au keyset).
+    """
     model = Student
-    template_name = "students/list.html"          # template "plein"
+    template_name = "students/student_list.html"  # template "plein"
     context_object_name = "items"
     paginate_by = 50
-    ordering = ["last_name", "first_name"]
+    ordering = ["last_name", "first_name", "id"]
+
+    def use_keyset(self) -> bool:
+        return "page" not in self.request.GET and not (self.request.GET.get("q") or "").strip()
 
     # permet de changer le pas via ?per=25|50|75|100…
-    def get_paginate_by(self, queryset):
+    def get_per(self) -> int:
         try:
-            return int(self.request.GET.get("per", self.paginate_by))
+            return max(1, int(self.request.GET.get("per", self.paginate_by)))
         except (TypeError, ValueError):
             return self.paginate_by
 
+    def get_paginate_by(self, queryset):
+        # En mode keyset, on pagine nous-mêmes (cf. get_context_data)
+        return None if self.use_keyset() else self.get_per()
+
     # si ?partial=1 => on renvoie seulement les <tr> (fragment)
     def get_template_names(self):
         if self.request.GET.get("partial") == "1":
@@ -55,24 +87,106 @@ class StudentListView(LoginRequiredMixin, ListView):
         )
         q = (self.request.GET.get("q") or "").strip()
         if q:
-            qs = qs.filter(
-                Q(last_name__icontains=q)
-                | Q(first_name__icontains=q)
-                | Q(matricule__icontains=q)
-                | Q(classroom__label__icontains=q)
-                | Q(classroom__cycle__name__icontains=q)
-            )
+            # Index plein texte (cf. students/search.py), résultats triés par pertinence
+            qs = search_students(qs, q).order_by("-search_rank", *self.ordering)
         return qs
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         ctx["q"] = (self.request.GET.get("q") or "").strip()
-        try:
-            ctx["per"] = int(self.request.GET.get("per", self.paginate_by))
-        except (TypeError, ValueError):
-            ctx["per"] = self.paginate_by
+        ctx["per"] = self.get_per()
+        ctx["next_cursor"] = None
+        if self.use_keyset():
+            cursor = decode_cursor(self.request.GET.get("after", ""))
+            rows, next_cursor = seek_page(self.object_list, cursor, ctx["per"])
+            ctx[self.context_object_name] = ctx["object_list"] = rows
+            ctx["next_cursor"] = next_cursor
         return ctx
 
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        # Le JS du scroll infini lit ces en-têtes pour construire la requête suivante
+        if context.get("next_cursor"):
+            response["X-Next-Cursor"] = context["next_cursor"]
+        page_obj = context.get("page_obj")
+        if page_obj is not None and page_obj.has_next():
+            response["X-Next-Page"] = str(page_obj.next_page_number())
+        return response
+
+
+# ——————————————————————————————————————
+#  Export CSV / XLSX de la liste (même filtre ?q=)
+# ——————————————————————————————————————
+class StudentExportView(StudentListView):
+    """GET ?format=csv|xlsx&q=… — flux en mémoire constante (cf. students/export.py)."""
+
+    def get(self, request, *args, **kwargs):
+        qs = bind_reads(self.get_queryset())  # lu pendant le flux, après dispatch()
+        filename = f"eleves_{timezone.localdate():%Y%m%d}"
+        if request.GET.get("format") == "xlsx":
+            return xlsx_response(qs, filename)
+        return csv_response(qs, filename)
+
+
+# ——————————————————————————————————————
+#  Bulletins PDF d'une classe (pool de processus WeasyPrint)
+# ——————————————————————————————————————
+class ClassBulletinsView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """GET /students/bulletins/<classe>/?year=<id>&term=1..3&format=pdf|zip"""
+    permission_required = "students.view_student"
+
+    def get(self, request, pk):
+        # Comme PromotionView : seules les classes de l'école active
+        classroom = get_object_or_404(
+            Classroom.objects.select_related("school", "cycle", "main_teacher"),
+            pk=pk, school=getattr(request, "active_school", None),
+        )
+        year_id = request.GET.get("year")
+        if year_id:
+            school_year = get_object_or_404(SchoolYear, pk=year_id, school_id=classroom.school_id)
+        else:
+            school_year = getattr(request, "active_school_year", None)
+            if school_year is not None and school_year.school_id != classroom.school_id:
+                raise Http404("Année scolaire d'une autre école.")
+        term = request.GET.get("term")
+        term = int(term) if term in ("1", "2", "3") else None
+        name = f"bulletins_{slugify(classroom.label)}_{slugify(school_year.label) if school_year else ''}".rstrip("_")
+        if request.GET.get("format") == "zip":
+            return HttpResponse(
+                class_bulletins_zip(classroom, school_year, term=term), content_type="application/zip",
+                headers={"Content-Disposition": f'attachment; filename="{name}.zip"'},
+            )
+        return HttpResponse(
+            class_bulletins_pdf(classroom, school_year, term=term), content_type="application/pdf",
+            headers={"Content-Disposition": f'inline; filename="{name}.pdf"'},
+        )
+
+
+# ——————————————————————————————————————
+#  Recherche rapide par matricule (accueil / lecteur de cartes)
+# ——————————————————————————————————————
+MATRICULE_LOOKUP_LIMIT = 10
+
+
+@login_required
+@require_GET
+def matricule_lookup(request):
+    """
+    GET ?m=<matricule> -> JSON. Correspondance exacte d'abord, sinon préfixe.
+    Les deux passent par idx_student_matricule (pas de icontains / full scan).
+    """
+    m = (request.GET.get("m") or "").strip()
+    if not m:
+        return JsonResponse({"exact": False, "results": []})
+
+    fields = ("id", "matricule", "last_name", "first_name", "classroom__label")
+    base = Student.objects.values(*fields)
+    results = list(base.filter(matricule=m)[:MATRICULE_LOOKUP_LIMIT])
+    exact = bool(results)
+    if not exact:
+        results = list(base.filter(matricule__istartswith=m).order_by("matricule")[:MATRICULE_LOOKUP_LIMIT])
+    return JsonResponse({"exact": exact, "results": results})
+
 
 # ——————————————————————————————————————
 #  Inscription — Nouvel élève
@@ -85,8 +199,69 @@ class StudentEnrollNewView(LoginRequiredMixin, PermissionRequiredMixin, CreateVi
     success_url = reverse_lazy("student_list")
 
     def form_valid(self, form):
+        classroom = form.cleaned_data.get("classroom")
+        school_year = getattr(self.request, "active_school_year", None)
+        try:
+            with transaction.atomic():
+                # Verrou sur la classe jusqu'au COMMIT : pas de surréservation
+                if classroom:
+                    ensure_capacity({classroom.pk: 1})
+                response = super().form_valid(form)
+                # Historique : inscription de l'année active (si la classe en relève)
+                if school_year and classroom and classroom.school_id == school_year.school_id:
+                    enroll(self.object, school_year)
+        except ClassroomFull as exc:
+            form.add_error("classroom", str(exc))
+            return self.form_invalid(form)
         messages.success(self.request, "Élève inscrit(e) avec succès.")
-        return super().form_valid(form)
+        return response
+
+
+# ——————————————————————————————————————
+#  Import CSV / XLSX (rentrée)
+# ——————————————————————————————————————
+class StudentImportView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
+    """Import en masse (cf. students/importer.py) ; rapport d'erreurs par ligne."""
+    permission_required = "students.add_student"
+    template_name = "students/enrollment_import.html"
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get("file")
+        ctx = self.get_context_data(**kwargs)
+        if not upload:
+            messages.error(request, "Aucun fichier reçu.")
+            return self.render_to_response(ctx)
+        school = getattr(request, "active_school", None)
+        if school is None:
+            # sans école : matricules et libellés de classe de toutes les écoles
+            messages.error(request, "Aucune école active : choisissez l'école avant d'importer.")
+            return self.render_to_response(ctx)
+
+        importer = StudentImporter(
+            school=school,
+            dry_run=request.POST.get("dry_run") == "1",
+        )
+        report, interrupted = importer.report, False
+        try:
+            importer.run(iter_rows(upload.file, upload.name))
+        except READ_ERRORS as exc:
+            # les paquets précédents sont déjà enregistrés : on le dit
+            interrupted = True
+            messages.error(
+                request, f"Fichier illisible : {exc or exc.__class__.__name__}"
+                + (f" — import interrompu après {report}." if report.rows else ""),
+            )
+            if not (report.created or report.updated):
+                return self.render_to_response(ctx)
+
+        school_year = getattr(request, "active_school_year", None)
+        if school_year and report.student_ids:
+            # seuls les élèves du fichier : inscrits ou réaffectés à leur classe
+            enroll_students(school_year, report.student_ids)
+        ctx["report"] = report
+        if not interrupted:
+            (messages.warning if report.error_count else messages.success)(request, str(report))
+        return self.render_to_response(ctx)
 
 
 # ——————————————————————————————————————
@@ -100,21 +275,87 @@ class StudentEnrollOldView(LoginRequiredMixin, TemplateView):
     template_name = "students/enroll_old.html"
 
 
+# ——————————————————————————————————————
+#  Passage en classe supérieure (fin d'année)
+# ——————————————————————————————————————
+class PromotionView(LoginRequiredMixin, PermissionRequiredMixin, TemplateView):
+    """
+    GET : aperçu des déplacements (classe source -> cible, effectifs) pour
+    l'école active ; POST : application (cibles éventuellement corrigées).
+    """
+    permission_required = "students.change_student"
+    template_name = "students/promotion.html"
+
+    def get_strategy(self):
+        strategy = self.request.GET.get("strategy") or self.request.POST.get("strategy")
+        return strategy if strategy in STRATEGIES else "auto"
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        school = getattr(self.request, "active_school", None)
+        ctx["school"] = school
+        ctx["strategy"] = self.get_strategy()
+        ctx["strategies"] = STRATEGIES
+        if school is None:
+            return ctx
+        ctx["steps"] = build_plan(school, ctx["strategy"])
+        ctx["classrooms"] = [s.source for s in ctx["steps"]]
+        ctx["years"] = SchoolYear.objects.filter(school=school).order_by("-start_date")
+        ctx["runs"] = PromotionRun.objects.filter(school=school).select_related("to_year", "created_by")[:10]
+        ctx["MOVE"], ctx["OUT"] = MOVE, OUT
+        return ctx
+
+    def post(self, request, *args, **kwargs):
+        school = getattr(request, "active_school", None)
+        if school is None:
+            messages.error(request, "Aucune école active.")
+            return redirect("student_promotion")
+        # target_<id source> : id de la classe cible, "out" (sortants) ou "" (inchangée)
+        mapping = {}
+        for key, value in request.POST.items():
+            if key.startswith("target_") and value:
+                mapping[key[len("target_"):]] = None if value == "out" else value
+        year_id = request.POST.get("to_year")
+        to_year = SchoolYear.objects.filter(pk=year_id, school=school).first() if year_id else None
+        try:
+            run = apply_plan(school, mapping, to_year=to_year, user=request.user, strategy=self.get_strategy())
+        except ValueError as exc:
+            messages.error(request, str(exc))
+        else:
+            messages.success(request, f"Passage effectué : {run.moved} élève(s) déplacé(s).")
+        return redirect("student_promotion")
+
+
+class PromotionRevertView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    permission_required = "students.change_student"
+
+    def post(self, request, pk):
+        # Comme PromotionView : seuls les passages de l'école active
+        run = get_object_or_404(PromotionRun, pk=pk, school=getattr(request, "active_school", None))
+        try:
+            revert_run(run)
+        except ValueError as exc:
+            messages.error(request, str(exc))
+        else:
+            messages.success(request, f"Passage du {run.created_at:%d/%m/%Y} annulé.")
+        return redirect("student_promotion")
+
+
 # ——————————————————————————————————————
 #  Tableau des effectifs / Statistiques
 # ——————————————————————————————————————
-class StudentStatsView(LoginRequiredMixin, TemplateView):
+class StudentStatsView(LoginRequiredMixin, ReplicaReadMixin, TemplateView):
     template_name = "students/stats.html"
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        # Effectifs par classe (None = sans classe)
-        per_class = (
-            Student.objects
-            .values("classroom__id", "classroom__label")
-            .annotate(total=Count("id"))
-            .order_by("classroom__label")
-        )
-        ctx["per_class"] = per_class
-        ctx["total_students"] = Student.objects.count()
+        # Année active : inscriptions de l'année (agrégat indexé) ; sinon
+        # effectifs courants (None = sans classe), compteurs tenus à jour par
+        # les signaux (students/counters.py). Une seule requête dans les deux cas.
+        school_year = getattr(self.request, "active_school_year", None)
+        if school_year:
+            ctx["per_class"], ctx["total_students"] = year_headcounts(school_year.pk)
+        else:
+            ctx["per_class"], ctx["total_students"] = headcounts()
+        ctx["school_year"] = school_year
         return ctx